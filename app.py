@@ -1,18 +1,69 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash
+from flask import (Flask, Request, Response, g, request, jsonify, render_template, redirect, url_for, flash,
+                   send_file, stream_with_context)
+from werkzeug.http import http_date, quote_etag
 from werkzeug.utils import secure_filename
+import click
 import os
+import json
+import hashlib
+import hmac
 import uuid
-from datetime import datetime
+import tempfile
+import time
+import zipfile
+from itertools import islice
+from datetime import datetime, timezone
 from dotenv import load_dotenv
+from sqlalchemy.orm import defer
 
 import config
 from database.db import db, init_db
-from database.models import Report
-from core.parser import parse_pdf, parse_docx
+from database.models import Report, Job
+from database.jobs import enqueue_job
+from database.listing import list_reports
+from database.rescore import rescore_reports
+from database.retention import compact_reports
+from core.parser import parse_resume
 from core.scorer import score_resume
+from core.skills import extract_skills_batch
 from core.feedback import compile_full_feedback
+from core.matcher import build_match_context, encode_resumes, encode_cached
+from core.vector_index import get_resume_index
+from core.embedding_cache import cache_stats
+from core.report_cache import compress, get_report_cache, report_etag
+from core import memory, metrics, profiling, runtime, timing
+from core.timing import stage
+
+class HashingSpool(tempfile.SpooledTemporaryFile):
+    """
+    Upload buffer that hashes bytes as the multipart parser writes them
+    Stays in memory up to UPLOAD_SPOOL_THRESHOLD, then spills to an anonymous
+    temporary file that the OS removes when the buffer is closed
+    """
+    
+    def __init__(self):
+        super().__init__(max_size=config.UPLOAD_SPOOL_THRESHOLD, mode='w+b', dir=config.UPLOAD_FOLDER)
+        self.sha256 = hashlib.sha256()
+    
+    def write(self, data):
+        self.sha256.update(data)
+        return super().write(data)
+
+class AutoCVRequest(Request):
+    """Request class with in-memory, hashing upload buffers"""
+    
+    @property
+    def max_content_length(self):
+        # Lift the upload size limit for batch scoring only
+        if self.endpoint == 'score_batch_api':
+            return config.MAX_BATCH_UPLOAD_SIZE
+        return super().max_content_length
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingSpool()
 
 app = Flask(__name__)
+app.request_class = AutoCVRequest
 # Load variables from a local .env file if present (no-op in production)
 load_dotenv()
 # Read secret from environment in production; fallback for local dev
@@ -25,13 +76,140 @@ app.config['MAX_CONTENT_LENGTH'] = config.MAX_FILE_SIZE
 # Initialize database
 init_db(app)
 
-# Ensure upload folder exists
+# Ensure upload folder exists (large uploads spill here while being parsed)
 os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in config.ALLOWED_EXTENSIONS
 
+def upload_hash(file):
+    """SHA-256 hex digest of an upload, computed while the request body was parsed"""
+    stream = file.stream
+    if isinstance(stream, HashingSpool):
+        return stream.sha256.hexdigest()
+    # Uploads that did not come through the request parser: hash by reading
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+def find_cached_report(file_hash, target_role, jd_text):
+    """Look up an existing report for the same file / role / JD and count the outcome"""
+    report = Report.find_duplicate(file_hash, target_role, jd_text)
+    metrics.inc('autocv_dedupe_lookups_total', result='hit' if report else 'miss')
+    return report
+
+def cached_report_response(report):
+    """API payload for a deduplicated upload (mirrors a fresh scoring response)"""
+    response = report.to_dict()
+    response['bullet_rewrites'] = report.details()['bullet_rewrites'] or []
+    response['cached'] = True
+    return response
+
+def _embedding_cache_samples():
+    stats = cache_stats()
+    for tier in ('memory_hits', 'disk_hits', 'misses'):
+        yield ('autocv_embedding_cache_lookups_total', 'counter', 'Embedding cache lookups by outcome',
+               stats[tier], {'result': tier})
+
+def _report_cache_samples():
+    cache = get_report_cache()
+    for result in ('hits', 'misses'):
+        yield ('autocv_report_cache_lookups_total', 'counter', 'Report body cache lookups by outcome',
+               cache.stats[result], {'result': result})
+    yield ('autocv_report_cache_bytes', 'gauge', 'Bytes held by the report body cache', cache.size_bytes, {})
+
+metrics.describe('autocv_dedupe_lookups_total', 'Upload dedupe lookups by outcome (hit skips scoring)')
+metrics.describe('autocv_report_responses_total', 'Report responses by kind (json, html) and status')
+metrics.describe('autocv_requests_total', 'Requests by endpoint and status')
+metrics.describe_histogram('autocv_request_seconds', 'Request latency by endpoint (to the response headers)',
+                           timing.STAGE_BUCKETS)
+metrics.register_collector(_embedding_cache_samples)
+metrics.register_collector(_report_cache_samples)
+metrics.register_collector(runtime.metric_samples)
+
+# Load models ahead of the first request (gunicorn.conf.py does this in the
+# master instead, before forking workers)
+if config.PREWARM == 'background':
+    runtime.start_prewarm_thread()
+
+@app.after_request
+def record_first_response(response):
+    runtime.note_response()
+    return response
+
+@app.before_request
+def start_stage_timing():
+    if config.STAGE_TIMING:
+        g.request_started = time.perf_counter()
+        timing.start_request()
+        memory.start_request()
+
+@app.after_request
+def record_request_timing(response):
+    """Request throughput / latency (and memory) metrics and the Server-Timing header"""
+    started = g.get('request_started')
+    if started is None:
+        return response
+    total = time.perf_counter() - started
+    endpoint = request.endpoint or 'unmatched'
+    metrics.inc('autocv_requests_total', endpoint=endpoint, status=str(response.status_code))
+    metrics.observe('autocv_request_seconds', total, endpoint=endpoint)
+    memory.finish_request(endpoint)
+    timings = timing.finish_request()
+    if config.SERVER_TIMING_HEADER:
+        response.headers['Server-Timing'] = timing.server_timing(timings, total)
+    return response
+
+@app.before_request
+def start_request_profile():
+    requested = request.headers.get('X-Profile') == '1' and admin_authorized()
+    profile = profiling.start_profile(request.endpoint, requested)
+    if profile is not None:
+        g.profile = profile
+
+@app.after_request
+def finish_request_profile(response):
+    """Stop the request's profiler once the (possibly streamed) body has been sent"""
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    response.headers['X-Profile-Id'] = profile.id
+    endpoint, path, status = request.endpoint, request.path, response.status_code
+    response.call_on_close(lambda: profile.finish(endpoint, path, status))
+    return response
+
+def index_report_embeddings(pairs):
+    """Store (report_id, embedding) pairs in the resume vector index; never fails the upload"""
+    pairs = [(report_id, embedding) for report_id, embedding in pairs if embedding is not None]
+    if not pairs or not config.RESUME_INDEX_ENABLED:
+        return
+    try:
+        with stage('index'):
+            get_resume_index().add([report_id for report_id, _ in pairs], [embedding for _, embedding in pairs])
+    except Exception as e:
+        print(f"Warning: could not index resume embeddings: {e}")
+
+def score_and_store(file_id, filename, resume_data, target_role=None, jd_text=None, file_hash=None):
+    """
+    Score a parsed resume, save its report and index its embedding
+    Shared by the upload routes and the background worker
+    Returns (report, feedback_result)
+    """
+    scoring_result = score_resume(resume_data, target_role, jd_text)
+    feedback_result = compile_full_feedback(scoring_result, resume_data)
+    
+    report = Report.from_results(file_id, filename, scoring_result, feedback_result, target_role,
+                                 file_hash=file_hash, jd_text=jd_text)
+    with stage('db_commit'):
+        db.session.add(report)
+        db.session.commit()
+    index_report_embeddings([(report.id, scoring_result['resume_embedding'])])
+    
+    return report, feedback_result
+
 @app.route('/')
 def index():
     """Home page with upload form"""
@@ -83,48 +261,31 @@ def score_resume_api():
     jd_text = request.form.get('jd_text', None)
     
     try:
-        # Save file temporarily
         filename = secure_filename(file.filename)
-        file_id = str(uuid.uuid4())
-        file_ext = filename.rsplit('.', 1)[1].lower()
-        temp_filename = f"{file_id}.{file_ext}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
-        file.save(filepath)
-        
-        # Parse resume
-        if file_ext == 'pdf':
-            resume_data = parse_pdf(filepath)
-        else:  # docx
-            resume_data = parse_docx(filepath)
-        
-        # Score resume
-        scoring_result = score_resume(resume_data, target_role, jd_text)
         
-        # Generate feedback
-        feedback_result = compile_full_feedback(scoring_result, resume_data)
+        # Already scored this exact file against the same role / JD?
+        file_hash = upload_hash(file)
+        cached = find_cached_report(file_hash, target_role, jd_text)
+        if cached:
+            return jsonify(cached_report_response(cached)), 200
         
-        # Create report
-        report = Report(
-            id=file_id,
-            filename=filename,
-            overall_score=scoring_result['overall_score'],
-            sub_scores=scoring_result['sub_scores'],
-            feedback=feedback_result['feedback'],
-            evidence={
-                'missing_sections': scoring_result['evidence'].get('missing_sections', {}),
-                'skill_gaps': scoring_result['evidence'].get('skill_gaps', []),
-                'weak_bullets': [r['original'] for r in feedback_result['bullet_rewrites']],
-                'ats_issues': scoring_result['evidence'].get('ats', [])
-            },
-            target_role=target_role
-        )
+        # Queue mode: hand the upload to the worker pool and return straight away
+        if config.ASYNC_JOBS:
+            lane = 'bulk' if request.form.get('priority') == 'bulk' else 'interactive'
+            job = enqueue_job(filename, file.stream.read(), target_role, jd_text, lane, file_hash=file_hash)
+            return jsonify({
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': url_for('get_job_api', job_id=job.id)
+            }), 202
         
-        # Save to database
-        db.session.add(report)
-        db.session.commit()
+        # Parse resume straight from the upload buffer (no copy on disk)
+        file_id = str(uuid.uuid4())
+        file_ext = filename.rsplit('.', 1)[1].lower()
+        resume_data = parse_resume(file.stream, file_ext)
         
-        # Cleanup temp file
-        os.remove(filepath)
+        # Score, generate feedback and save the report
+        report, feedback_result = score_and_store(file_id, filename, resume_data, target_role, jd_text, file_hash)
         
         # Build response
         response = report.to_dict()
@@ -135,27 +296,378 @@ def score_resume_api():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _read_limited(fileobj, limit):
+    """Read at most limit bytes, failing instead of buffering an oversized file"""
+    data = fileobj.read(limit + 1)
+    if len(data) > limit:
+        raise ValueError('File exceeds maximum size')
+    return data
+
+def iter_batch_uploads(files, archive=None):
+    """
+    Yield (filename, data, error) for every resume in a batch request
+    Zip members are read one at a time, so memory stays bounded by one file
+    """
+    for f in files:
+        try:
+            yield secure_filename(f.filename), _read_limited(f.stream, config.MAX_FILE_SIZE), None
+        except ValueError as e:
+            yield f.filename, None, str(e)
+    
+    if archive is None:
+        return
+    
+    with zipfile.ZipFile(archive.stream) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or info.filename.startswith('__MACOSX/'):
+                continue
+            filename = secure_filename(os.path.basename(info.filename))
+            if not allowed_file(filename):
+                yield info.filename, None, 'Invalid file type. Only PDF and DOCX allowed'
+                continue
+            if info.file_size > config.MAX_FILE_SIZE:
+                yield filename, None, 'File exceeds maximum size'
+                continue
+            try:
+                with zf.open(info) as member:
+                    yield filename, _read_limited(member, config.MAX_FILE_SIZE), None
+            except (ValueError, zipfile.BadZipFile) as e:
+                yield filename, None, str(e)
+
+def parse_upload_bytes(filename, data):
+    """Parse an in-memory upload, picking the parser from the filename"""
+    return parse_resume(data, filename.rsplit('.', 1)[1].lower())
+
+def score_batch_chunk(chunk, target_role, jd_text, match_context):
+    """
+    Parse, embed (one batched forward pass) and score a chunk of uploads,
+    then commit all of its reports together
+    Returns one result dict per upload, in upload order
+    """
+    results = [None] * len(chunk)
+    parsed = []
+    
+    for i, (filename, data, error) in enumerate(chunk):
+        if error is None and not allowed_file(filename):
+            error = 'Invalid file type. Only PDF and DOCX allowed'
+        if error:
+            results[i] = {'filename': filename, 'error': error}
+            continue
+        file_hash = hashlib.sha256(data).hexdigest()
+        cached = find_cached_report(file_hash, target_role, jd_text)
+        if cached:
+            results[i] = {
+                'filename': filename,
+                'report_id': cached.id,
+                'overall_score': round(cached.overall_score, 1),
+                'sub_scores': cached.sub_scores,
+                'skill_gaps': cached.details()['evidence'].get('skill_gaps', []),
+                'cached': True
+            }
+            continue
+        try:
+            parsed.append((i, filename, file_hash, parse_upload_bytes(filename, data)))
+        except Exception as e:
+            results[i] = {'filename': filename, 'error': str(e)}
+    
+    # Embed every resume of the chunk together; the JD embedding is shared
+    embeddings = {}
+    if match_context and match_context['embedding'] is not None:
+        encoded = encode_resumes([resume_data for _, _, _, resume_data in parsed])
+        embeddings = {i: vector for (i, _, _, _), vector in zip(parsed, encoded) if vector is not None}
+    
+    # Skill extraction for the whole chunk (one nlp.pipe pass when spaCy is on)
+    skills = extract_skills_batch([resume_data.get('full_text', '') for _, _, _, resume_data in parsed])
+    
+    reports = []
+    for (i, filename, file_hash, resume_data), resume_skills in zip(parsed, skills):
+        try:
+            scoring_result = score_resume(resume_data, target_role, jd_text, match_context=match_context,
+                                          resume_embedding=embeddings.get(i), resume_skills=resume_skills)
+            feedback_result = compile_full_feedback(scoring_result, resume_data)
+            report = Report.from_results(str(uuid.uuid4()), filename, scoring_result, feedback_result, target_role,
+                                         file_hash=file_hash, jd_text=jd_text)
+            reports.append((i, report, scoring_result['resume_embedding']))
+            results[i] = {
+                'filename': filename,
+                'report_id': report.id,
+                'overall_score': scoring_result['overall_score'],
+                'sub_scores': scoring_result['sub_scores'],
+                'skill_gaps': scoring_result['evidence'].get('skill_gaps', [])
+            }
+        except Exception as e:
+            results[i] = {'filename': filename, 'error': str(e)}
+    
+    if reports:
+        try:
+            with stage('db_commit'):
+                db.session.add_all([report for _, report, _ in reports])
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for i, report, _ in reports:
+                results[i] = {'filename': report.filename, 'error': f"Could not save report: {e}"}
+        else:
+            index_report_embeddings([(report.id, embedding) for _, report, embedding in reports])
+    
+    return results
+
+@app.route('/api/score-batch', methods=['POST'])
+def score_batch_api():
+    """
+    API endpoint to score many resumes against one role / JD
+    Accepts: multipart/form-data with repeated `files` and/or one zip `archive`,
+             optional target_role, jd_text
+    Returns: NDJSON stream, one line per resume followed by a summary line
+    """
+    files = [f for f in request.files.getlist('files') if f.filename]
+    archive = request.files.get('archive')
+    if archive is not None and archive.filename == '':
+        archive = None
+    
+    if not files and archive is None:
+        return jsonify({'error': 'No files provided'}), 400
+    
+    if archive is not None:
+        if not zipfile.is_zipfile(archive.stream):
+            return jsonify({'error': 'Archive must be a zip file'}), 400
+        archive.stream.seek(0)
+    
+    target_role = request.form.get('target_role', None)
+    jd_text = request.form.get('jd_text', None)
+    
+    try:
+        # Embed and skill-extract the JD once for the whole batch
+        match_context = build_match_context(target_role, jd_text)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        summary = {'done': True, 'scored': 0, 'failed': 0}
+        uploads = iter_batch_uploads(files, archive)
+        while True:
+            chunk = list(islice(uploads, config.BATCH_CHUNK_SIZE))
+            if not chunk:
+                break
+            try:
+                results = score_batch_chunk(chunk, target_role, jd_text, match_context)
+            except Exception as e:
+                results = [{'filename': filename, 'error': str(e)} for filename, _, _ in chunk]
+            for result in results:
+                summary['failed' if 'error' in result else 'scored'] += 1
+                yield json.dumps(result) + '\n'
+        yield json.dumps(summary) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/rank-candidates', methods=['POST'])
+def rank_candidates_api():
+    """
+    API endpoint to rank stored reports against a job description
+    Uses the stored resume embeddings only: nothing is re-parsed or re-embedded
+    Accepts: JSON or form with jd_text, optional top_k, target_role, min_score, max_score
+    Returns: JSON list of reports ordered by semantic similarity
+    """
+    params = request.get_json(silent=True) or request.form
+    jd_text = params.get('jd_text')
+    if not jd_text:
+        return jsonify({'error': 'jd_text is required'}), 400
+    
+    try:
+        top_k = min(int(params.get('top_k', 20)), config.RANK_MAX_TOP_K)
+        min_score = params.get('min_score')
+        max_score = params.get('max_score')
+        min_score = float(min_score) if min_score not in (None, '') else None
+        max_score = float(max_score) if max_score not in (None, '') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k, min_score and max_score must be numbers'}), 400
+    if top_k < 1:
+        return jsonify({'error': 'top_k must be at least 1'}), 400
+    target_role = params.get('target_role')
+    
+    try:
+        # Filters are resolved in the database, similarity in the index
+        allowed_ids = None
+        if target_role or min_score is not None or max_score is not None:
+            query = Report.query.with_entities(Report.id)
+            if target_role:
+                query = query.filter(Report.target_role == target_role)
+            if min_score is not None:
+                query = query.filter(Report.overall_score >= min_score)
+            if max_score is not None:
+                query = query.filter(Report.overall_score <= max_score)
+            allowed_ids = [row.id for row in query]
+        
+        jd_embedding = encode_cached([jd_text])[0]
+        index = get_resume_index()
+        # Expired reports are tombstoned in the index; over-fetch a little to
+        # cover rows deleted by other means since indexing
+        hits = index.search(jd_embedding, top_k + config.RANK_OVERFETCH, allowed_ids)
+        
+        reports = {r.id: r for r in Report.query.filter(Report.id.in_([report_id for report_id, _ in hits]))}
+        results = []
+        for report_id, similarity in hits:
+            report = reports.get(report_id)
+            if report is None:
+                continue
+            results.append({
+                'report_id': report.id,
+                'filename': report.filename,
+                'similarity': round(similarity, 4),
+                'overall_score': round(report.overall_score, 1),
+                'target_role': report.target_role,
+                'timestamp': report.timestamp.isoformat() + 'Z'
+            })
+            if len(results) >= top_k:
+                break
+        
+        return jsonify({'results': results, 'indexed': index.live_count()}), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/reports', methods=['GET'])
+def list_reports_api():
+    """
+    API endpoint to page through stored reports
+    Accepts: query params sort (timestamp|overall_score), order (desc|asc),
+    target_role, min_score, max_score, limit, cursor (next_cursor of the
+    previous page)
+    Returns: JSON {"reports": [...], "next_cursor": ...}
+    """
+    args = request.args
+    try:
+        min_score = float(args['min_score']) if args.get('min_score') else None
+        max_score = float(args['max_score']) if args.get('max_score') else None
+        limit = int(args['limit']) if args.get('limit') else None
+        reports, next_cursor = list_reports(sort=args.get('sort', 'timestamp'), order=args.get('order', 'desc'),
+                                            target_role=args.get('target_role'), min_score=min_score,
+                                            max_score=max_score, limit=limit, cursor=args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'reports': reports, 'next_cursor': next_cursor}), 200
+
+def report_fields(value):
+    """Sorted tuple of the ?fields= names, or None for every field"""
+    if not value:
+        return None
+    fields = tuple(sorted({name.strip() for name in value.split(',') if name.strip()}))
+    unknown = [name for name in fields if name not in Report.API_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; available: {', '.join(Report.API_FIELDS)}")
+    return fields
+
+def report_response(report_id, kind, fields=None):
+    """
+    Conditional, gzip-aware response for a report as 'json' (API) or 'html' (page)
+    Only the report's version columns are read to answer a revalidation with
+    304; bodies are served from the report cache, built on a miss.
+    Returns None when the report does not exist
+    """
+    row = (Report.query.with_entities(Report.id, Report.timestamp, Report.overall_score, Report.scoring_version)
+           .filter(Report.id == report_id).first())
+    if row is None:
+        return None
+    
+    gzipped = request.accept_encodings['gzip'] > 0
+    etag = report_etag(row.id, row.overall_score, row.scoring_version, kind, fields, gzipped)
+    modified = row.timestamp.replace(microsecond=0, tzinfo=timezone.utc)
+    headers = {'ETag': quote_etag(etag), 'Last-Modified': http_date(modified), 'Cache-Control': config.REPORT_CACHE_CONTROL,
+               'Vary': 'Accept-Encoding'}
+    # If-None-Match wins over If-Modified-Since (a re-score keeps the timestamp)
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = request.if_modified_since is not None and modified <= request.if_modified_since
+    if not_modified:
+        metrics.inc('autocv_report_responses_total', kind=kind, status='304')
+        return Response(status=304, headers=headers)
+    
+    cache = get_report_cache()
+    entry = cache.get(etag)
+    if entry is None:
+        query = Report.query
+        if fields is not None and 'feedback' not in fields and 'evidence' not in fields:
+            query = query.options(*(defer(getattr(Report, name)) for name in ('payload', 'feedback', 'evidence',
+                                                                               'bullet_rewrites')))
+        report = query.filter(Report.id == report_id).first()
+        if report is None:
+            return None
+        data = report.to_dict(fields)
+        if kind == 'json':
+            body = app.json.dumps(data).encode('utf-8')
+        else:
+            body = render_template('report.html', report=data).encode('utf-8')
+        body_gzipped = gzipped and len(body) >= config.REPORT_GZIP_MIN_BYTES
+        entry = (compress(body) if body_gzipped else body, body_gzipped)
+        cache.put(etag, *entry)
+    
+    body, body_gzipped = entry
+    if body_gzipped:
+        headers['Content-Encoding'] = 'gzip'
+    metrics.inc('autocv_report_responses_total', kind=kind, status='200')
+    mimetype = 'application/json' if kind == 'json' else 'text/html'
+    return Response(body, mimetype=mimetype, headers=headers)
+
 @app.route('/api/report/<report_id>', methods=['GET'])
 def get_report_api(report_id):
     """
     API endpoint to retrieve a stored report
+    Accepts: optional ?fields=overall_score,sub_scores,... to leave out the rest
+    Returns: JSON report with ETag / Last-Modified (304 on revalidation), gzipped when accepted
     """
-    report = Report.query.get(report_id)
+    try:
+        fields = report_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    if not report:
+    response = report_response(report_id, 'json', fields)
+    if response is None:
         return jsonify({'error': 'Report not found'}), 404
     
-    return jsonify(report.to_dict()), 200
+    return response
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_api(job_id):
+    """
+    API endpoint to poll a queued scoring job
+    Returns job status, plus the report once the job is done
+    """
+    job = db.session.get(Job, job_id)
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    response = job.to_dict()
+    if job.status == 'done':
+        report = db.session.get(Report, job.report_id)
+        response['report'] = report.to_dict() if report else None
+    
+    return jsonify(response), 200
+
+@app.route('/jobs/<job_id>')
+def view_job(job_id):
+    """Web page that waits for a queued job, then redirects to its report"""
+    job = db.session.get(Job, job_id)
+    
+    if not job:
+        return "Job not found", 404
+    
+    if job.status == 'done':
+        return redirect(url_for('view_report', report_id=job.report_id))
+    
+    return render_template('job.html', job=job.to_dict(), refresh_seconds=config.JOB_PAGE_REFRESH)
 
 @app.route('/report/<report_id>')
 def view_report(report_id):
-    """Web page to view report"""
-    report = Report.query.get(report_id)
+    """Web page to view report (pre-rendered and revalidated like the API)"""
+    response = report_response(report_id, 'html')
     
-    if not report:
+    if response is None:
         return "Report not found", 404
     
-    return render_template('report.html', report=report.to_dict())
+    return response
 
 @app.route('/upload', methods=['POST'])
 def upload():
@@ -174,50 +686,31 @@ def upload():
         return redirect(url_for('index'))
     
     try:
-        # Save and process
         filename = secure_filename(f.filename)
-        file_id = str(uuid.uuid4())
-        file_ext = filename.rsplit('.', 1)[1].lower()
-        temp_filename = f"{file_id}.{file_ext}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], temp_filename)
-        f.save(filepath)
         
         # --- FIX: Extract form fields ---
         target_role = request.form.get('target_role', None)
         jd_text = request.form.get('jd_text', None)
         # -------------------------------
-
-        # Parse
-        if file_ext == 'pdf':
-            resume_data = parse_pdf(filepath)
-        else:
-            resume_data = parse_docx(filepath)
         
-        # Score
-        scoring_result = score_resume(resume_data, target_role, jd_text)
-        feedback_result = compile_full_feedback(scoring_result, resume_data)
+        # Already scored this exact file against the same role / JD?
+        file_hash = upload_hash(f)
+        cached = find_cached_report(file_hash, target_role, jd_text)
+        if cached:
+            return redirect(url_for('view_report', report_id=cached.id))
         
-        # Save report
-        report = Report(
-            id=file_id,
-            filename=filename,
-            overall_score=scoring_result['overall_score'],
-            sub_scores=scoring_result['sub_scores'],
-            feedback=feedback_result['feedback'],
-            evidence={
-                'missing_sections': scoring_result['evidence'].get('missing_sections', {}),
-                'skill_gaps': scoring_result['evidence'].get('skill_gaps', []),
-                'weak_bullets': [r['original'] for r in feedback_result['bullet_rewrites']],
-                'ats_issues': scoring_result['evidence'].get('ats', [])
-            },
-            target_role=target_role
-        )
+        # Queue mode: interactive lane, then poll the job page
+        if config.ASYNC_JOBS:
+            job = enqueue_job(filename, f.stream.read(), target_role, jd_text, 'interactive', file_hash=file_hash)
+            return redirect(url_for('view_job', job_id=job.id))
         
-        db.session.add(report)
-        db.session.commit()
+        # Parse straight from the upload buffer (no copy on disk)
+        file_id = str(uuid.uuid4())
+        file_ext = filename.rsplit('.', 1)[1].lower()
+        resume_data = parse_resume(f.stream, file_ext)
         
-        # Cleanup
-        os.remove(filepath)
+        # Score and save report
+        report, feedback_result = score_and_store(file_id, filename, resume_data, target_role, jd_text, file_hash)
         
         # Redirect to report page
         return redirect(url_for('view_report', report_id=file_id))
@@ -229,5 +722,106 @@ def upload():
         print(error_details)
         return f"Error processing resume: {str(e)}<br><pre>{error_details}</pre>", 500
 
+@app.route('/readyz')
+def readyz():
+    """Readiness probe: 503 until the models this process needs are loaded (or prewarm failed)"""
+    report = runtime.status()
+    return jsonify(report), 200 if report['ready'] else 503
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics for this worker process"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+def admin_authorized():
+    """True when ADMIN_TOKEN is configured and the request carries it"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(config.ADMIN_TOKEN) and hmac.compare_digest(token.encode('utf-8'), config.ADMIN_TOKEN.encode('utf-8'))
+
+@app.route('/api/admin/rescore', methods=['POST'])
+def rescore_api():
+    """
+    Recompute overall_score of every stored report with the current weights
+    Accepts: optional JSON {"dry_run": true} to count changes without writing
+    """
+    if not admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    params = request.get_json(silent=True) or {}
+    try:
+        return jsonify(rescore_reports(dry_run=bool(params.get('dry_run')))), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/compact', methods=['POST'])
+def compact_api():
+    """
+    Run one compaction pass: compress old rows, expire reports past retention, reclaim space
+    Accepts: optional JSON {"retention_days": N, "action": "archive" | "purge"}
+    """
+    if not admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    params = request.get_json(silent=True) or {}
+    try:
+        retention_days = int(params['retention_days']) if params.get('retention_days') is not None else None
+        return jsonify(compact_reports(retention_days=retention_days, action=params.get('action'))), 200
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles_api():
+    """Stored request profiles, newest first"""
+    if not admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({'profiles': profiling.list_profiles()}), 200
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def get_profile_api(profile_id):
+    """
+    Hottest functions of a stored profile
+    Query params: top (default 20), sort (cumulative, tottime or calls);
+    format=pstats downloads the raw dump instead
+    """
+    if not admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    if request.args.get('format') == 'pstats':
+        path = profiling.profile_path(profile_id)
+        if path is None:
+            return jsonify({'error': 'Profile not found'}), 404
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                         download_name=f'{profile_id}.prof')
+    try:
+        top = request.args.get('top', 20, type=int)
+        functions = profiling.top_functions(profile_id, max(1, min(top, 500)), request.args.get('sort', 'cumulative'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if functions is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return jsonify({'id': profile_id, 'functions': functions}), 200
+
+@app.cli.command('rescore')
+@click.option('--dry-run', is_flag=True, help='Count the reports that would change without writing')
+@click.option('--chunk-size', type=int, default=None, help='Reports per transaction')
+def rescore_command(dry_run, chunk_size):
+    """Recompute overall_score of stored reports with the current weights"""
+    stats = rescore_reports(chunk_size=chunk_size, dry_run=dry_run)
+    click.echo(f"{stats['reports']} reports rescored in {stats['seconds']:.2f}s: {stats['updated']} changed, "
+               f"{stats['backfilled']} backfilled, {stats['skipped']} skipped" + (' (dry run)' if dry_run else ''))
+
+@app.cli.command('compact')
+@click.option('--retention-days', type=int, default=None, help='Override REPORT_RETENTION_DAYS (0 = keep everything)')
+@click.option('--action', type=click.Choice(['archive', 'purge']), default=None, help='Override REPORT_RETENTION_ACTION')
+@click.option('--vacuum', is_flag=True, help='Full VACUUM (blocks writers; needed once for databases created '
+                                            'without auto_vacuum)')
+def compact_command(retention_days, action, vacuum):
+    """Compress old reports, expire those past retention and reclaim free space"""
+    stats = compact_reports(retention_days=retention_days, action=action, full_vacuum=vacuum)
+    click.echo(f"{stats['compressed']} reports compressed, {stats['expired']} {stats['action']}d, "
+               f"{stats['freed_pages']} pages freed in {stats['seconds']:.2f}s")
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
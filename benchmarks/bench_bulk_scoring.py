@@ -0,0 +1,68 @@
+"""
+Bulk scoring benchmark: core.bulk.bulk_score against score_resume called
+once per resume, on the same parsed resumes
+
+Usage: python benchmarks/bench_bulk_scoring.py [--resumes 2000] [--size 4000] [--backend hashing]
+
+Resumes are synthetic (bench_parser_lexer.synthetic_resume) and go through
+the real lexer, so sections and contact details look like parsed uploads.
+Both paths are timed with no target, with a target role and with a JD; the
+default hashing backend keeps the embedding cost out of the comparison (use
+--backend sentence-transformers to include it). Every score is compared.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config  # noqa: E402
+from core.bulk import bulk_score  # noqa: E402
+from core.features import SUB_SCORE_KEYS  # noqa: E402
+from core.parser import scan_text  # noqa: E402
+from core.scorer import score_resume  # noqa: E402
+from bench_parser_lexer import synthetic_resume  # noqa: E402
+
+def parsed_resumes(n, size):
+    resumes = []
+    for seed in range(n):
+        text = synthetic_resume(size, seed=seed)
+        contact, links, sections = scan_text(text)
+        resumes.append({'full_text': text, 'sections': sections, 'contact': contact, 'links': links,
+                        'page_count': 1 + seed % 3})
+    return resumes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=4000, help='characters per resume')
+    parser.add_argument('--backend', default='hashing', help='embedding backend for the skill match')
+    args = parser.parse_args()
+
+    config.EMBEDDING_BACKEND = args.backend
+    config.RESUME_INDEX_ENABLED = False  # score_resume would embed for the index too
+    resumes = parsed_resumes(args.resumes, args.size)
+    cases = [('no target', None, None), ('target role', 'SDE Intern', None),
+             ('JD', None, 'Backend engineer: Python, Flask, SQL, Docker, REST APIs, AWS')]
+    for label, target_role, jd_text in cases:
+        bulk_score(resumes[:2], target_role, jd_text)  # warm up caches and models
+        started = time.perf_counter()
+        expected = [score_resume(resume_data, target_role, jd_text) for resume_data in resumes]
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        bulk = bulk_score(resumes, target_role, jd_text)
+        batched = time.perf_counter() - started
+
+        mismatches = sum(
+            1 for row, result in enumerate(expected)
+            if dict(zip(SUB_SCORE_KEYS, bulk['sub_scores'][row].tolist())) != result['sub_scores']
+            or bulk['overall_scores'][row] != result['overall_score'])
+        print(f"{label:>12}: score_resume {single * 1000 / len(resumes):.2f}ms/resume, "
+              f"bulk_score {batched * 1000 / len(resumes):.2f}ms/resume ({single / batched:.1f}x), "
+              f"{mismatches} mismatches")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Cold-start benchmark: app import time, time to ready / first scored request
+under gunicorn, and per-worker memory with and without preloading the models
+
+Usage: python benchmarks/bench_cold_start.py [--workers N] [--modes preload,off,server]
+
+Modes are AUTOCV_PREWARM values, plus 'server': web workers talk to a shared
+inference server (core.inference_server) that alone holds the model; its
+memory is reported separately. For each mode a gunicorn server is started on
+a free port with a throwaway database. Both timings are measured from launch; memory is read from
+/proc/<pid>/smaps_rollup once every worker has served a scoring request
+(Linux only). PSS counts shared pages fractionally, so the total PSS across
+workers is the real memory cost of the pool.
+"""
+import argparse
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_time():
+    """Seconds to import the app module in a fresh interpreter"""
+    code = 'import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)'
+    env = dict(os.environ, AUTOCV_DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def sample_docx():
+    from docx import Document
+    doc = Document()
+    for line in ['Jane Doe', 'jane@example.com', 'EXPERIENCE',
+                 'Built Python APIs with Flask and PostgreSQL, cutting latency by 40%',
+                 'SKILLS', 'Python, Docker, AWS, React']:
+        doc.add_paragraph(line)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+def post_resume(base_url, data):
+    """POST a resume with a unique JD so the embedding model is exercised"""
+    boundary = uuid.uuid4().hex
+    fields = {'jd_text': f'Backend engineer {uuid.uuid4().hex}: Python, Flask, SQL, Docker'}
+    body = b''
+    for name, value in fields.items():
+        body += (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n').encode()
+    body += (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="r.docx"\r\n'
+             f'Content-Type: application/octet-stream\r\n\r\n').encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    req = urllib.request.Request(f'{base_url}/api/score-resume', data=body,
+                                 headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+    with urllib.request.urlopen(req, timeout=300) as resp:
+        return resp.status
+
+def get_json(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            return resp.status, json.load(resp)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+def children(pid):
+    pids = []
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        pids.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    return pids
+
+def smaps(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return {'rss': fields.get('Rss', 0), 'pss': fields.get('Pss', 0),
+            'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)}
+
+def run_mode(mode, workers, resume):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    workdir = tempfile.mkdtemp(prefix='autocv-bench-')
+    env = dict(os.environ, AUTOCV_PREWARM=mode, PORT=str(port), WEB_CONCURRENCY=str(workers),
+               AUTOCV_DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    started = time.perf_counter()
+    inference = None
+    if mode == 'server':
+        env['AUTOCV_PREWARM'] = 'preload'
+        env['AUTOCV_EMBEDDING_SOCKET'] = os.path.join(workdir, 'embed.sock')
+        inference = subprocess.Popen([sys.executable, '-m', 'core.inference_server'],
+                                     cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app:app', '-c', 'gunicorn.conf.py'],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    result = {'mode': mode, 'workers': workers}
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f'gunicorn exited with {server.returncode}')
+            try:
+                status, report = get_json(f'{base_url}/readyz')
+            except (urllib.error.URLError, ConnectionError):
+                status = None
+            if status == 200:
+                break
+            if status == 503 and report.get('prewarm_error'):
+                raise RuntimeError(f"prewarm failed: {report['prewarm_error']}")
+            time.sleep(0.05)
+        result['ready_seconds'] = round(time.perf_counter() - started, 3)
+
+        post_resume(base_url, resume)
+        result['first_scored_seconds'] = round(time.perf_counter() - started, 3)
+
+        # Keep sending until every worker has loaded (or inherited) the model
+        pids = children(server.pid)
+        while len(pids) < workers:
+            time.sleep(0.1)
+            pids = children(server.pid)
+        warm = set()
+        for _ in range(workers * 20):
+            post_resume(base_url, resume)
+            _, report = get_json(f'{base_url}/readyz')
+            if report['warm']:
+                warm.add(report['pid'])
+            if warm >= set(pids):
+                break
+
+        per_worker = [smaps(pid) for pid in pids]
+        result['master'] = smaps(server.pid)
+        result['per_worker'] = per_worker
+        result['workers_pss_total'] = sum(w['pss'] for w in per_worker)
+        result['workers_private_total'] = sum(w['private'] for w in per_worker)
+        if inference is not None:
+            result['inference_server'] = smaps(inference.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        if inference is not None:
+            inference.terminate()
+            inference.wait(timeout=30)
+    return result
+
+def mb(value):
+    return f'{value / 1e6:.0f}MB'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--modes', default='preload,off,server', help='comma-separated modes')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = {'import_seconds': round(import_time(), 3), 'modes': []}
+    print(f"app import: {results['import_seconds']:.2f}s")
+
+    resume = sample_docx()
+    for mode in args.modes.split(','):
+        result = run_mode(mode, args.workers, resume)
+        results['modes'].append(result)
+        print(f"{mode:>10}: ready {result['ready_seconds']:.2f}s, first scored {result['first_scored_seconds']:.2f}s, "
+              f"workers PSS {mb(result['workers_pss_total'])}, private {mb(result['workers_private_total'])}, "
+              f"RSS {' / '.join(mb(w['rss']) for w in result['per_worker'])}"
+              + (f", inference server RSS {mb(result['inference_server']['rss'])}" if 'inference_server' in result else ''))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
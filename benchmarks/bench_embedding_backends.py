@@ -0,0 +1,146 @@
+"""
+Embedding backend benchmark: encode latency per backend and how closely the
+hashing backend's similarities agree with the sentence-transformers model
+
+Usage: python benchmarks/bench_embedding_backends.py [--resumes N] [--jds N] [--model NAME]
+
+Resumes and JDs are generated from per-role vocabularies, so every JD has a
+known set of on-role resumes. For each backend the whole corpus is encoded
+in batches of --batch-size texts (best of --repeat runs). Agreement compares
+the JD x resume cosine matrices of the two backends: Pearson and Spearman
+correlation over all pairs, and the mean overlap of each JD's top-k resumes.
+The model backend is skipped (and only latency is reported) when the model
+cannot be loaded.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.embedding_backends import HashingBackend, SentenceTransformerBackend  # noqa: E402
+
+ROLES = {
+    'backend': ['Python', 'Flask', 'Django', 'PostgreSQL', 'REST APIs', 'Docker', 'Redis', 'Celery', 'SQL', 'microservices'],
+    'frontend': ['React', 'TypeScript', 'JavaScript', 'CSS', 'Redux', 'Next.js', 'Webpack', 'accessibility', 'Figma', 'HTML'],
+    'data': ['pandas', 'NumPy', 'scikit-learn', 'SQL', 'Spark', 'Airflow', 'Tableau', 'statistics', 'ETL', 'dashboards'],
+    'ml': ['PyTorch', 'TensorFlow', 'transformers', 'NLP', 'computer vision', 'model training', 'CUDA', 'MLOps', 'embeddings', 'Python'],
+    'devops': ['Kubernetes', 'Terraform', 'AWS', 'CI/CD', 'Prometheus', 'Linux', 'Ansible', 'Docker', 'monitoring', 'Helm'],
+    'mobile': ['Kotlin', 'Swift', 'Android', 'iOS', 'Flutter', 'React Native', 'Jetpack Compose', 'SwiftUI', 'Firebase', 'app store'],
+}
+VERBS = ['Built', 'Designed', 'Shipped', 'Led', 'Optimized', 'Implemented', 'Maintained', 'Migrated']
+OBJECTS = ['a service', 'the platform', 'an internal tool', 'a pipeline', 'the dashboard', 'a feature']
+
+def synthetic_corpus(n_resumes, n_jds, seed=0):
+    """Returns (resumes, resume_roles, jds, jd_roles)"""
+    rng = random.Random(seed)
+    roles = list(ROLES)
+    resumes, resume_roles = [], []
+    for i in range(n_resumes):
+        role = roles[i % len(roles)]
+        # Mostly on-role skills plus some from a random other role
+        skills = rng.sample(ROLES[role], 6) + rng.sample(ROLES[rng.choice(roles)], 2)
+        lines = [f'{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {a} and {b}, '
+                 f'improving throughput by {rng.randint(10, 90)}%' for a, b in zip(skills[::2], skills[1::2])]
+        resumes.append('\n'.join(['EXPERIENCE'] + lines + ['SKILLS', ', '.join(skills)]))
+        resume_roles.append(role)
+    jds, jd_roles = [], []
+    for i in range(n_jds):
+        role = roles[i % len(roles)]
+        skills = rng.sample(ROLES[role], 5)
+        jds.append(f'We are hiring a {role} engineer. Must have {", ".join(skills[:3])}; '
+                   f'nice to have {skills[3]} and {skills[4]}.')
+        jd_roles.append(role)
+    return resumes, resume_roles, jds, jd_roles
+
+def time_encode(backend, texts, batch_size, repeat):
+    backend.encode(texts[:batch_size], batch_size=batch_size)  # warm up
+    best = float('inf')
+    vectors = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        vectors = np.vstack([backend.encode(texts[i:i + batch_size], batch_size=batch_size)
+                             for i in range(0, len(texts), batch_size)])
+        best = min(best, time.perf_counter() - started)
+    return vectors, best
+
+def cosine_matrix(jd_vectors, resume_vectors):
+    def normalize(m):
+        m = np.asarray(m, dtype=np.float64)
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        return m / np.where(norms == 0, 1, norms)
+    return normalize(jd_vectors) @ normalize(resume_vectors).T
+
+def ranks(values):
+    order = np.argsort(values, kind='stable')
+    result = np.empty(len(values))
+    result[order] = np.arange(len(values))
+    return result
+
+def agreement(a, b, top_k):
+    a_flat, b_flat = a.ravel(), b.ravel()
+    top_a = np.argsort(-a, axis=1)[:, :top_k]
+    top_b = np.argsort(-b, axis=1)[:, :top_k]
+    overlap = [len(set(x) & set(y)) / top_k for x, y in zip(top_a, top_b)]
+    return {
+        'pearson': round(float(np.corrcoef(a_flat, b_flat)[0, 1]), 4),
+        'spearman': round(float(np.corrcoef(ranks(a_flat), ranks(b_flat))[0, 1]), 4),
+        f'top{top_k}_overlap': round(float(np.mean(overlap)), 4),
+    }
+
+def on_role_precision(sims, resume_roles, jd_roles, top_k):
+    """Share of each JD's top-k resumes that were generated for the JD's role"""
+    top = np.argsort(-sims, axis=1)[:, :top_k]
+    hits = [sum(resume_roles[j] == role for j in row) / top_k for row, role in zip(top, jd_roles)]
+    return round(float(np.mean(hits)), 4)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=600)
+    parser.add_argument('--jds', type=int, default=30)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--model', default=os.environ.get('AUTOCV_EMBEDDING_MODEL', 'all-MiniLM-L6-v2'),
+                        help='sentence-transformers model name or path')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    resumes, resume_roles, jds, jd_roles = synthetic_corpus(args.resumes, args.jds)
+    texts = jds + resumes
+    backends = [HashingBackend(), SentenceTransformerBackend(args.model)]
+
+    results = {'texts': len(texts), 'backends': {}}
+    sims = {}
+    for backend in backends:
+        try:
+            backend.load()
+        except Exception as e:
+            print(f"{backend.name:>24}: skipped ({e})")
+            continue
+        vectors, seconds = time_encode(backend, texts, args.batch_size, args.repeat)
+        sims[backend.name] = cosine_matrix(vectors[:len(jds)], vectors[len(jds):])
+        entry = {
+            'seconds': round(seconds, 4),
+            'texts_per_second': round(len(texts) / seconds, 1),
+            'on_role_precision': on_role_precision(sims[backend.name], resume_roles, jd_roles, args.top_k),
+        }
+        results['backends'][backend.name] = entry
+        print(f"{backend.name:>24}: {entry['seconds'] * 1000:.1f}ms for {len(texts)} texts "
+              f"({entry['texts_per_second']:.0f}/s), on-role precision@{args.top_k} {entry['on_role_precision']:.2f}")
+
+    if len(sims) == 2:
+        hashing, model = (sims[backend.name] for backend in backends)
+        results['agreement'] = agreement(hashing, model, args.top_k)
+        print('agreement: ' + ', '.join(f'{k} {v:.3f}' for k, v in results['agreement'].items()))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark for core.parser.scan_text against the original per-field regex scans
+
+Usage: python benchmarks/bench_parser_lexer.py [--size CHARS] [--repeat N]
+
+Runs on synthetic resume text of the requested size plus a few adversarial
+inputs that made the old email / phone patterns scan quadratically. The old
+implementation is reproduced here only for comparison.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.parser import scan_text
+
+HEADERS = ['EDUCATION', 'Experience', 'Projects', 'Technical Skills', 'Achievements',
+           'Certifications', 'Summary']
+WORDS = ['built', 'designed', 'python', 'flask', 'api', 'latency', 'reduced', 'team',
+         'users', 'data', 'pipeline', 'sql', 'cloud', 'deployed', 'tests', 'by', '30%']
+
+def legacy_scan(text):
+    """The original extract_contact_info / extract_links / parse_sections"""
+    contact = {'email': None, 'phone': None, 'linkedin': None, 'github': None}
+    match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
+    if match:
+        contact['email'] = match.group()
+    match = re.search(r'\+?[\d\s\-\(\)]{10,}', text)
+    if match:
+        contact['phone'] = match.group().strip()
+    match = re.search(r'linkedin\.com/in/[\w\-]+', text, re.IGNORECASE)
+    if match:
+        contact['linkedin'] = match.group()
+    match = re.search(r'github\.com/[\w\-]+', text, re.IGNORECASE)
+    if match:
+        contact['github'] = match.group()
+    links = re.findall(r'https?://[^\s]+', text)
+
+    section_patterns = {
+        'education': r'(?i)(education|academic|qualification)',
+        'experience': r'(?i)(experience|employment|work history)',
+        'projects': r'(?i)(projects?|portfolio)',
+        'skills': r'(?i)(skills?|technical skills?|competencies)',
+        'achievements': r'(?i)(achievements?|accomplishments?|awards?)',
+        'certifications': r'(?i)(certifications?|certificates?)',
+        'summary': r'(?i)(summary|profile|objective|about)'
+    }
+    sections = {'other': []}
+    current = 'other'
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        for name, pattern in section_patterns.items():
+            if re.match(pattern, line):
+                current = name
+                sections[current] = []
+                break
+        else:
+            sections[current].append(line)
+    for name in sections:
+        sections[name] = '\n'.join(sections[name])
+    return contact, links, sections
+
+def synthetic_resume(size, seed=0):
+    """Resume-shaped text of roughly size characters"""
+    rnd = random.Random(seed)
+    lines = ['Jane Doe', 'Bengaluru | jane.doe@example.com | +91 98765 43210',
+             'linkedin.com/in/jane-doe | https://github.com/janedoe']
+    total = sum(len(line) for line in lines)
+    while total < size:
+        lines.append(rnd.choice(HEADERS))
+        for _ in range(rnd.randint(3, 8)):
+            line = '- ' + ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 16)))
+            if rnd.random() < 0.05:
+                line += ' https://example.com/p/' + str(rnd.randint(1, 999))
+            lines.append(line)
+            total += len(line)
+    return '\n'.join(lines)
+
+def adversarial_inputs(size):
+    return {
+        'email-boundaries': '.a' * (size // 2),
+        'email-at-runs': 'a@' * (size // 4) + 'b.' * (size // 4),
+        'short-digit-runs': '1234 5678x' * (size // 10),
+    }
+
+def best_of(fn, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=300000, help='characters per input')
+    parser.add_argument('--adversarial-size', type=int, default=20000,
+                        help='characters per adversarial input (the old scan is quadratic)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    inputs = {'resume': synthetic_resume(args.size)}
+    inputs.update(adversarial_inputs(args.adversarial_size))
+
+    print(f"{'input':<20}{'chars':>10}{'legacy ms':>12}{'scan ms':>10}{'speedup':>9}")
+    for name, text in inputs.items():
+        assert scan_text(text) == legacy_scan(text), f"output differs on {name}"
+        legacy = best_of(legacy_scan, text, args.repeat)
+        current = best_of(scan_text, text, args.repeat)
+        print(f"{name:<20}{len(text):>10}{legacy * 1000:>12.1f}{current * 1000:>10.1f}{legacy / current:>8.1f}x")
+
+if __name__ == '__main__':
+    main()
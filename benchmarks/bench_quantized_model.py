@@ -0,0 +1,140 @@
+"""
+Accuracy vs. latency report for the CPU inference options of the
+sentence-transformers backend: dynamic int8 quantization and a cap on tokens
+per text, each compared against the full-precision model
+
+Usage: python benchmarks/bench_quantized_model.py [--corpus DIR] [--jds FILE] [--max-seq-lengths 128,256]
+
+--corpus takes a directory of .pdf / .docx / .txt resumes (parsed the way
+uploads are) and --jds a text file with one job description per line;
+without them a synthetic role-labelled corpus is generated. For every
+variant the report gives single-text latency (median over --latency-samples
+texts, as in an interactive request), batched throughput, the size of the
+serialized weights, and how far its JD x resume cosine similarities move
+from the full-precision ones: mean / p99 / max absolute difference,
+Pearson correlation, top-k overlap, and the largest resulting change in the
+skill-match sub-score (similarity counts 60% of it) and the overall score.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config  # noqa: E402
+from core.embedding_backends import SentenceTransformerBackend  # noqa: E402
+from bench_embedding_backends import cosine_matrix, synthetic_corpus  # noqa: E402
+
+def load_corpus(directory):
+    from core.parser import parse_resume
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        ext = name.rsplit('.', 1)[-1].lower()
+        try:
+            if ext == 'txt':
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    texts.append(f.read())
+            elif ext in ('pdf', 'docx'):
+                texts.append(parse_resume(path)['full_text'])
+        except Exception as e:
+            print(f"Warning: skipping {name}: {e}")
+    return [text for text in texts if text.strip()]
+
+def weights_bytes(model):
+    import torch
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf)
+    return buf.tell()
+
+def measure(backend, jds, resumes, batch_size, samples):
+    backend.load()
+    backend.encode(resumes[:2])  # warm up
+    single = []
+    for text in (resumes + jds)[:samples]:
+        started = time.perf_counter()
+        backend.encode([text])
+        single.append(time.perf_counter() - started)
+    texts = jds + resumes
+    started = time.perf_counter()
+    vectors = backend.encode(texts, batch_size=batch_size)
+    batched = time.perf_counter() - started
+    return vectors, {
+        'single_ms_p50': round(float(np.median(single)) * 1000, 2),
+        'batched_texts_per_second': round(len(texts) / batched, 1),
+        'weights_mb': round(weights_bytes(backend.load()) / 1e6, 1),
+    }
+
+def compare(reference, sims, top_k):
+    diff = np.abs(sims - reference)
+    top_ref = np.argsort(-reference, axis=1)[:, :top_k]
+    top = np.argsort(-sims, axis=1)[:, :top_k]
+    skill_points = float(diff.max()) * 0.6 * 100
+    return {
+        'abs_diff_mean': round(float(diff.mean()), 5),
+        'abs_diff_p99': round(float(np.percentile(diff, 99)), 5),
+        'abs_diff_max': round(float(diff.max()), 5),
+        'pearson': round(float(np.corrcoef(reference.ravel(), sims.ravel())[0, 1]), 5),
+        f'top{top_k}_overlap': round(float(np.mean([len(set(a) & set(b)) / top_k for a, b in zip(top_ref, top)])), 4),
+        'max_skill_match_delta': round(skill_points, 2),
+        'max_overall_delta': round(skill_points * config.WEIGHTS['skill_match'], 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default=config.EMBEDDING_MODEL, help='sentence-transformers model name or path')
+    parser.add_argument('--corpus', help='directory of resumes (.pdf, .docx, .txt)')
+    parser.add_argument('--jds', help='file with one job description per line')
+    parser.add_argument('--resumes', type=int, default=300, help='synthetic resumes when --corpus is not given')
+    parser.add_argument('--max-seq-lengths', default='128', help='comma-separated token caps to try (with int8)')
+    parser.add_argument('--batch-size', type=int, default=config.EMBEDDING_BATCH_SIZE)
+    parser.add_argument('--latency-samples', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    synthetic_resumes, _, synthetic_jds, _ = synthetic_corpus(args.resumes, 30)
+    resumes = load_corpus(args.corpus) if args.corpus else synthetic_resumes
+    if args.jds:
+        with open(args.jds, encoding='utf-8') as f:
+            jds = [line.strip() for line in f if line.strip()]
+    else:
+        jds = synthetic_jds
+    top_k = min(args.top_k, len(resumes))
+
+    variants = [('fp32', {}), ('int8', {'quantize': True})]
+    for cap in filter(None, args.max_seq_lengths.split(',')):
+        variants.append((f'int8, seq {cap}', {'quantize': True, 'max_seq_length': int(cap)}))
+
+    results = {'model': args.model, 'resumes': len(resumes), 'jds': len(jds), 'variants': []}
+    print(f"{args.model}: {len(resumes)} resumes x {len(jds)} JDs")
+    reference = None
+    for label, options in variants:
+        backend = SentenceTransformerBackend(args.model, **options)
+        vectors, entry = measure(backend, jds, resumes, args.batch_size, args.latency_samples)
+        sims = cosine_matrix(vectors[:len(jds)], vectors[len(jds):])
+        if reference is None:
+            reference = sims
+        else:
+            entry.update(compare(reference, sims, top_k))
+        entry['variant'] = label
+        results['variants'].append(entry)
+        line = (f"{label:>14}: single {entry['single_ms_p50']:.1f}ms, batched {entry['batched_texts_per_second']:.0f} texts/s, "
+                f"weights {entry['weights_mb']:.0f}MB")
+        if 'pearson' in entry:
+            line += (f", |dsim| mean {entry['abs_diff_mean']:.4f} max {entry['abs_diff_max']:.4f}, "
+                     f"pearson {entry['pearson']:.4f}, top{top_k} overlap {entry[f'top{top_k}_overlap']:.2f}, "
+                     f"overall score moves <= {entry['max_overall_delta']:.2f} pts")
+        print(line)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
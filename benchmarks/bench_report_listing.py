@@ -0,0 +1,173 @@
+"""
+Report listing benchmark: /api/reports read latency on a large table while
+another process keeps writing reports
+
+Usage: python benchmarks/bench_report_listing.py [--reports 1000000] [--seconds 20] [--untuned]
+
+A throwaway SQLite database is filled with synthetic reports spread over a
+year. A writer process then inserts one report per transaction (as the web
+workers and worker.py do) while this process times database.listing
+queries: the first page, pages deep into the listing (via cursors captured
+beforehand), a target_role filter, the score sort and a score range. The
+same deep pages fetched with LIMIT/OFFSET are timed for comparison.
+
+--untuned runs the same load with the rollback journal and without the
+listing indexes, i.e. the settings before the listing API existed.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ROLES = [None, 'SDE Intern', 'Data Analyst', 'ML Engineer', 'Backend Developer']
+LISTING_INDEXES = ('ix_reports_timestamp', 'ix_reports_score', 'ix_reports_role_timestamp', 'ix_reports_role_score')
+
+def synthetic_report(rng, timestamp):
+    return {'id': str(uuid.uuid4()), 'timestamp': timestamp, 'filename': f'resume_{rng.randrange(10**6)}.pdf',
+            'overall_score': round(rng.uniform(20, 95), 1), 'sub_scores': {}, 'feedback': {}, 'evidence': {},
+            'target_role': rng.choice(ROLES)}
+
+def fill(n, seed=0):
+    from database.db import db
+    from database.models import Report
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=365)
+    step = 365 * 86400 / max(n, 1)
+    table = Report.__table__
+    for offset in range(0, n, 20000):
+        rows = [synthetic_report(rng, start + timedelta(seconds=(offset + i) * step))
+                for i in range(min(20000, n - offset))]
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+
+def writer(ready, stop, results, interval):
+    """Insert one report per transaction until stop is set"""
+    from app import app
+    from database.db import db
+    from database.models import Report
+    rng = random.Random(1)
+    latencies, errors = [], 0
+    with app.app_context():
+        table = Report.__table__
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                db.session.execute(table.insert(), [synthetic_report(rng, datetime.utcnow())])
+                db.session.commit()
+                latencies.append(time.perf_counter() - started)
+                ready.set()
+            except Exception:
+                db.session.rollback()
+                errors += 1
+            if interval:
+                time.sleep(interval)
+    results.put({'latencies': latencies, 'errors': errors})
+
+def percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return 'no samples'
+    def pick(q):
+        return samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return f"p50 {pick(0.5):7.2f}ms  p99 {pick(0.99):7.2f}ms  mean {statistics.fmean(samples) * 1000:7.2f}ms  (n={len(samples)})"
+
+def deep_cursors(pages, limit):
+    """Cursors for the given page numbers of the default listing"""
+    from database.db import db
+    from database.listing import encode_cursor
+    from database.models import Report
+    cursors = {}
+    for page in pages:
+        row = (Report.query.with_entities(Report.id, Report.timestamp)
+               .order_by(Report.timestamp.desc(), Report.id.desc())
+               .offset((page - 1) * limit - 1).first())
+        if row is not None:
+            cursors[page] = encode_cursor('timestamp', row)
+    db.session.remove()
+    return cursors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reports', type=int, default=1000000)
+    parser.add_argument('--seconds', type=float, default=20, help='Duration of the read-while-writing phase')
+    parser.add_argument('--limit', type=int, default=50, help='Page size')
+    parser.add_argument('--write-interval-ms', type=float, default=0, help='Pause between writer commits')
+    parser.add_argument('--untuned', action='store_true', help='Rollback journal and no listing indexes')
+    args = parser.parse_args()
+
+    os.environ['AUTOCV_DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    if args.untuned:
+        os.environ['AUTOCV_SQLITE_JOURNAL_MODE'] = 'DELETE'
+    from app import app
+    from database.db import db
+    from database.listing import list_reports
+
+    with app.app_context():
+        started = time.perf_counter()
+        fill(args.reports)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        print(f"inserted {args.reports} reports in {time.perf_counter() - started:.1f}s "
+              f"({db.session.execute(db.text('PRAGMA journal_mode')).scalar()} journal)")
+
+        pages = (10, 100, 1000)
+        cursors = deep_cursors(pages, args.limit)
+        scenarios = [('first page', {})]
+        scenarios += [(f'page {page} (cursor)', {'cursor': cursors[page]}) for page in pages if page in cursors]
+        scenarios += [('target_role filter', {'target_role': 'Data Analyst'}),
+                      ('score sort', {'sort': 'overall_score'}),
+                      ('score range 80-90', {'min_score': 80, 'max_score': 90})]
+        offset_query = db.text('SELECT id, timestamp, filename, overall_score, target_role FROM reports '
+                               'ORDER BY timestamp DESC, id DESC LIMIT :limit OFFSET :offset')
+        # Release the fill connections before the writer starts
+        db.session.remove()
+
+        context = multiprocessing.get_context('spawn')
+        ready, stop, results = context.Event(), context.Event(), context.Queue()
+        process = context.Process(target=writer, args=(ready, stop, results, args.write_interval_ms / 1000))
+        process.start()
+        ready.wait()
+        if args.untuned:
+            # Only now: importing the app (in the writer too) recreates missing indexes
+            for name in LISTING_INDEXES:
+                db.session.execute(db.text(f'DROP INDEX IF EXISTS {name}'))
+            db.session.commit()
+            db.session.remove()
+
+        timings = {label: [] for label, _ in scenarios}
+        timings.update({f'page {page} (offset)': [] for page in pages})
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            for label, kwargs in scenarios:
+                started = time.perf_counter()
+                list_reports(limit=args.limit, **kwargs)
+                timings[label].append(time.perf_counter() - started)
+                db.session.remove()
+            for page in pages:
+                started = time.perf_counter()
+                db.session.execute(offset_query, {'limit': args.limit, 'offset': (page - 1) * args.limit}).all()
+                timings[f'page {page} (offset)'].append(time.perf_counter() - started)
+                db.session.remove()
+
+        stop.set()
+        written = results.get()
+        process.join()
+
+    print(f"\nreads while writing ({args.seconds:.0f}s, {args.limit} per page):")
+    for label, samples in timings.items():
+        print(f"  {label:22s} {percentiles(samples)}")
+    rate = len(written['latencies']) / args.seconds
+    print(f"\nwriter: {rate:.0f} commits/s, {written['errors']} errors")
+    print(f"  {'commit':22s} {percentiles(written['latencies'])}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Report serving benchmark: /api/report/<id> and /report/<id> with the report
+cache disabled, on cache hits and on revalidation (304), plus bytes sent
+
+Usage: python benchmarks/bench_report_serving.py [--reports 200] [--requests 2000]
+
+Reports are real score_resume / compile_full_feedback output for synthetic
+resumes (see bench_report_storage.scored_reports), requested through the
+Flask test client in a random order, as a browser with gzip would.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('AUTOCV_DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+import core.report_cache as report_cache  # noqa: E402
+from app import app  # noqa: E402
+from database.db import db  # noqa: E402
+from database.models import Report  # noqa: E402
+from bench_report_storage import scored_reports  # noqa: E402
+
+def run(client, paths, requests, etags=None):
+    """Mean microseconds per request and mean bytes per response"""
+    rng = random.Random(0)
+    sent = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        path = rng.choice(paths)
+        headers = {'Accept-Encoding': 'gzip'}
+        if etags is not None:
+            headers['If-None-Match'] = etags[path]
+        response = client.get(path, headers=headers)
+        sent += len(response.data)
+    return (time.perf_counter() - started) / requests * 1e6, sent / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reports', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        ids = []
+        for scoring_result, feedback_result in scored_reports(args.reports, 4000):
+            report = Report.from_results(str(uuid.uuid4()), 'resume.pdf', scoring_result, feedback_result,
+                                         'Backend Developer')
+            db.session.add(report)
+            ids.append(report.id)
+        db.session.commit()
+
+    client = app.test_client()
+    for label, prefix in (('api', '/api/report/'), ('page', '/report/')):
+        paths = [prefix + report_id for report_id in ids]
+        report_cache._cache = report_cache.ReportCache(max_bytes=0)
+        uncached, _ = run(client, paths, args.requests)
+        plain = sum(len(client.get(path).data) for path in paths) / len(paths)
+        report_cache._cache = report_cache.ReportCache()
+        run(client, paths, len(paths) * 3)  # warm
+        cached, cached_bytes = run(client, paths, args.requests)
+        etags = {path: client.get(path, headers={'Accept-Encoding': 'gzip'}).headers['ETag'] for path in paths}
+        revalidated, revalidated_bytes = run(client, paths, args.requests, etags)
+        print(f"{label}: no cache {uncached:6.0f}us  cache hit {cached:6.0f}us  304 {revalidated:6.0f}us per request; "
+              f"{plain:.0f} bytes plain, {cached_bytes:.0f} gzipped, {revalidated_bytes:.0f} on 304")
+
+if __name__ == '__main__':
+    main()
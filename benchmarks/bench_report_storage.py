@@ -0,0 +1,144 @@
+"""
+Report storage benchmark: bytes per stored report with and without payload
+compression, and what a compaction pass costs the writers running beside it
+
+Usage: python benchmarks/bench_report_storage.py [--reports 5000] [--size 4000]
+
+Reports are real score_resume / compile_full_feedback output for synthetic
+resumes (bench_parser_lexer.synthetic_resume, hashing backend), stored with
+REPORT_COMPRESSION off and on in two throwaway databases. The uncompressed
+database is then compacted (compress, then expire half of the reports with
+a 30-day retention) while a writer process commits one report per
+transaction; the writer's slowest commits show how long compaction held the
+write lock.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def database_bytes(path):
+    return sum(os.path.getsize(path + suffix) for suffix in ('', '-wal') if os.path.exists(path + suffix))
+
+def scored_reports(n, size):
+    """(scoring_result, feedback_result) pairs for n synthetic resumes"""
+    import config
+    from bench_parser_lexer import synthetic_resume
+    from core.feedback import compile_full_feedback
+    from core.parser import scan_text
+    from core.scorer import score_resume
+
+    config.EMBEDDING_BACKEND = 'hashing'
+    results = []
+    for seed in range(n):
+        text = synthetic_resume(size, seed=seed)
+        contact, links, sections = scan_text(text)
+        resume_data = {'full_text': text, 'sections': sections, 'contact': contact, 'links': links,
+                       'page_count': 1 + seed % 3}
+        scoring_result = score_resume(resume_data, 'Backend Developer')
+        results.append((scoring_result, compile_full_feedback(scoring_result, resume_data)))
+    return results
+
+def store(results, compress):
+    """Save every result as a report, half of them 60 days old; returns seconds"""
+    import config
+    from database.db import db
+    from database.models import Report
+
+    config.REPORT_COMPRESSION = compress
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for i, (scoring_result, feedback_result) in enumerate(results):
+        report = Report.from_results(str(uuid.uuid4()), 'resume.pdf', scoring_result, feedback_result,
+                                     'Backend Developer')
+        report.timestamp = now - timedelta(days=60 if i % 2 else 0)
+        db.session.add(report)
+        if i % 500 == 499:
+            db.session.commit()
+    db.session.commit()
+    return time.perf_counter() - started
+
+def writer(database_url, ready, stop, results):
+    """Insert one small report per transaction until stop is set"""
+    os.environ['AUTOCV_DATABASE_URL'] = database_url
+    from app import app
+    from database.db import db
+    from database.models import Report
+    latencies = []
+    with app.app_context():
+        table = Report.__table__
+        while not stop.is_set():
+            started = time.perf_counter()
+            db.session.execute(table.insert(), [{
+                'id': str(uuid.uuid4()), 'timestamp': datetime.utcnow(), 'filename': 'resume.pdf',
+                'overall_score': 50.0, 'sub_scores': {}, 'feedback': {}, 'evidence': {}}])
+            db.session.commit()
+            latencies.append(time.perf_counter() - started)
+            ready.set()
+            time.sleep(0.005)
+    results.put(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reports', type=int, default=5000)
+    parser.add_argument('--size', type=int, default=4000, help='Characters per synthetic resume')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    paths = {label: os.path.join(directory, f'{label}.db') for label in ('plain', 'compressed')}
+    os.environ['AUTOCV_DATABASE_URL'] = f"sqlite:///{paths['plain']}"
+    os.environ['AUTOCV_REPORT_ARCHIVE_DIR'] = os.path.join(directory, 'archive')
+    from flask import Flask
+    from database.db import db, init_db
+    from database.models import Report
+    from database.retention import compact_reports
+
+    started = time.perf_counter()
+    results = scored_reports(args.reports, args.size)
+    print(f"scored {args.reports} resumes in {time.perf_counter() - started:.1f}s")
+
+    apps = {}
+    for label, path in paths.items():
+        apps[label] = Flask(label)
+        apps[label].config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+        init_db(apps[label])
+        with apps[label].app_context():
+            seconds = store(results, compress=label == 'compressed')
+            db.session.execute(db.text('PRAGMA wal_checkpoint(TRUNCATE)')).all()
+            started = time.perf_counter()
+            for report in Report.query:
+                report.to_dict()
+            read_seconds = time.perf_counter() - started
+            db.session.remove()
+        print(f"{label:11s} {database_bytes(path) / args.reports:8.0f} bytes/report  "
+              f"store {seconds / args.reports * 1e6:6.0f}us  to_dict {read_seconds / args.reports * 1e6:6.0f}us per report")
+
+    # Compact the plain database while another process keeps writing
+    context = multiprocessing.get_context('spawn')
+    ready, stop, queue = context.Event(), context.Event(), context.Queue()
+    process = context.Process(target=writer, args=(f"sqlite:///{paths['plain']}", ready, stop, queue))
+    process.start()
+    ready.wait()
+    with apps['plain'].app_context():
+        stats = compact_reports(retention_days=30, action='archive')
+        db.session.remove()
+    time.sleep(0.2)
+    stop.set()
+    latencies = sorted(queue.get())
+    process.join()
+    print(f"\ncompaction: {stats}")
+    print(f"plain db after compaction: {database_bytes(paths['plain']) / 1024:.0f} KiB "
+          f"(a one-off `flask compact --vacuum` also repacks pages the compressed rows left half empty)")
+    print(f"writer during compaction: {len(latencies)} commits, p50 {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+          f"max {latencies[-1] * 1000:.1f}ms")
+
+if __name__ == '__main__':
+    main()
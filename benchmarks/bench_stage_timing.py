@@ -0,0 +1,73 @@
+"""
+Stage timing overhead: score_resume + compile_full_feedback with
+STAGE_TIMING off and on, and the cost of one stage() block in each mode
+
+Usage: python benchmarks/bench_stage_timing.py [--resumes 200] [--size 4000] [--rounds 3]
+
+Resumes are synthetic (bench_parser_lexer.synthetic_resume) and scored with
+the hashing backend against a role, so the run needs no model. The modes
+alternate per round and the best round of each is reported.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config  # noqa: E402
+from bench_parser_lexer import synthetic_resume  # noqa: E402
+from core import timing  # noqa: E402
+from core.feedback import compile_full_feedback  # noqa: E402
+from core.parser import scan_text  # noqa: E402
+from core.scorer import score_resume  # noqa: E402
+
+def score_all(resumes):
+    started = time.perf_counter()
+    timing.start_request()
+    for resume_data in resumes:
+        compile_full_feedback(score_resume(resume_data, 'Backend Developer'), resume_data)
+    timing.finish_request()
+    return (time.perf_counter() - started) / len(resumes)
+
+def stage_cost(n=200000):
+    timing.start_request()
+    started = time.perf_counter()
+    for _ in range(n):
+        with timing.stage('bench'):
+            pass
+    timing.finish_request()
+    return (time.perf_counter() - started) / n
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--size', type=int, default=4000, help='Characters per synthetic resume')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    config.EMBEDDING_BACKEND = 'hashing'
+    resumes = []
+    for seed in range(args.resumes):
+        text = synthetic_resume(args.size, seed=seed)
+        contact, links, sections = scan_text(text)
+        resumes.append({'full_text': text, 'sections': sections, 'contact': contact, 'links': links,
+                        'page_count': 1})
+    score_all(resumes[:10])  # warm the taxonomy, matcher and role embeddings
+
+    best = {False: float('inf'), True: float('inf')}
+    stage = {}
+    for _ in range(args.rounds):
+        for enabled in (False, True):
+            config.STAGE_TIMING = enabled
+            best[enabled] = min(best[enabled], score_all(resumes))
+            stage[enabled] = stage_cost()
+    off, on = best[False], best[True]
+    print(f"score + feedback: off {off * 1e6:7.0f}us  on {on * 1e6:7.0f}us per resume "
+          f"({(on - off) / off * 100:+.1f}%)")
+    print(f"one stage() block: off {stage[False] * 1e9:.0f}ns  on {stage[True] * 1e9:.0f}ns")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Micro-benchmark suite for the scoring pipeline, with a regression check
+against a stored baseline
+
+Usage: python benchmarks/bench_suite.py [--model] [--sizes 2000,8000] [--filter REGEX] [--repeat 7] [--quick]
+                                        [--output PATH] [--baseline PATH] [--update-baseline]
+                                        [--threshold 0.25] [--min-delta-us 5]
+
+Times parse_pdf, parse_docx, parse_sections, extract_skills,
+encode_resumes, compute_similarity, every score_* function, score_resume
+and compile_full_feedback on deterministic synthetic resumes and a JD of each
+size (benchmarks/corpus.py; PDFs through fpdf2, DOCX through python-docx).
+Each case is timed in batches of at least --min-time seconds, one batch per
+case per round for --repeat rounds (interleaved, so slow drift in machine
+speed hits every case alike), and records the fastest, median and slowest
+time per call; comparisons use the fastest batch, which (as timeit
+recommends) is the least disturbed by other load on the machine. Stage
+timing is off while measuring.
+
+By default every case runs on the hashing embedding backend, so the numbers
+(and benchmarks/baseline.json) leave out model inference. --model is the
+model-backed target: it runs only the embedding cases (MODEL_CASES) on the
+configured model backend (AUTOCV_EMBEDDING_BACKEND, sentence-transformers
+unless set to another model backend), against benchmarks/baseline_model.json
+and results/latest_model.json. It exits 0 with a message when the model
+cannot be loaded (not installed, not downloaded and no network).
+
+Results are written as JSON to --output (benchmarks/results/latest.json).
+When the --baseline file (benchmarks/baseline.json) exists, every case is
+compared against it: a case regresses when its time exceeds the baseline by
+more than --threshold (a fraction; per-case overrides go under "thresholds"
+in the baseline file) and by at least --min-delta-us, and any regression
+makes the exit status 1. --update-baseline stores this run as the baseline.
+Baselines are only comparable on the same machine and Python version.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+import config  # noqa: E402
+import corpus  # noqa: E402
+
+TARGET_ROLE = 'Backend Developer'
+MODEL_CASES = ('encode_resumes', 'compute_similarity', 'score_skill_match', 'score_skill_match_jd', 'score_resume')
+
+def build_cases(sizes):
+    """name -> zero-argument callable, for every size"""
+    from core.feedback import compile_full_feedback
+    from core.matcher import compute_similarity, encode_resumes
+    from core.parser import parse_docx, parse_pdf, parse_sections
+    from core.scorer import (score_ats_compliance, score_education, score_grammar, score_projects, score_resume,
+                             score_skill_match, score_structure)
+    from core.skills import extract_skills
+
+    cases = {}
+    for size in sizes:
+        text = corpus.resume_text(seed=size, size=size)
+        pdf = corpus.resume_pdf(seed=size, size=size)
+        docx = corpus.resume_docx(seed=size, size=size)
+        jd_text = corpus.job_description(seed=size, size=max(1000, size // 2), role=TARGET_ROLE)
+        resume_data = parse_pdf(pdf)
+        scoring_result = score_resume(resume_data, TARGET_ROLE)
+
+        def feedback(scoring_result=scoring_result, resume_data=resume_data):
+            random.seed(0)
+            return compile_full_feedback(scoring_result, resume_data)
+
+        cases.update({
+            f'parse_pdf[{size}]': lambda pdf=pdf: parse_pdf(pdf),
+            f'parse_docx[{size}]': lambda docx=docx: parse_docx(docx),
+            f'parse_sections[{size}]': lambda text=text: parse_sections(text),
+            f'extract_skills[{size}]': lambda text=text: extract_skills(text),
+            f'encode_resumes[{size}]': lambda data=resume_data: encode_resumes([data]),
+            f'compute_similarity[{size}]': lambda text=text, jd_text=jd_text: compute_similarity(text, jd_text),
+            f'score_structure[{size}]': lambda data=resume_data: score_structure(data),
+            f'score_grammar[{size}]': lambda data=resume_data: score_grammar(data),
+            f'score_ats_compliance[{size}]': lambda data=resume_data: score_ats_compliance(data),
+            f'score_skill_match[{size}]': lambda data=resume_data: score_skill_match(data, TARGET_ROLE),
+            f'score_skill_match_jd[{size}]': lambda data=resume_data, jd_text=jd_text: score_skill_match(data, None,
+                                                                                                          jd_text),
+            f'score_projects[{size}]': lambda data=resume_data: score_projects(data),
+            f'score_education[{size}]': lambda data=resume_data: score_education(data),
+            f'score_resume[{size}]': lambda data=resume_data: score_resume(data, TARGET_ROLE),
+            f'compile_full_feedback[{size}]': feedback,
+        })
+    return cases
+
+def calibrate(fn, min_seconds):
+    """(timer, calls per batch) so that one batch takes at least min_seconds"""
+    fn()  # warm caches (taxonomy, role and JD embeddings, regexes)
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_seconds:
+            return timer, number
+        number = max(number * 2, int(number * min_seconds / max(elapsed, 1e-9) * 1.1))
+
+def measure(cases, repeat, min_seconds):
+    """name -> min / median / max microseconds per call, over repeat interleaved rounds"""
+    batches = {name: calibrate(fn, min_seconds) for name, fn in cases.items()}
+    samples = {name: [] for name in cases}
+    for _ in range(repeat):
+        for name, (timer, number) in batches.items():
+            samples[name].append(timer.timeit(number) / number * 1e6)
+    return {name: {'min_us': round(min(times), 3), 'median_us': round(statistics.median(times), 3),
+                   'max_us': round(max(times), 3), 'calls': batches[name][1] * repeat}
+            for name, times in samples.items()}
+
+def machine_info(backend):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'machine': platform.machine(), 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpus': os.cpu_count(), 'backend': backend}
+
+def model_unavailable():
+    """Why the configured backend's model cannot be used, or None if it loaded"""
+    from core.embedding_backends import get_backend
+    try:
+        backend = get_backend()
+        if not backend.requires_model:
+            return f"backend {config.EMBEDDING_BACKEND!r} has no model"
+        backend.load()
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+def compare(results, baseline, threshold, min_delta_us):
+    """Print current vs baseline per case; returns the names of regressed cases"""
+    base_results = baseline.get('results', {})
+    thresholds = baseline.get('thresholds', {})
+    base_meta = baseline.get('meta', {})
+    for key in ('python', 'machine', 'cpus', 'backend'):
+        if base_meta.get(key) != results['meta'].get(key):
+            print(f"note: baseline {key} is {base_meta.get(key)!r}, this run {results['meta'].get(key)!r}; "
+                  f"timings may not be comparable")
+    regressions = []
+    print(f"\n{'case':34s} {'baseline':>11s} {'current':>11s} {'change':>8s}")
+    for name, current in results['results'].items():
+        base = base_results.get(name)
+        if base is None:
+            print(f"{name:34s} {'-':>11s} {current['min_us']:9.1f}us {'new':>8s}")
+            continue
+        change = current['min_us'] / base['min_us'] - 1
+        limit = thresholds.get(name, thresholds.get(name.split('[')[0], threshold))
+        regressed = change > limit and current['min_us'] - base['min_us'] >= min_delta_us
+        flag = '  REGRESSION' if regressed else ('  faster' if change < -limit else '')
+        print(f"{name:34s} {base['min_us']:9.1f}us {current['min_us']:9.1f}us {change * 100:+7.1f}%{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='2000,8000', help='Comma-separated resume sizes in characters')
+    parser.add_argument('--filter', help='Only run cases whose name matches this regex')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.2, help='Seconds per timed batch')
+    parser.add_argument('--quick', action='store_true', help='--repeat 3 --min-time 0.05')
+    parser.add_argument('--model', action='store_true',
+                        help='Model-backed target: the embedding cases on the configured model backend')
+    parser.add_argument('--backend', help='Embedding backend (default: hashing, or the configured model with --model)')
+    parser.add_argument('--output', help='Results file (default: results/latest.json, latest_model.json with --model)')
+    parser.add_argument('--baseline', help='Baseline file (default: baseline.json, baseline_model.json with --model)')
+    parser.add_argument('--update-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown as a fraction')
+    parser.add_argument('--min-delta-us', type=float, default=5.0, help='Ignore slowdowns smaller than this')
+    args = parser.parse_args()
+    if args.quick:
+        args.repeat, args.min_time = 3, 0.05
+    suffix = '_model' if args.model else ''
+    args.output = args.output or os.path.join(HERE, 'results', f'latest{suffix}.json')
+    args.baseline = args.baseline or os.path.join(HERE, f'baseline{suffix}.json')
+    if args.backend is None:
+        model_backend = config.EMBEDDING_BACKEND if config.EMBEDDING_BACKEND != 'hashing' else 'sentence-transformers'
+        args.backend = model_backend if args.model else 'hashing'
+
+    config.EMBEDDING_BACKEND = args.backend
+    config.STAGE_TIMING = False
+    if args.model:
+        reason = model_unavailable()
+        if reason:
+            print(f"skipped: no {args.backend} model to benchmark ({reason})")
+            return
+    sizes = [int(size) for size in args.sizes.split(',')]
+    cases = build_cases(sizes)
+    if args.model:
+        cases = {name: fn for name, fn in cases.items() if name.split('[')[0] in MODEL_CASES}
+    if args.filter:
+        cases = {name: fn for name, fn in cases.items() if re.search(args.filter, name)}
+
+    results = {'meta': machine_info(args.backend), 'settings': {'sizes': sizes, 'repeat': args.repeat,
+                                                                'min_time': args.min_time},
+               'results': {}}
+    started = time.perf_counter()
+    results['results'] = measure(cases, args.repeat, args.min_time)
+    for name, result in results['results'].items():
+        print(f"{name:34s} {result['min_us']:11.1f}us  (median {result['median_us']:.1f}, max {result['max_us']:.1f}, "
+              f"{result['calls']} calls)")
+    print(f"{len(cases)} cases in {time.perf_counter() - started:.0f}s")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.update_baseline:
+        thresholds = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                thresholds = json.load(f).get('thresholds', {})
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(results, thresholds=thresholds), f, indent=2)
+        print(f"baseline updated: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_us)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print('\nno regressions')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Deterministic synthetic resumes and job descriptions for the benchmarks
+
+resume_text(seed, size) builds a plain-text resume of about size characters
+(contact line, summary, skills, experience, projects, education and
+certifications, with taxonomy skills, action verbs and metrics), and
+resume_pdf / resume_docx lay the same text out as a PDF (fpdf2) or DOCX
+(python-docx). job_description(seed, size) builds a JD. The same seed and
+size always give the same text, and the same document bytes.
+"""
+import io
+import json
+import os
+import random
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_NAMES = ['Asha', 'Rahul', 'Maria', 'Chen', 'Fatima', 'Lukas', 'Priya', 'Diego', 'Aiko', 'Samuel']
+LAST_NAMES = ['Sharma', 'Garcia', 'Wei', 'Khan', 'Novak', 'Iyer', 'Okafor', 'Tanaka', 'Silva', 'Brown']
+VERBS = ['Developed', 'Designed', 'Implemented', 'Led', 'Optimized', 'Built', 'Automated', 'Reduced',
+         'Improved', 'Migrated', 'Deployed', 'Created']
+OBJECTS = ['REST API', 'data pipeline', 'recommendation service', 'CI/CD workflow', 'dashboard',
+           'payment gateway', 'search index', 'ETL job', 'mobile backend', 'monitoring stack']
+OUTCOMES = ['reducing latency by {n}%', 'serving {n}k daily users', 'cutting costs by {n}%',
+            'improving accuracy by {n}%', 'handling {n}M events per day', 'saving {n} hours per week']
+FILLER = ['was responsible for maintenance of legacy modules', 'worked closely with the product team',
+          'participated in code reviews and design discussions', 'helped with on-call rotations']
+DEGREES = ['B.Tech in Computer Science', 'Bachelor of Science in Mathematics', 'M.Tech in Data Science',
+           'Master of Computer Applications']
+SCHOOLS = ['IIT Bombay', 'State University', 'NIT Trichy', 'Technical University of Munich']
+CERTIFICATIONS = ['AWS Certified Developer', 'Google Cloud Associate Engineer', 'Certified Kubernetes Administrator',
+                  'Oracle Java Programmer']
+ROLES = ['Backend Developer', 'Data Analyst', 'ML Engineer', 'Frontend Developer', 'Full Stack Developer',
+         'SDE Intern']
+
+_skills = None
+
+def taxonomy_skills():
+    """Every skill of data/skills_taxonomy.json, in file order"""
+    global _skills
+    if _skills is None:
+        with open(os.path.join(ROOT, 'data', 'skills_taxonomy.json')) as f:
+            _skills = [skill for skills in json.load(f).values() for skill in skills]
+    return _skills
+
+def _bullet(rng, skills):
+    thing = rng.choice(OBJECTS)
+    article = 'an' if thing[0] in 'AEIOU' else 'a'
+    text = f"- {rng.choice(VERBS)} {article} {thing} in {rng.choice(skills)}, " \
+           f"{rng.choice(OUTCOMES).format(n=rng.randint(5, 90))}"
+    if rng.random() < 0.2:
+        text += f"; {rng.choice(FILLER)}"
+    return text
+
+def _entry(rng, skills):
+    """A job or project: title line plus two to four bullets"""
+    first, second = rng.sample(skills, 2)
+    lines = [f"{rng.choice(OBJECTS).title()} | {first}, {second} | {rng.randint(2015, 2024)}"]
+    return lines + [_bullet(rng, skills) for _ in range(rng.randint(2, 4))]
+
+def resume_text(seed=0, size=3000):
+    """Plain-text resume of about size characters (never less than the fixed sections)"""
+    rng = random.Random(seed)
+    skills = rng.sample(taxonomy_skills(), 14)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    handle = name.lower().replace(' ', '-')
+    head = [
+        name,
+        f"{handle.replace('-', '.')}@example.com | +91 98{rng.randint(100, 999)} {rng.randint(10000, 99999)}",
+        f"linkedin.com/in/{handle} | github.com/{handle}",
+        '',
+        'Summary',
+        f"{rng.choice(ROLES)} with {rng.randint(1, 9)} years of experience in {', '.join(skills[:3])}.",
+        '',
+        'Technical Skills',
+        ', '.join(skills),
+        '',
+    ]
+    tail = [
+        '',
+        'Education',
+        f"{rng.choice(DEGREES)}, {rng.choice(SCHOOLS)}, {rng.randint(2012, 2023)} - CGPA {rng.randint(70, 98) / 10}",
+        '',
+        'Certifications',
+        f"- {rng.choice(CERTIFICATIONS)}",
+        '',
+        'Achievements',
+        f"- Winner of a {rng.randint(24, 48)}-hour hackathon out of {rng.randint(50, 400)} teams",
+    ]
+    experience = ['Experience']
+    projects = ['', 'Projects']
+    budget = size - sum(len(line) + 1 for line in head + tail)
+    used = 0
+    while used < budget:
+        for block in (experience, projects):
+            entry = _entry(rng, skills)
+            block += entry
+            used += sum(len(line) + 1 for line in entry)
+    return '\n'.join(head + experience + projects + tail)
+
+def job_description(seed=0, size=1500, role=None):
+    """Job description of about size characters"""
+    rng = random.Random(seed + 7919)
+    role = role or rng.choice(ROLES)
+    skills = rng.sample(taxonomy_skills(), 10)
+    lines = [f"{role}", '', 'About the role',
+             f"We are hiring a {role} to work on {rng.choice(OBJECTS)}s used by millions of customers.", '',
+             'Requirements',
+             f"- {rng.randint(1, 6)}+ years of experience with {skills[0]} and {skills[1]}",
+             f"- Hands-on experience with {', '.join(skills[2:6])}", '', 'Responsibilities']
+    while sum(len(line) + 1 for line in lines) < size:
+        lines.append(f"- {rng.choice(VERBS)} and maintain {rng.choice(OBJECTS)}s using {rng.choice(skills)}")
+    lines += ['', 'Nice to have', f"- {', '.join(skills[6:])}"]
+    return '\n'.join(lines)
+
+_PDF_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def resume_pdf(seed=0, size=3000):
+    """resume_text laid out with fpdf2 (Helvetica 10pt, one line per text line, wrapped)"""
+    from fpdf import FPDF
+    pdf = FPDF(format='A4')
+    pdf.set_creation_date(_PDF_DATE)
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font('Helvetica', size=10)
+    for line in resume_text(seed, size).split('\n'):
+        pdf.multi_cell(0, 5, line or ' ', new_x='LMARGIN', new_y='NEXT')
+    return bytes(pdf.output())
+
+def resume_docx(seed=0, size=3000):
+    """resume_text as a DOCX, one paragraph per line (section headers in Heading 1)"""
+    from docx import Document
+    headers = {'Summary', 'Technical Skills', 'Experience', 'Projects', 'Education', 'Certifications',
+               'Achievements'}
+    document = Document()
+    document.core_properties.created = _PDF_DATE.replace(tzinfo=None)
+    document.core_properties.modified = _PDF_DATE.replace(tzinfo=None)
+    for line in resume_text(seed, size).split('\n'):
+        if line in headers:
+            document.add_heading(line, level=1)
+        else:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
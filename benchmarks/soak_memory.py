@@ -0,0 +1,126 @@
+"""
+Memory soak test: replay a resume corpus through score_resume round after
+round and report whether traced allocations and RSS return to baseline,
+with the call sites that grew
+
+Usage: python benchmarks/soak_memory.py [--corpus DIR] [--resumes 50] [--rounds 10] [--warmup 2]
+                                        [--frames 8] [--top 15] [--max-growth-kb N]
+
+With --corpus, every PDF / DOCX in DIR is parsed from its bytes (parse_resume)
+on each round, so PyMuPDF and python-docx are part of the soak; otherwise
+synthetic resumes (bench_parser_lexer.synthetic_resume) go through scan_text.
+Each resume is scored against a role and gets compile_full_feedback, with the
+configured embedding backend (AUTOCV_EMBEDDING_BACKEND=hashing runs without a
+model). The baseline snapshot is taken after the warm-up rounds, once caches
+(taxonomy, role embeddings, regexes) are filled. With --max-growth-kb the
+exit status is 1 when traced memory ends more than that above the baseline.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config  # noqa: E402
+from core.memory import current_rss  # noqa: E402
+
+IGNORED = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+           tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'), tracemalloc.Filter(False, '<unknown>')]
+
+def load_corpus(directory, limit):
+    """(filename, bytes) for the PDF / DOCX files of directory"""
+    files = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().rsplit('.', 1)[-1] in config.ALLOWED_EXTENSIONS:
+            with open(os.path.join(directory, name), 'rb') as f:
+                files.append((name, f.read()))
+    return files[:limit]
+
+def synthetic_corpus(n):
+    from bench_parser_lexer import synthetic_resume
+    return [synthetic_resume(2000 + 500 * (seed % 8), seed=seed) for seed in range(n)]
+
+def replay(corpus, target_role):
+    """One round: parse (or scan), score and compile feedback for every resume"""
+    from core.feedback import compile_full_feedback
+    from core.parser import parse_resume, scan_text
+    from core.scorer import score_resume
+    for item in corpus:
+        if isinstance(item, tuple):
+            filename, data = item
+            resume_data = parse_resume(data, filename.rsplit('.', 1)[1].lower())
+        else:
+            contact, links, sections = scan_text(item)
+            resume_data = {'full_text': item, 'sections': sections, 'contact': contact, 'links': links,
+                           'page_count': 1}
+        scoring_result = score_resume(resume_data, target_role)
+        compile_full_feedback(scoring_result, resume_data)
+
+def snapshot():
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces(IGNORED)
+
+def traced_total(snap):
+    return sum(stat.size for stat in snap.statistics('filename'))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', help='Directory of PDF / DOCX resumes (default: synthetic text resumes)')
+    parser.add_argument('--resumes', type=int, default=50, help='Resumes per round')
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=2, help='Rounds before the baseline snapshot')
+    parser.add_argument('--role', default='Backend Developer')
+    parser.add_argument('--frames', type=int, default=8, help='Stack depth recorded per allocation')
+    parser.add_argument('--top', type=int, default=15, help='Call sites to report')
+    parser.add_argument('--max-growth-kb', type=float, help='Fail when traced memory grows more than this')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.resumes) if args.corpus else synthetic_corpus(args.resumes)
+    if not corpus:
+        parser.error(f'no PDF or DOCX files in {args.corpus}')
+    print(f"{len(corpus)} {'files' if args.corpus else 'synthetic resumes'} per round, "
+          f"{config.EMBEDDING_BACKEND} backend, {args.warmup} warm-up + {args.rounds} rounds")
+
+    tracemalloc.start(args.frames)
+    for _ in range(args.warmup):
+        replay(corpus, args.role)
+    baseline = snapshot()
+    baseline_traced = tracemalloc.get_traced_memory()[0]
+    baseline_rss = current_rss()
+
+    tracemalloc.reset_peak()
+    for round_number in range(1, args.rounds + 1):
+        started = time.perf_counter()
+        replay(corpus, args.role)
+        seconds = time.perf_counter() - started
+        gc.collect()
+        traced, peak = tracemalloc.get_traced_memory()
+        rss = current_rss()
+        rss_note = f"  rss {rss / 2 ** 20:7.1f} MiB ({(rss - baseline_rss) / 1024:+8.0f} KiB)" if rss else ''
+        print(f"round {round_number:3d}: traced {(traced - baseline_traced) / 1024:+8.1f} KiB vs baseline, "
+              f"peak {peak / 2 ** 20:6.1f} MiB{rss_note}  ({seconds:.1f}s)")
+        tracemalloc.reset_peak()
+
+    final = snapshot()
+    growth = traced_total(final) - traced_total(baseline)
+    print(f"\ntraced growth over {args.rounds} rounds: {growth / 1024:+.1f} KiB "
+          f"({growth / 1024 / args.rounds:+.1f} KiB per round)")
+    print(f"top {args.top} call sites by growth:")
+    for stat in final.compare_to(baseline, 'traceback')[:args.top]:
+        if stat.size_diff <= 0:
+            break
+        site, *callers = stat.traceback.format(limit=3, most_recent_first=True)[::2]
+        print(f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} blocks  {site.strip()}")
+        for caller in callers:
+            print(f"  {'':29s}called from  {caller.strip()}")
+    if args.max_growth_kb is not None and growth / 1024 > args.max_growth_kb:
+        print(f"FAIL: traced memory grew {growth / 1024:.1f} KiB (limit {args.max_growth_kb} KiB)")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
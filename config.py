@@ -1,3 +1,4 @@
+import hashlib
 import os
 
 # Scoring weights for each component
@@ -10,19 +11,194 @@ WEIGHTS = {
     'education': 0.05
 }
 
+# Per-role weight overrides: the first key contained in the (lower-cased)
+# target role wins, and components it leaves out keep the WEIGHTS value, e.g.
+#   'data analyst': {'skill_match': 0.35, 'projects': 0.10}
+# Stored reports keep their sub-scores, so after changing weights run
+# `flask --app app rescore` (or POST /api/admin/rescore) instead of re-uploading
+ROLE_WEIGHT_PROFILES = {}
+RESCORE_CHUNK_SIZE = 20000  # reports read and updated per transaction
+
+# Admin endpoints (/api/admin/*) are disabled unless a token is set; send it
+# in the X-Admin-Token header
+ADMIN_TOKEN = os.environ.get('AUTOCV_ADMIN_TOKEN')
+
+# Bump whenever scoring rules change so deduplicated results are recomputed
+SCORING_VERSION = '2'
+
 # Database configuration
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-DB_PATH = f'sqlite:///{os.path.join(BASE_DIR, "autocv.db")}'
+DB_PATH = os.environ.get('AUTOCV_DATABASE_URL', f'sqlite:///{os.path.join(BASE_DIR, "autocv.db")}')
+# SQLite is shared by the web workers and worker.py: WAL lets readers run
+# while a writer commits, and busy_timeout makes a writer wait for the lock
+# instead of failing with "database is locked"
+SQLITE_JOURNAL_MODE = os.environ.get('AUTOCV_SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = 'NORMAL'  # with WAL a crash can lose the last commits but never corrupts the file
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_CACHE_SIZE_KB = 16384  # page cache per connection
+# New databases free space page by page (compaction returns it to the OS in
+# small steps); existing ones switch after one `flask compact --vacuum`
+SQLITE_AUTO_VACUUM = 'INCREMENTAL'
+# Connection pool (per process)
+DB_POOL_SIZE = int(os.environ.get('AUTOCV_DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = 10
+DB_POOL_TIMEOUT = 30  # seconds to wait for a free connection
+DB_POOL_RECYCLE = 3600  # seconds before a connection is replaced
 
 # Model configuration
-EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+# Embedding backend: 'sentence-transformers' (EMBEDDING_MODEL) or 'hashing'
+# (model-free lexical vectors for cheap pre-screening or when the model is
+# unavailable; similarities run lower than the model's, so scores differ)
+EMBEDDING_BACKEND = os.environ.get('AUTOCV_EMBEDDING_BACKEND', 'sentence-transformers')
+DEFAULT_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_MODEL = os.environ.get('AUTOCV_EMBEDDING_MODEL', DEFAULT_EMBEDDING_MODEL)  # name or local path
+HASHING_DIM = 4096  # columns of the hashing backend's vectors (power of two)
+# CPU inference options for the sentence-transformers model: dynamic int8
+# quantization of the Linear layers, and a cap on tokens per text (None keeps
+# the model's own limit). See benchmarks/bench_quantized_model.py
+EMBEDDING_QUANTIZE = os.environ.get('AUTOCV_EMBEDDING_QUANTIZE', '0') == '1'
+EMBEDDING_MAX_SEQ_LENGTH = int(os.environ['AUTOCV_EMBEDDING_MAX_SEQ_LENGTH']) if os.environ.get('AUTOCV_EMBEDDING_MAX_SEQ_LENGTH') else None
+if EMBEDDING_BACKEND != 'sentence-transformers':
+    SCORING_VERSION += f'+{EMBEDDING_BACKEND}'  # keep dedupe results apart per backend
+else:
+    if EMBEDDING_MODEL != DEFAULT_EMBEDDING_MODEL:
+        # Short hash: a local model path can be long (reports.scoring_version is 64 chars)
+        SCORING_VERSION += '+m' + hashlib.sha256(EMBEDDING_MODEL.encode('utf-8')).hexdigest()[:8]
+    SCORING_VERSION += ('+int8' if EMBEDDING_QUANTIZE else '') + (f'+seq{EMBEDDING_MAX_SEQ_LENGTH}' if EMBEDDING_MAX_SEQ_LENGTH else '')
+
+# What of a resume gets embedded: 'budget' fills EMBEDDING_INPUT_TOKENS with
+# sections in EMBEDDING_SECTION_PRIORITY order (the model would silently
+# truncate anything longer), 'chunked' embeds each section on its own, in one
+# batch, and mean-pools the vectors, 'full' sends the whole text as before
+EMBEDDING_INPUT_MODE = os.environ.get('AUTOCV_EMBEDDING_INPUT', 'budget')
+EMBEDDING_INPUT_TOKENS = 224  # estimated word pieces; kept under the model's 256 for estimate error
+EMBEDDING_SECTION_PRIORITY = ['skills', 'experience', 'projects', 'summary', 'achievements',
+                              'certifications', 'education', 'other']
+if EMBEDDING_INPUT_MODE != 'budget':
+    SCORING_VERSION += f'+{EMBEDDING_INPUT_MODE}'
 SPACY_MODEL = 'en_core_web_sm'
 
+# Model loading: 'off' loads lazily on first use, 'background' loads in a
+# thread at startup, 'preload' loads in the gunicorn master before fork
+# (set by gunicorn.conf.py). /readyz reports 503 until warm unless 'off'.
+PREWARM = os.environ.get('AUTOCV_PREWARM', 'off')
+
+# Optional spaCy NER pass in skill extraction: entities that name a taxonomy
+# skill in a form the exact matcher misses (e.g. "NodeJS") are added
+SPACY_ENABLED = os.environ.get('AUTOCV_SPACY', '0') == '1'
+SPACY_EXCLUDE = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter']  # NER only
+SPACY_ENTITY_LABELS = {'PRODUCT', 'ORG'}
+SPACY_BATCH_SIZE = 64  # nlp.pipe batch size for batch scoring
+SPACY_N_PROCESS = 1
+if SPACY_ENABLED:
+    SCORING_VERSION += '+ner'  # NER changes skill matches, so keep its reports apart
+
+# In-process micro-batching: concurrent encode calls in one worker (and the
+# resume + JD of one request) share a forward pass
+EMBEDDING_MICROBATCH = True
+EMBEDDING_MICROBATCH_MAX_WAIT_MS = 5  # how long a batch waits for more requests
+EMBEDDING_MICROBATCH_MAX_SIZE = 64  # texts per forward pass
+
+# Shared inference server (python -m core.inference_server): when the socket
+# is set, web workers send encode requests there instead of loading the model
+EMBEDDING_SERVER_SOCKET = os.environ.get('AUTOCV_EMBEDDING_SOCKET')  # None = encode in-process
+EMBEDDING_SERVER_DEFAULT_SOCKET = '/tmp/autocv-embed.sock'  # used by the server when the env var is unset
+EMBEDDING_SERVER_MAX_BATCH = 64  # texts per coalesced encode call
+EMBEDDING_SERVER_MAX_WAIT_MS = 5  # how long the server waits to fill a batch
+EMBEDDING_SERVER_TIMEOUT = 60  # client socket timeout, seconds
+
+# Embedding cache for repeated JD / role keyword texts (keyed by backend / model)
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'embeddings')
+EMBEDDING_CACHE_MEMORY_SIZE = 512  # entries kept in each process's LRU
+EMBEDDING_CACHE_MAX_DISK_ROWS = 200000  # on-disk tier stops growing past this
+
 # Upload configuration
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
+UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')  # spill directory for large uploads
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_SPOOL_THRESHOLD = 2 * 1024 * 1024  # uploads up to this size never touch the disk
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 
+# Parsing budget: text beyond these limits is ignored
+PDF_MAX_PAGES = 50
+PARSE_MAX_CHARS = 300000
+# Page-parallel PDF extraction for large documents
+PDF_PARALLEL_WORKERS = 2  # processes; 0 or 1 disables
+PDF_PARALLEL_MIN_PAGES = 16  # documents with fewer pages are extracted inline
+PDF_PAGES_PER_TASK = 8
+
+# Resume vector index for ranking stored reports against a JD
+# Cost: uploads with a JD or a known target role reuse the resume embedding of
+# the skill match (no extra forward pass) plus one index row (dim x 2 bytes in
+# float16). Uploads with nothing to match against would need a forward pass of
+# their own, so they are not embedded and cannot be ranked later
+RESUME_INDEX_ENABLED = True
+RESUME_INDEX_DIR = os.path.join(BASE_DIR, 'vector_index')
+RESUME_INDEX_DTYPE = 'float16'  # or 'float32'
+RESUME_INDEX_BLOCK_ROWS = 16384  # rows converted to float32 per matmul block
+RANK_MAX_TOP_K = 500
+RANK_OVERFETCH = 20  # extra hits fetched to cover reports deleted outside retention
+
+# Report listing (/api/reports)
+REPORTS_PAGE_SIZE = 50
+REPORTS_MAX_PAGE_SIZE = 500
+
+# Report responses (/api/report/<id>, /report/<id>): ETag / Last-Modified
+# revalidation, gzip, and a per-process cache of serialized bodies
+REPORT_CACHE_MAX_BYTES = 32 * 1024 * 1024  # per process
+REPORT_CACHE_CONTROL = 'no-cache'  # clients may keep copies but revalidate (a re-score changes the score)
+REPORT_GZIP_LEVEL = 6
+REPORT_GZIP_MIN_BYTES = 512  # smaller bodies are sent as they are
+REPORT_RENDER_VERSION = '1'  # bump when to_dict() or report.html change, to invalidate client copies
+
+# Report storage: feedback / evidence / bullet rewrites as one zlib blob
+REPORT_COMPRESSION = os.environ.get('AUTOCV_REPORT_COMPRESSION', '1') == '1'
+REPORT_COMPRESSION_LEVEL = 6
+
+# Retention and compaction (database/retention.py; worker.py runs it every
+# REPORT_COMPACTION_INTERVAL seconds, `flask compact` on demand)
+REPORT_RETENTION_DAYS = int(os.environ.get('AUTOCV_REPORT_RETENTION_DAYS', '0'))  # 0 = keep forever
+REPORT_RETENTION_ACTION = os.environ.get('AUTOCV_REPORT_RETENTION_ACTION', 'archive')  # or 'purge'
+REPORT_ARCHIVE_DIR = os.environ.get('AUTOCV_REPORT_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
+REPORT_COMPACTION_INTERVAL = 3600  # 0 = worker.py never compacts
+COMPACTION_BATCH_SIZE = 500  # rows per transaction
+COMPACTION_PAUSE_MS = 50  # between transactions, so writers get the lock
+COMPACTION_VACUUM_PAGES = 2000  # free pages released per incremental vacuum step
+
+# Stage timing (core/timing.py): per-stage histograms on /metrics and a
+# Server-Timing header on responses (browser devtools show it per request)
+STAGE_TIMING = os.environ.get('AUTOCV_STAGE_TIMING', '1') == '1'
+SERVER_TIMING_HEADER = os.environ.get('AUTOCV_SERVER_TIMING', '1') == '1'  # turn off to hide stage names from clients
+
+# Request profiling (core/profiling.py): admins send X-Profile: 1 with their
+# token to profile one request; PROFILE_SAMPLE_RATE profiles a random share
+# of uploads. Dumps are listed under /api/admin/profiles
+PROFILE_SAMPLE_RATE = float(os.environ.get('AUTOCV_PROFILE_SAMPLE_RATE', '0'))  # e.g. 0.01 = 1% of uploads
+PROFILE_ENDPOINTS = ('score_resume_api', 'upload', 'score_batch_api')  # eligible for sampling
+PROFILE_MIN_MS = int(os.environ.get('AUTOCV_PROFILE_MIN_MS', '0'))  # sampled profiles faster than this are dropped
+PROFILE_DIR = os.environ.get('AUTOCV_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_MAX_FILES = 50  # newest profiles kept per PROFILE_DIR
+
+# Memory accounting (core/memory.py): tracemalloc peaks and RSS changes per
+# stage and per request on /metrics. Needs STAGE_TIMING; costs noticeable CPU
+MEMORY_ACCOUNTING = os.environ.get('AUTOCV_MEMORY_ACCOUNTING', '0') == '1'
+MEMORY_STAGES = ('parse_pdf', 'parse_docx', 'skills', 'match', 'encode', 'score')
+MEMORY_TRACE_FRAMES = 1  # stack depth tracemalloc keeps per allocation (soak_memory.py asks for more)
+
+# Background job queue (run `python worker.py`)
+ASYNC_JOBS = os.environ.get('AUTOCV_ASYNC_JOBS', '0') == '1'  # queue uploads instead of scoring in the request
+JOB_WORKERS = int(os.environ.get('AUTOCV_JOB_WORKERS', '2'))
+JOB_INTERACTIVE_WORKERS = 1  # workers reserved for the interactive lane (capped so one worker still takes bulk)
+JOB_POLL_INTERVAL = 0.5  # seconds an idle worker waits before polling again
+JOB_STALE_AFTER = 600  # seconds before a 'running' job is presumed orphaned
+JOB_MAX_ATTEMPTS = 3
+JOB_PAGE_REFRESH = 2  # seconds between refreshes of the job status page
+
+# Batch scoring (/api/score-batch)
+MAX_BATCH_UPLOAD_SIZE = 200 * 1024 * 1024  # 200MB per batch request
+BATCH_CHUNK_SIZE = 16  # resumes embedded and committed together
+EMBEDDING_BATCH_SIZE = 32  # batch_size passed to model.encode
+
 # Skills taxonomy path
 SKILLS_TAXONOMY_PATH = os.path.join(BASE_DIR, 'data', 'skills_taxonomy.json')
 
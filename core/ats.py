@@ -1,39 +1,49 @@
 import re
 import config
 
+STANDARD_HEADERS = ['education', 'experience', 'projects', 'skills']
+CONTACT_FIELDS = ['email', 'phone', 'linkedin', 'github']
+HEADER_POINTS = 15  # per standard header, max 60
+CONTACT_POINTS = 10  # per contact field, max 40
+MIN_STANDARD_HEADERS = 3
+
+def standard_headers_present(resume_data):
+    """STANDARD_HEADERS sections that have content"""
+    sections = resume_data.get('sections', {})
+    return [section for section in STANDARD_HEADERS if section in sections and sections[section].strip()]
+
+def ats_features(resume_data):
+    """Header count and contact flags the ATS score is computed from"""
+    contact = resume_data.get('contact', {})
+    features = {'ats_headers': len(standard_headers_present(resume_data))}
+    for field in CONTACT_FIELDS:
+        features[f'has_{field}'] = int(contact.get(field) is not None)
+    return features
+
+def ats_points(headers, contacts):
+    """
+    Uncapped ATS score from the header count and the number of contact fields
+    Works on scalars and on numpy columns (core.bulk)
+    """
+    return headers * HEADER_POINTS + contacts * CONTACT_POINTS
+
 def check_ats_compliance(resume_data):
     """
     Check ATS (Applicant Tracking System) compliance
-    Returns dict with compliance checks and score
+    Returns dict with compliance checks, score and the ats_features it is based on
     """
+    features = ats_features(resume_data)
     checks = {
         'has_text_layer': True,  # PDF parsing succeeded
         'is_parsable': True,
-        'standard_headers_present': [],
+        'standard_headers_present': [section.title() for section in standard_headers_present(resume_data)],
         'fonts_ok': True,  # Assume OK if parsed successfully
-        'contact_info_complete': {},
+        'contact_info_complete': {field: bool(features[f'has_{field}']) for field in CONTACT_FIELDS},
         'issues': []
     }
     
-    sections = resume_data.get('sections', {})
-    contact = resume_data.get('contact', {})
-    
-    # Check for standard section headers
-    standard_sections = ['education', 'experience', 'projects', 'skills']
-    for section in standard_sections:
-        if section in sections and sections[section].strip():
-            checks['standard_headers_present'].append(section.title())
-    
-    # Check contact information completeness
-    checks['contact_info_complete'] = {
-        'email': contact.get('email') is not None,
-        'phone': contact.get('phone') is not None,
-        'linkedin': contact.get('linkedin') is not None,
-        'github': contact.get('github') is not None
-    }
-    
     # Identify issues
-    if len(checks['standard_headers_present']) < 3:
+    if features['ats_headers'] < MIN_STANDARD_HEADERS:
         checks['issues'].append('Missing standard section headers')
     
     if not checks['contact_info_complete']['email']:
@@ -43,11 +53,11 @@ def check_ats_compliance(resume_data):
         checks['issues'].append('Phone number not found')
     
     # Calculate ATS score (0-100)
-    score = 0
-    score += len(checks['standard_headers_present']) * 15  # Max 60 for 4 sections
-    score += sum(checks['contact_info_complete'].values()) * 10  # Max 40 for 4 contact fields
+    contacts = sum(features[f'has_{field}'] for field in CONTACT_FIELDS)
+    score = ats_points(features['ats_headers'], contacts)
     
     return {
         'score': min(100, score),
-        'checks': checks
+        'checks': checks,
+        'features': features
     }
@@ -0,0 +1,119 @@
+import numpy as np
+from core.ats import CONTACT_FIELDS, ats_features, ats_points
+from core.features import FEATURE_NAMES, overall_scores, weight_row
+from core.matcher import build_match_context, encode_resumes, match_role_to_resume
+from core.scorer import (OPTIONAL_SECTIONS, REQUIRED_SECTIONS, education_features, grammar_features,
+                         projects_features, structure_features, weights_for_role)
+
+# Bulk scoring: one FEATURE_NAMES row per resume, stacked into a float64
+# matrix, then every sub-score and the overall score as array operations.
+# The text scans are the feature functions score_resume itself uses; the
+# rules below restate the score_* thresholds over whole columns (the ATS
+# points come from core.ats itself), and results match score_resume exactly
+# (tests/test_bulk.py). A rule change in core.scorer must be mirrored in
+# score_feature_matrix.
+
+_COLUMN = {name: index for index, name in enumerate(FEATURE_NAMES)}
+
+def extract_features(resume_data, match_result=None):
+    """Feature dict for one resume; match_result is match_role_to_resume output"""
+    features = {}
+    features.update(structure_features(resume_data))
+    features.update(grammar_features(resume_data))
+    features.update(ats_features(resume_data))
+    features.update(projects_features(resume_data))
+    features.update(education_features(resume_data))
+    if match_result is not None:
+        features.update(semantic_similarity=match_result['semantic_similarity'],
+                        keyword_coverage=match_result['keyword_coverage'],
+                        matched_skills=len(match_result['matched_skills']))
+    return features
+
+def feature_matrix(resume_datas, target_role=None, jd_text=None, match_context=None, resume_embeddings=None,
+                   resume_skills=None):
+    """
+    Stack one FEATURE_NAMES row per parsed resume
+    The skill-match columns are computed for the whole list at once: one
+    shared match context, one batched embedding pass and one batched skill
+    extraction, unless they are passed in
+    Returns an (n, len(FEATURE_NAMES)) float64 matrix
+    """
+    has_target = bool(match_context or target_role or jd_text)
+    if match_context is None and has_target:
+        match_context = build_match_context(target_role, jd_text)
+    if resume_embeddings is None and match_context and match_context['embedding'] is not None:
+        resume_embeddings = encode_resumes(resume_datas)
+    if resume_skills is None:
+        from core.skills import extract_skills_batch
+        resume_skills = extract_skills_batch([resume_data.get('full_text', '') for resume_data in resume_datas])
+
+    matrix = np.zeros((len(resume_datas), len(FEATURE_NAMES)), dtype=np.float64)
+    for row, resume_data in enumerate(resume_datas):
+        match_result = match_role_to_resume(
+            resume_data, target_role, jd_text, match_context=match_context,
+            resume_embedding=resume_embeddings[row] if resume_embeddings is not None else None,
+            resume_skills=resume_skills[row])
+        features = extract_features(resume_data, match_result)
+        features['has_target'] = has_target
+        for name, value in features.items():
+            matrix[row, _COLUMN[name]] = value
+    return matrix
+
+def _round1(values):
+    # Python's round, not np.round: np.round scales by 10 first and can land
+    # on the other side of a tie (0.15 -> 0.2 where round gives 0.1)
+    return np.array([round(value, 1) for value in values.tolist()], dtype=np.float64)
+
+def score_feature_matrix(matrix, target_role=None):
+    """
+    Sub-scores and overall scores for a feature matrix, as score_resume computes them
+    Returns ((n, 6) sub-score matrix in SUB_SCORE_KEYS order, list of overall scores)
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    def column(name):
+        return matrix[:, _COLUMN[name]]
+
+    pages = column('page_count')
+    structure = ((column('required_sections') / len(REQUIRED_SECTIONS)) * 60
+                 + np.where((pages == 1) | (pages == 2), 20, np.where(pages == 3, 10, 0))
+                 + (column('optional_sections') / len(OPTIONAL_SECTIONS)) * 20)
+
+    verbs, passive, numbers = column('action_verbs'), column('passive_phrases'), column('numbers')
+    grammar = (100
+               - np.where(verbs >= 10, 0, np.where(verbs >= 5, 20, 40))
+               - np.where(passive > 5, 30, np.where(passive > 2, 15, 0))
+               - np.where(numbers >= 5, 0, np.where(numbers >= 2, 15, 30)))
+
+    contacts = sum(column(f'has_{field}') for field in CONTACT_FIELDS)
+    ats = ats_points(column('ats_headers'), contacts)
+
+    skill = (column('semantic_similarity') * 0.6 + column('keyword_coverage') * 0.4) * 100
+
+    count, tech, metrics = column('project_count'), column('tech_mentions'), column('project_metrics')
+    projects = column('has_projects') * (np.where(count >= 3, 40, np.where(count >= 2, 30, 15))
+                                         + np.where(tech >= 5, 30, np.where(tech >= 3, 20, 10))
+                                         + np.where(metrics >= 3, 30, np.where(metrics >= 1, 15, 5)))
+
+    education = column('has_education') * (np.where(column('has_degree') > 0, 50, 20)
+                                           + column('has_gpa') * 20
+                                           + column('has_certifications') * 15
+                                           + column('has_achievements') * 15)
+
+    sub_scores = np.column_stack([
+        _round1(np.minimum(100, structure)),
+        _round1(np.maximum(0, grammar)),
+        _round1(np.minimum(100, ats)),
+        _round1(skill),
+        _round1(np.minimum(100, projects)),
+        _round1(np.minimum(100, education)),
+    ])
+    return sub_scores, overall_scores(sub_scores, weight_row(weights_for_role(target_role)))
+
+def bulk_score(resume_datas, target_role=None, jd_text=None, match_context=None):
+    """
+    Score many parsed resumes against one role / JD
+    Returns {'features', 'sub_scores', 'overall_scores'} with one row per resume
+    """
+    matrix = feature_matrix(resume_datas, target_role, jd_text, match_context=match_context)
+    sub_scores, overall = score_feature_matrix(matrix, target_role)
+    return {'features': matrix, 'sub_scores': sub_scores, 'overall_scores': overall}
@@ -0,0 +1,140 @@
+import re
+import threading
+import time
+import zlib
+import numpy as np
+import config
+from core import runtime
+
+# Embedding backends, selected by config.EMBEDDING_BACKEND. Each one exposes:
+#   name            namespace for the embedding cache and the resume index, so
+#                   vectors from different backends never mix
+#   requires_model  whether load() pulls a model into memory
+#   cacheable       whether encode() is costly enough to go through the cache
+#   load()          load any model up front (no-op for model-free backends)
+#   encode(texts, batch_size=None) -> float32 array of shape (len(texts), dim)
+
+class SentenceTransformerBackend:
+    """
+    Dense embeddings from a sentence-transformers model, loaded on first use
+    quantize swaps the Linear layers for dynamic int8 ones (weights stored as
+    int8, activations quantized per batch) and max_seq_length truncates texts
+    to that many tokens; both trade a little accuracy for CPU time
+    """
+
+    requires_model = True
+    cacheable = True
+
+    def __init__(self, model_name, quantize=False, max_seq_length=None):
+        self.model_name = model_name
+        self.quantize = quantize
+        self.max_seq_length = max_seq_length
+        # Vectors from different variants must not share a cache or an index
+        self.name = model_name + ('+int8' if quantize else '') + (f'+seq{max_seq_length}' if max_seq_length else '')
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    print(f"Loading embedding model: {self.name}")
+                    started = time.perf_counter()
+                    # Imported here so importing the app does not pull in torch
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer(self.model_name, device='cpu' if self.quantize else None)
+                    if self.max_seq_length:
+                        model.max_seq_length = min(self.max_seq_length, model.max_seq_length or self.max_seq_length)
+                    if self.quantize:
+                        import torch
+                        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+                    model.eval()
+                    self._model = model
+                    runtime.record_model_load('embedding', time.perf_counter() - started)
+        return self._model
+
+    def encode(self, texts, batch_size=None):
+        import torch
+        model = self.load()
+        # inference_mode also skips the version counters no_grad still keeps
+        with torch.inference_mode():
+            if batch_size is None:
+                return model.encode(texts)
+            return model.encode(texts, batch_size=batch_size)
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]')
+_STOPWORDS = frozenset('''
+a an and are as at be by for from has have i in is it its my of on or our that the their this to
+was we were will with you your
+'''.split())
+
+class HashingBackend:
+    """
+    Model-free lexical embeddings: signed feature hashing of word unigrams and
+    bigrams with sublinear term frequency, L2-normalized
+    Deterministic across processes (crc32, not Python's salted hash), needs no
+    download and encodes a whole batch with one NumPy bincount. There is no
+    corpus IDF, so the vectors are stateless; common words are dropped instead.
+    """
+
+    requires_model = False
+    cacheable = False
+
+    def __init__(self, dim=None):
+        self.dim = dim or config.HASHING_DIM
+        if self.dim & (self.dim - 1):
+            raise ValueError('HASHING_DIM must be a power of two')
+        self.name = f'hashing-{self.dim}-v1'
+
+    def load(self):
+        return None
+
+    def _features(self, text):
+        tokens = [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+        return tokens + [f'{first} {second}' for first, second in zip(tokens, tokens[1:])]
+
+    def encode(self, texts, batch_size=None):
+        mask = self.dim - 1
+        hashed = {}  # feature -> signed column, computed once per batch
+        rows, columns, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                value = hashed.get(feature)
+                if value is None:
+                    digest = zlib.crc32(feature.encode('utf-8'))
+                    # Low bits pick the column, the top bit the sign
+                    value = hashed[feature] = ((digest & mask), 1.0 if digest >> 31 else -1.0)
+                rows.append(row)
+                columns.append(value[0])
+                signs.append(value[1])
+
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + np.asarray(columns, dtype=np.int64)
+        counts = np.bincount(flat, weights=np.asarray(signs), minlength=len(texts) * self.dim)
+        vectors = counts.reshape(len(texts), self.dim)
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+BACKENDS = {
+    'sentence-transformers': lambda: SentenceTransformerBackend(config.EMBEDDING_MODEL, quantize=config.EMBEDDING_QUANTIZE,
+                                                                max_seq_length=config.EMBEDDING_MAX_SEQ_LENGTH),
+    'hashing': lambda: HashingBackend(),
+}
+
+_backend = None
+_backend_key = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """Return the process-wide backend for the current config"""
+    global _backend, _backend_key
+    key = (config.EMBEDDING_BACKEND, config.EMBEDDING_MODEL, config.HASHING_DIM,
+           config.EMBEDDING_QUANTIZE, config.EMBEDDING_MAX_SEQ_LENGTH)
+    with _backend_lock:
+        if _backend is None or _backend_key != key:
+            if config.EMBEDDING_BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown embedding backend {config.EMBEDDING_BACKEND!r}; "
+                                 f"choose one of {', '.join(BACKENDS)}")
+            _backend = BACKENDS[config.EMBEDDING_BACKEND]()
+            _backend_key = key
+        return _backend
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+import config
+
+class EmbeddingCache:
+    """
+    Content-hashed embedding cache with two tiers:
+    - a bounded in-memory LRU per process
+    - an on-disk float32 matrix (memory-mapped for reads) plus an SQLite hash
+      index, shared by every worker process and kept across restarts
+
+    Each namespace (embedding model) gets its own directory, so changing the
+    model never serves stale vectors. The process lock only guards the LRU;
+    disk reads and writes go through a connection per thread, and sqlite's
+    BEGIN IMMEDIATE serializes writers across threads and processes alike.
+    """
+
+    def __init__(self, namespace, directory=None, memory_size=None, max_disk_rows=None):
+        self.namespace = namespace
+        root = directory or config.EMBEDDING_CACHE_DIR
+        slug = hashlib.sha256(namespace.encode('utf-8')).hexdigest()[:16]
+        self.directory = os.path.join(root, slug)
+        self.memory_size = memory_size if memory_size is not None else config.EMBEDDING_CACHE_MEMORY_SIZE
+        self.max_disk_rows = max_disk_rows if max_disk_rows is not None else config.EMBEDDING_CACHE_MAX_DISK_ROWS
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._dim = None
+        self._mmap = None
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def key(self, text):
+        """Hash text together with the namespace"""
+        return hashlib.sha256((self.namespace + '\0' + text).encode('utf-8')).digest()
+
+    # ----- disk tier -----
+
+    def _connect(self):
+        """Open the index lazily, once per thread (connections do not survive fork)"""
+        pid = os.getpid()
+        if pid != self._pid:
+            self._local = threading.local()
+            self._pid = pid
+            self._mmap = None
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.directory, 'index.db'),
+                               timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS vectors (hash BLOB PRIMARY KEY, row INTEGER NOT NULL)')
+        conn.execute('INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)', ('namespace', self.namespace))
+
+        self._local.conn = conn
+        return conn
+
+    def _vectors_path(self):
+        return os.path.join(self.directory, 'vectors.f32')
+
+    def _load_dim(self, conn):
+        if self._dim is None:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+            if row:
+                self._dim = int(row[0])
+        return self._dim
+
+    def _read_row(self, row):
+        """Read one vector through a read-only memmap, remapping if the file grew"""
+        mmap = self._mmap
+        if mmap is None or row >= mmap.shape[0]:
+            size = os.path.getsize(self._vectors_path())
+            rows = size // (self._dim * 4)
+            if row >= rows:
+                return None
+            mmap = self._mmap = np.memmap(self._vectors_path(), dtype=np.float32, mode='r', shape=(rows, self._dim))
+        return np.array(mmap[row])
+
+    def _disk_get(self, key):
+        conn = self._connect()
+        if self._load_dim(conn) is None:
+            return None
+        row = conn.execute('SELECT row FROM vectors WHERE hash = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return self._read_row(row[0])
+
+    def _disk_put(self, items):
+        """Append new vectors; BEGIN IMMEDIATE serializes writers across processes"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            dim = self._load_dim(conn)
+            if dim is None:
+                dim = int(items[0][1].shape[-1])
+                conn.execute("INSERT INTO meta (key, value) VALUES ('dim', ?)", (str(dim),))
+                self._dim = dim
+
+            path = self._vectors_path()
+            row_bytes = dim * 4
+            mode = 'r+b' if os.path.exists(path) else 'wb'
+            with open(path, mode) as f:
+                # Start at the last whole row so a torn write from a crashed
+                # process is overwritten rather than shifting every offset
+                f.seek(0, os.SEEK_END)
+                next_row = f.tell() // row_bytes
+                if next_row >= self.max_disk_rows:
+                    conn.execute('COMMIT')
+                    return
+
+                f.seek(next_row * row_bytes)
+                for key, vector in items:
+                    exists = conn.execute('SELECT 1 FROM vectors WHERE hash = ?', (key,)).fetchone()
+                    if exists:
+                        continue
+                    f.write(np.asarray(vector, dtype=np.float32).reshape(dim).tobytes())
+                    conn.execute('INSERT INTO vectors (hash, row) VALUES (?, ?)', (key, next_row))
+                    next_row += 1
+                f.truncate()
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    # ----- public API -----
+
+    def encode(self, texts, encode_fn):
+        """
+        Return embeddings for texts as a float32 array, calling encode_fn only
+        for texts that are in neither tier (in one batched call)
+        """
+        keys = [self.key(text) for text in texts]
+        vectors = [None] * len(texts)
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    vectors[i] = vector
+                    self.stats['memory_hits'] += 1
+
+        disk_hits = []
+        for i, key in enumerate(keys):
+            if vectors[i] is not None:
+                continue
+            try:
+                vector = self._disk_get(key)
+            except sqlite3.Error as e:
+                print(f"Warning: embedding cache read failed: {e}")
+                vector = None
+            if vector is not None:
+                vectors[i] = vector
+                disk_hits.append((key, vector))
+        if disk_hits:
+            with self._lock:
+                for key, vector in disk_hits:
+                    self._remember(key, vector)
+                self.stats['disk_hits'] += len(disk_hits)
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Duplicate texts within one call are encoded once
+            unique = list(OrderedDict.fromkeys(keys[i] for i in missing))
+            first_index = {}
+            for i in missing:
+                first_index.setdefault(keys[i], i)
+            encoded = np.asarray(encode_fn([texts[first_index[key]] for key in unique]), dtype=np.float32)
+
+            fresh = list(zip(unique, encoded))
+            with self._lock:
+                for key, vector in fresh:
+                    self._remember(key, vector)
+                self.stats['misses'] += len(missing)
+            try:
+                self._disk_put(fresh)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Warning: embedding cache write failed: {e}")
+
+            by_key = dict(zip(unique, encoded))
+            for i in missing:
+                vectors[i] = by_key[keys[i]]
+
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_embedding_cache(namespace):
+    """Return the process-wide cache, replacing it when the namespace changes"""
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.namespace != namespace:
+            _cache = EmbeddingCache(namespace)
+        return _cache
+
+def cache_stats():
+    """Hit/miss counters for the current cache (empty if never used)"""
+    if _cache is None:
+        return {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'memory_entries': 0}
+    stats = dict(_cache.stats)
+    stats['memory_entries'] = len(_cache._memory)
+    return stats
@@ -0,0 +1,67 @@
+import numpy as np
+
+# Compact per-report copies of what scoring produced and consumed, so stored
+# reports can be re-weighted without the original file:
+#   score vector  the six sub-scores as used for overall_score, float64 in
+#                 SUB_SCORE_KEYS order (48 bytes)
+#   features      the counts and flags the scoring rules read, float32 in
+#                 FEATURE_NAMES order. Append new names at the end only:
+#                 older blobs are shorter and simply lack the new features.
+
+SUB_SCORE_KEYS = ('structure_formatting', 'grammar_clarity', 'ats_compliance',
+                  'skill_match', 'projects_impact', 'education_achievements')
+WEIGHT_KEYS = ('structure', 'grammar', 'ats', 'skill_match', 'projects', 'education')  # config.WEIGHTS key per sub-score
+
+FEATURE_NAMES = (
+    # structure
+    'required_sections', 'optional_sections', 'page_count',
+    # grammar
+    'action_verbs', 'passive_phrases', 'numbers',
+    # ATS
+    'ats_score',
+    # skill match
+    'has_target', 'semantic_similarity', 'keyword_coverage', 'matched_skills',
+    # projects
+    'has_projects', 'project_count', 'tech_mentions', 'project_metrics',
+    # education
+    'has_education', 'has_degree', 'has_gpa', 'has_certifications', 'has_achievements',
+    # ATS inputs
+    'ats_headers', 'has_email', 'has_phone', 'has_linkedin', 'has_github',
+)
+
+_SCORE_DTYPE = np.dtype('<f8')
+_FEATURE_DTYPE = np.dtype('<f4')
+
+def pack_scores(sub_scores):
+    """Score vector blob for a sub_scores dict"""
+    return np.array([sub_scores[key] for key in SUB_SCORE_KEYS], dtype=_SCORE_DTYPE).tobytes()
+
+def score_matrix(blobs):
+    """Stack score vector blobs into an (n, 6) float64 matrix"""
+    return np.frombuffer(b''.join(blobs), dtype=_SCORE_DTYPE).reshape(-1, len(SUB_SCORE_KEYS))
+
+def pack_features(features):
+    """Feature blob for a dict filled by score_resume (missing names are 0)"""
+    return np.array([float(features.get(name, 0)) for name in FEATURE_NAMES], dtype=_FEATURE_DTYPE).tobytes()
+
+def unpack_features(blob):
+    """Feature dict from a blob written by pack_features"""
+    return dict(zip(FEATURE_NAMES, np.frombuffer(blob, dtype=_FEATURE_DTYPE).tolist()))
+
+def weight_row(weights):
+    """A config.WEIGHTS-style dict as a vector aligned with SUB_SCORE_KEYS"""
+    return np.array([weights[key] for key in WEIGHT_KEYS], dtype=np.float64)
+
+def overall_scores(scores, weights):
+    """
+    Vectorized compute_overall_score over an (n, 6) score matrix and an
+    (n, 6) or (6,) weight matrix
+    Columns are added in the same order as compute_overall_score and rounded
+    with Python's round, so results match it exactly
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), scores.shape)
+    totals = scores[:, 0] * weights[:, 0]
+    for column in range(1, scores.shape[1]):
+        totals = totals + scores[:, column] * weights[:, column]
+    return [round(total, 1) for total in totals.tolist()]
@@ -1,4 +1,5 @@
 import random
+from core.timing import timed
 
 def generate_feedback(scoring_result, resume_data):
     """
@@ -147,6 +148,7 @@ def rewrite_bullet(bullet):
     else:
         return "Developed " + bullet.replace('Worked on', '').replace('worked on', '').strip() + " with measurable impact"
 
+@timed('feedback')
 def compile_full_feedback(scoring_result, resume_data):
     """
     Compile complete feedback report with suggestions and rewrites
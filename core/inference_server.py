@@ -0,0 +1,203 @@
+"""
+Local inference server: one process owns the embedding model and serves
+encode requests from the web workers over a Unix domain socket
+
+    python -m core.inference_server --socket /tmp/autocv-embed.sock
+    AUTOCV_EMBEDDING_SOCKET=/tmp/autocv-embed.sock gunicorn app:app -c gunicorn.conf.py
+
+Requests arriving together (from any worker) are coalesced into one
+model.encode call of up to EMBEDDING_SERVER_MAX_BATCH texts.
+
+Wire format, both directions: 8-byte header (JSON length, payload length,
+big-endian uint32) + JSON + raw payload. Requests are {"op": "encode",
+"texts": [...]} or {"op": "ping"}; encode replies carry {"shape": [n, dim]}
+and the float32 matrix as payload, failures carry {"error": "..."}.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import numpy as np
+import config
+from core.embedding_backends import get_backend
+
+_HEADER = struct.Struct('>II')
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError('inference server connection closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def send_frame(sock, message, payload=b''):
+    data = json.dumps(message).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(data), len(payload)) + data + payload)
+
+def recv_frame(sock):
+    """Returns (message, payload)"""
+    header_size, payload_size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if header_size + payload_size > MAX_FRAME_BYTES:
+        raise ValueError('inference frame too large')
+    message = json.loads(_recv_exact(sock, header_size))
+    return message, _recv_exact(sock, payload_size) if payload_size else b''
+
+# ----- client (web workers) -----
+
+class InferenceClient:
+    """
+    Per-thread persistent connections to the inference server
+    Connections are keyed by pid as well, so a socket opened in the gunicorn
+    master is never shared with the forked workers
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        self.socket_path = socket_path
+        self.timeout = timeout if timeout is not None else config.EMBEDDING_SERVER_TIMEOUT
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(self.timeout)
+        conn.connect(self.socket_path)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def request(self, message):
+        # One retry on a fresh connection covers a restarted server
+        for attempt in (1, 2):
+            try:
+                conn = self._connection()
+                send_frame(conn, message)
+                reply, payload = recv_frame(conn)
+                break
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt == 2:
+                    raise
+        if 'error' in reply:
+            raise RuntimeError(f"Inference server error: {reply['error']}")
+        return reply, payload
+
+    def encode(self, texts):
+        """Embeddings for texts as a float32 array of shape (len(texts), dim)"""
+        reply, payload = self.request({'op': 'encode', 'texts': list(texts)})
+        return np.frombuffer(payload, dtype=np.float32).reshape(reply['shape'])
+
+    def ping(self):
+        return self.request({'op': 'ping'})[0]
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Process-wide client for config.EMBEDDING_SERVER_SOCKET"""
+    global _client
+    with _client_lock:
+        if _client is None or _client.socket_path != config.EMBEDDING_SERVER_SOCKET:
+            _client = InferenceClient(config.EMBEDDING_SERVER_SOCKET)
+        return _client
+
+# ----- server -----
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        batcher = self.server.batcher
+        while True:
+            try:
+                message, _ = recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            except ValueError as e:
+                send_frame(self.request, {'error': str(e)})
+                return
+            try:
+                if message.get('op') == 'ping':
+                    send_frame(self.request, {'ok': True, 'model': get_backend().name,
+                                              'pid': os.getpid(), 'stats': batcher.stats})
+                elif message.get('op') == 'encode':
+                    texts = message.get('texts') or []
+                    if not all(isinstance(text, str) for text in texts):
+                        raise ValueError('texts must be a list of strings')
+                    vectors = batcher.submit(texts).result()
+                    send_frame(self.request, {'shape': list(vectors.shape)}, vectors.tobytes())
+                else:
+                    send_frame(self.request, {'error': f"unknown op {message.get('op')!r}"})
+            except Exception as e:
+                try:
+                    send_frame(self.request, {'error': str(e)})
+                except OSError:
+                    return
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def _remove_stale_socket(path):
+    """Remove a socket file left behind by a dead server; refuse to steal a live one"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"An inference server is already listening on {path}")
+
+def serve(socket_path):
+    """Load the model and serve until interrupted"""
+    from core.matcher import MicroBatcher
+
+    backend = get_backend()
+    backend.load()
+    batcher = MicroBatcher(lambda texts: backend.encode(texts, batch_size=config.EMBEDDING_BATCH_SIZE),
+                           max_batch=config.EMBEDDING_SERVER_MAX_BATCH,
+                           max_wait_ms=config.EMBEDDING_SERVER_MAX_WAIT_MS)
+    batcher.start()
+
+    _remove_stale_socket(socket_path)
+    server = _Server(socket_path, _Handler)
+    server.batcher = batcher
+    os.chmod(socket_path, 0o660)
+    # Exit through the finally block below on SIGTERM too, removing the socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Inference server for {backend.name} listening on {socket_path} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared embedding inference server')
+    parser.add_argument('--socket', default=config.EMBEDDING_SERVER_SOCKET or config.EMBEDDING_SERVER_DEFAULT_SOCKET,
+                        help='Unix socket path to listen on')
+    args = parser.parse_args()
+    serve(args.socket)
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,165 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
 import numpy as np
 import config
-
-# Load sentence transformer model (lazy loading)
-_model = None
+from core.embedding_backends import get_backend
+from core.embedding_cache import get_embedding_cache
+from core import metrics, timing
+from core.timing import stage, timed
 
 def get_model():
-    """Lazy load sentence transformer model"""
-    global _model
-    if _model is None:
-        print(f"Loading embedding model: {config.EMBEDDING_MODEL}")
-        _model = SentenceTransformer(config.EMBEDDING_MODEL)
-    return _model
+    """
+    Load the configured embedding backend's model (None for model-free backends)
+    Kept for callers that only want the model in memory, e.g. prewarm
+    """
+    return get_backend().load()
+
+metrics.describe_histogram('autocv_embedding_batch_size', 'Texts per micro-batched forward pass',
+                           (1, 2, 4, 8, 16, 32, 64, 128, 256))
+metrics.describe_histogram('autocv_embedding_queue_wait_seconds', 'Time encode requests wait for their batch to start',
+                           (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+
+class MicroBatcher(threading.Thread):
+    """
+    Single model thread that coalesces concurrent encode requests
+    Each batch starts with the oldest request and takes whatever else arrives
+    within max_wait_ms, up to max_batch texts, then runs one forward pass and
+    resolves every caller's future with its slice of the result
+    """
+    
+    def __init__(self, encode_fn, max_batch=None, max_wait_ms=None):
+        super().__init__(name='autocv-microbatcher', daemon=True)
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch or config.EMBEDDING_MICROBATCH_MAX_SIZE
+        wait = max_wait_ms if max_wait_ms is not None else config.EMBEDDING_MICROBATCH_MAX_WAIT_MS
+        self.max_wait = wait / 1000
+        self.pid = os.getpid()
+        self.requests = queue.Queue()
+        self.stats = {'requests': 0, 'batches': 0, 'texts': 0}
+    
+    def submit(self, texts):
+        """Queue texts; the returned future resolves to their float32 vectors"""
+        future = Future()
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+        else:
+            self.requests.put((list(texts), future, time.perf_counter()))
+        return future
+    
+    def _collect(self):
+        pending = [self.requests.get()]
+        size = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+    
+    def run(self):
+        while True:
+            pending = self._collect()
+            started = time.perf_counter()
+            texts = [text for batch, _, _ in pending for text in batch]
+            for _, _, submitted in pending:
+                metrics.observe('autocv_embedding_queue_wait_seconds', started - submitted)
+            metrics.observe('autocv_embedding_batch_size', len(texts))
+            try:
+                vectors = np.asarray(self.encode_fn(texts), dtype=np.float32)
+            except Exception as e:
+                for _, future, _ in pending:
+                    future.set_exception(e)
+                continue
+            if config.STAGE_TIMING:
+                timing.record('encode', time.perf_counter() - started)
+            self.stats['requests'] += len(pending)
+            self.stats['batches'] += 1
+            self.stats['texts'] += len(texts)
+            start = 0
+            for batch, future, _ in pending:
+                future.set_result(vectors[start:start + len(batch)])
+                start += len(batch)
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_batcher():
+    """Process-wide micro-batcher over the local model (restarted after fork)"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None or _batcher.pid != os.getpid():
+            _batcher = MicroBatcher(lambda texts: get_backend().encode(texts, batch_size=config.EMBEDDING_BATCH_SIZE))
+            _batcher.start()
+        return _batcher
+
+def submit_encode(texts, batch_size=None):
+    """
+    Start embedding texts and return a Future for the vectors
+    Goes to the shared inference server when EMBEDDING_SERVER_SOCKET is set,
+    else to the in-process micro-batcher when EMBEDDING_MICROBATCH is on and
+    the backend runs a model; otherwise the texts are encoded right here and
+    the future is already done
+    """
+    backend = get_backend()
+    if not config.EMBEDDING_SERVER_SOCKET and config.EMBEDDING_MICROBATCH and backend.requires_model:
+        return get_batcher().submit(texts)
+    
+    future = Future()
+    try:
+        with stage('encode'):
+            if config.EMBEDDING_SERVER_SOCKET:
+                from core.inference_server import get_client
+                future.set_result(get_client().encode(texts))
+            else:
+                future.set_result(backend.encode(texts, batch_size=batch_size))
+    except Exception as e:
+        future.set_exception(e)
+    return future
 
-def compute_similarity(resume_text, jd_text):
+def encode(texts, batch_size=None):
+    """Embed texts, blocking until the vectors are ready"""
+    future = submit_encode(texts, batch_size)
+    with stage('embed_wait'):
+        return future.result()
+
+def encode_cached(texts):
+    """
+    Encode texts through the content-hashed embedding cache
+    Meant for strings that repeat across requests (JDs, role keyword strings)
+    """
+    backend = get_backend()
+    if not config.EMBEDDING_CACHE_ENABLED or not backend.cacheable:
+        return encode(texts)
+    return get_embedding_cache(backend.name).encode(texts, encode)
+
+def compute_similarity(resume_text, jd_text, resume_embedding=None, jd_embedding=None):
     """
     Compute semantic similarity between resume and job description
+    Precomputed embeddings (from batch callers) skip the matching encode call
     Returns similarity score between 0 and 1
     """
-    if not jd_text or not resume_text:
+    if not jd_text or not resume_text or not resume_text.strip():
         return 0.0
     
-    model = get_model()
-    
-    # Generate embeddings
-    resume_embedding = model.encode([resume_text])
-    jd_embedding = model.encode([jd_text])
-    
-    # Compute cosine similarity
-    similarity = cosine_similarity(resume_embedding, jd_embedding)[0][0]
+    # Generate embeddings (the JD side is shared across candidates, so cache it).
+    # The resume is submitted first so an uncached JD joins its forward pass.
+    pending = submit_resume_embedding({'full_text': resume_text}) if resume_embedding is None else None
+    if jd_embedding is None:
+        jd_embedding = encode_cached([jd_text])
+    if pending is not None:
+        resume_embedding = _pooled_result(pending)
+    if resume_embedding is None:  # no text left to embed (e.g. a tables-only DOCX)
+        return 0.0
     
-    return float(similarity)
+    return similarity_from_embeddings(resume_embedding, jd_embedding)
 
 def keyword_coverage(resume_skills, jd_skills):
     """
@@ -55,17 +183,188 @@ def extract_jd_skills(jd_text, taxonomy):
     skills = extract_skills(jd_text, taxonomy)
     return [s['skill'] for s in skills]
 
-def match_role_to_resume(resume_data, target_role=None, jd_text=None):
+# Rough word-piece count: words and punctuation are a piece each, long words
+# split into more. Cheap, and only run up to the budget, never the whole text
+_PIECE_RE = re.compile(r'\w+|[^\w\s]')
+
+def _input_token_budget():
+    if config.EMBEDDING_MAX_SEQ_LENGTH:
+        return min(config.EMBEDDING_INPUT_TOKENS, config.EMBEDDING_MAX_SEQ_LENGTH - 2)
+    return config.EMBEDDING_INPUT_TOKENS
+
+def _take_tokens(text, budget):
+    """Returns (prefix of text holding about budget word pieces, pieces used)"""
+    used = 0
+    end = 0
+    for piece in _PIECE_RE.finditer(text):
+        cost = 1 + (piece.end() - piece.start() - 1) // 8
+        if used + cost > budget:
+            break
+        used += cost
+        end = piece.end()
+    return text[:end], used
+
+def build_resume_inputs(resume_data, mode=None):
+    """
+    Texts to embed for a parsed resume, and their weights for pooling
+    'budget' returns one text: sections in EMBEDDING_SECTION_PRIORITY order
+    until the token budget runs out. 'chunked' returns one text per section,
+    each within the budget. 'full' returns full_text unchanged. Resumes
+    without parsed sections fall back to the start of full_text.
+    Returns (texts, weights); both are empty when there is no text
+    """
+    mode = mode or config.EMBEDDING_INPUT_MODE
+    full_text = resume_data.get('full_text', '')
+    if mode == 'full':
+        return ([full_text], [1.0]) if full_text.strip() else ([], [])
+    
+    budget = _input_token_budget()
+    sections = resume_data.get('sections') or {}
+    ordered = [sections[name] for name in config.EMBEDDING_SECTION_PRIORITY if (sections.get(name) or '').strip()]
+    if not ordered:
+        ordered = [full_text] if full_text.strip() else []
+    
+    texts, weights = [], []
+    remaining = budget
+    for section_text in ordered:
+        if mode == 'chunked':
+            text, used = _take_tokens(section_text, budget)
+        else:
+            if remaining <= 0:
+                break
+            text, used = _take_tokens(section_text, remaining)
+            remaining -= used
+        if used:
+            texts.append(text)
+            weights.append(float(used))
+    
+    if mode != 'chunked' and texts:
+        return ['\n'.join(texts)], [1.0]
+    return texts, weights
+
+def pool_resume_vectors(vectors, weights):
+    """Weighted mean of section vectors (a single vector is returned as is)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) == 1:
+        return vectors[0]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1, norms)
+    return (np.asarray(weights, dtype=np.float32) @ unit) / np.float32(sum(weights))
+
+def encode_resumes(resume_datas):
+    """
+    Embed parsed resumes in batched forward passes (not cached: each is unique)
+    Returns one vector per resume, None where a resume has no text
+    """
+    inputs = [build_resume_inputs(resume_data) for resume_data in resume_datas]
+    texts = [text for resume_texts, _ in inputs for text in resume_texts]
+    encoded = encode(texts, batch_size=config.EMBEDDING_BATCH_SIZE) if texts else []
+    vectors = []
+    start = 0
+    for resume_texts, weights in inputs:
+        if resume_texts:
+            vectors.append(pool_resume_vectors(encoded[start:start + len(resume_texts)], weights))
+        else:
+            vectors.append(None)
+        start += len(resume_texts)
+    return vectors
+
+def submit_resume_embedding(resume_data):
+    """
+    Start embedding a parsed resume (see build_resume_inputs)
+    Returns a pending handle for resume_embedding_result, or None if there is no text
+    """
+    texts, weights = build_resume_inputs(resume_data)
+    return (submit_encode(texts), weights) if texts else None
+
+def _pooled_result(pending):
+    future, weights = pending
+    with stage('embed_wait'):
+        vectors = future.result()
+    return pool_resume_vectors(vectors, weights)
+
+def resume_embedding_result(pending):
+    """
+    Finish submit_resume_embedding
+    Returns a 1-D vector, or None if there is no text or the model is unavailable
+    """
+    if pending is None:
+        return None
+    try:
+        return _pooled_result(pending)
+    except Exception as e:
+        print(f"Warning: could not embed resume: {e}")
+        return None
+
+def embed_resume(resume_data):
+    """
+    Embed a parsed resume for the resume vector index
+    Returns a 1-D vector, or None if there is no text or the model is unavailable
+    """
+    return resume_embedding_result(submit_resume_embedding(resume_data))
+
+def similarity_from_embeddings(resume_embedding, target_embedding):
+    """Cosine similarity between two precomputed embeddings (0 when either is missing)"""
+    if resume_embedding is None or target_embedding is None:
+        return 0.0
+    resume_embedding = np.asarray(resume_embedding, dtype=np.float64).reshape(-1)
+    target_embedding = np.asarray(target_embedding, dtype=np.float64).reshape(-1)
+    
+    # Compute cosine similarity (zero vectors score 0, as with sklearn)
+    norms = np.linalg.norm(resume_embedding) * np.linalg.norm(target_embedding)
+    if norms == 0:
+        return 0.0
+    
+    return float(resume_embedding @ target_embedding / norms)
+
+def build_match_context(target_role=None, jd_text=None, taxonomy=None):
+    """
+    Precompute the JD / role side of matching so it can be shared by many resumes
+    Returns dict with target text, target skills and target embedding, or None
+    """
+    if taxonomy is None:
+        from core.skills import load_taxonomy
+        taxonomy = load_taxonomy()
+    
+    # If JD provided, use it
+    if jd_text:
+        target_text = jd_text
+        target_skills = extract_jd_skills(jd_text, taxonomy)
+    # If only role provided, use role-specific keywords
+    elif target_role:
+        target_skills = get_role_keywords(target_role)
+        target_text = ' '.join(target_skills)
+    else:
+        return None
+    
+    return {
+        'target_text': target_text,
+        'target_skills': target_skills,
+        'embedding': encode_cached([target_text])[0] if target_text else None
+    }
+
+def has_match_target(target_role=None, jd_text=None, match_context=None):
+    """True when there is JD or role text to compare a resume embedding with (nothing is encoded)"""
+    if match_context is not None:
+        return bool(match_context['target_text'])
+    return bool(jd_text or (target_role and get_role_keywords(target_role)))
+
+@timed('match')
+def match_role_to_resume(resume_data, target_role=None, jd_text=None, match_context=None, resume_embedding=None,
+                         resume_skills=None):
     """
     Match resume to target role or job description
+    match_context / resume_embedding / resume_skills (extract_skills output)
+    may be precomputed by batch callers
     Returns dict with similarity score and skill gaps
     """
     from core.skills import load_taxonomy, extract_skills
     
     taxonomy = load_taxonomy()
     resume_text = resume_data.get('full_text', '')
-    resume_skills_data = extract_skills(resume_text, taxonomy)
-    resume_skills = [s['skill'] for s in resume_skills_data]
+    if resume_skills is None:
+        resume_skills = extract_skills(resume_text, taxonomy)
+    resume_skills = [s['skill'] for s in resume_skills]
     
     result = {
         'semantic_similarity': 0.0,
@@ -74,19 +373,22 @@ def match_role_to_resume(resume_data, target_role=None, jd_text=None):
         'matched_skills': resume_skills
     }
     
-    # If JD provided, use it
-    if jd_text:
-        result['semantic_similarity'] = compute_similarity(resume_text, jd_text)
-        jd_skills = extract_jd_skills(jd_text, taxonomy)
-        result['keyword_coverage'] = keyword_coverage(resume_skills, jd_skills)
-        result['skill_gaps'] = list(set(jd_skills) - set(resume_skills))
+    # Embed the resume from its sections, submitted before the JD side is
+    # built so an uncached JD joins the same forward pass
+    pending = None
+    if resume_embedding is None and resume_text.strip() and has_match_target(target_role, jd_text, match_context):
+        pending = submit_resume_embedding(resume_data)
+    if match_context is None:
+        match_context = build_match_context(target_role, jd_text, taxonomy)
     
-    # If only role provided, use role-specific keywords
-    elif target_role:
-        role_keywords = get_role_keywords(target_role)
-        result['semantic_similarity'] = compute_similarity(resume_text, ' '.join(role_keywords))
-        result['keyword_coverage'] = keyword_coverage(resume_skills, role_keywords)
-        result['skill_gaps'] = list(set(role_keywords) - set(resume_skills))
+    if match_context:
+        if pending is not None:
+            resume_embedding = _pooled_result(pending)
+        result['semantic_similarity'] = compute_similarity(resume_text, match_context['target_text'],
+                                                           resume_embedding, match_context['embedding'])
+        target_skills = match_context['target_skills']
+        result['keyword_coverage'] = keyword_coverage(resume_skills, target_skills)
+        result['skill_gaps'] = list(set(target_skills) - set(resume_skills))
     
     return result
 
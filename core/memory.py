@@ -0,0 +1,116 @@
+import os
+import threading
+import tracemalloc
+import config
+from core import metrics
+
+# Per-stage and per-request memory accounting, off unless MEMORY_ACCOUNTING
+# is set (tracemalloc slows allocation-heavy code down). The MEMORY_STAGES
+# stages of core/timing.py (parsing, skills, matching, encoding, scoring)
+# record
+#   - autocv_stage_memory_peak_bytes{stage}: tracemalloc peak above what was
+#     allocated when the stage started (Python objects and numpy arrays)
+#   - autocv_stage_rss_delta_bytes{stage}: change in resident memory across
+#     the stage, which also sees native allocations (MuPDF, torch); its _sum
+#     is the RSS growth attributed to the stage
+# and every request records the same per endpoint. tracemalloc peaks are
+# process-wide: exact with one request in flight per process (gunicorn sync
+# workers, worker.py), an upper bound with threaded workers.
+# benchmarks/soak_memory.py replays a corpus and reports growth by call site.
+
+MEMORY_BUCKETS = (0, 64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2,
+                  256 * 1024 ** 2, 1024 ** 3)
+
+metrics.describe_histogram('autocv_stage_memory_peak_bytes', 'Peak traced allocation per pipeline stage',
+                           MEMORY_BUCKETS)
+metrics.describe_histogram('autocv_stage_rss_delta_bytes', 'Resident memory change per pipeline stage',
+                           MEMORY_BUCKETS)
+metrics.describe_histogram('autocv_request_memory_peak_bytes', 'Peak traced allocation per request',
+                           MEMORY_BUCKETS)
+metrics.describe_histogram('autocv_request_rss_delta_bytes', 'Resident memory change per request', MEMORY_BUCKETS)
+
+_local = threading.local()
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def current_rss():
+    """Resident set size in bytes (from /proc/self/statm, cheap enough per stage), or None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+def ensure_tracing():
+    """Start tracemalloc in this process if it is not running yet"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(config.MEMORY_TRACE_FRAMES)
+
+class Frame:
+    """One accounted stage or request on the current thread"""
+    __slots__ = ('base', 'peak', 'rss')
+
+    def __init__(self, base, rss):
+        self.base = base
+        self.peak = base
+        self.rss = rss
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def begin():
+    """Start accounting; returns the Frame to pass to end()"""
+    ensure_tracing()
+    current, peak = tracemalloc.get_traced_memory()
+    stack = _stack()
+    if stack:
+        # Keep the enclosing frame's peak so far: resetting starts a new one
+        stack[-1].peak = max(stack[-1].peak, peak)
+    tracemalloc.reset_peak()
+    frame = Frame(current, current_rss())
+    stack.append(frame)
+    return frame
+
+def end(frame):
+    """Finish a Frame; returns (peak bytes above its start, RSS change or None)"""
+    _, peak = tracemalloc.get_traced_memory()
+    frame.peak = max(frame.peak, peak)
+    stack = _stack()
+    if frame in stack:
+        stack.remove(frame)
+    if stack:
+        stack[-1].peak = max(stack[-1].peak, frame.peak)
+    rss = current_rss()
+    rss_delta = rss - frame.rss if rss is not None and frame.rss is not None else None
+    return frame.peak - frame.base, rss_delta
+
+def begin_stage(name):
+    """Frame for a timing stage, or None if the stage is not accounted"""
+    if not config.MEMORY_ACCOUNTING or name not in config.MEMORY_STAGES:
+        return None
+    return begin()
+
+def end_stage(name, frame):
+    peak, rss_delta = end(frame)
+    metrics.observe('autocv_stage_memory_peak_bytes', peak, stage=name)
+    if rss_delta is not None:
+        metrics.observe('autocv_stage_rss_delta_bytes', rss_delta, stage=name)
+
+def start_request():
+    """Begin accounting the request on this thread"""
+    _local.stack = []
+    _local.request = begin() if config.MEMORY_ACCOUNTING else None
+
+def finish_request(endpoint):
+    """Record the request's peak / RSS change; returns (peak, rss_delta), or None when off"""
+    frame = getattr(_local, 'request', None)
+    _local.request = None
+    if frame is None:
+        return None
+    peak, rss_delta = end(frame)
+    metrics.observe('autocv_request_memory_peak_bytes', peak, endpoint=endpoint)
+    if rss_delta is not None:
+        metrics.observe('autocv_request_rss_delta_bytes', rss_delta, endpoint=endpoint)
+    return peak, rss_delta
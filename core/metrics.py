@@ -0,0 +1,114 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+# Process-local metrics, rendered in Prometheus text format by /metrics.
+# Each gunicorn worker keeps its own values; Prometheus sums them per instance.
+
+_lock = threading.Lock()
+_counters = defaultdict(float)  # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+_buckets = {}  # histogram name -> upper bounds
+_help = {}
+_collectors = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def describe(name, help_text):
+    """Register help text for a metric name"""
+    _help[name] = help_text
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+def inc(name, amount=1, **labels):
+    """Increment a counter"""
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] += amount
+
+def describe_histogram(name, help_text, buckets=DEFAULT_BUCKETS):
+    """Register help text and bucket upper bounds for a histogram"""
+    _help[name] = help_text
+    _buckets[name] = tuple(sorted(buckets))
+
+def observe(name, value, **labels):
+    """Record one observation in a histogram"""
+    bounds = _buckets.get(name, DEFAULT_BUCKETS)
+    key = (name, _label_key(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * len(bounds), 0.0, 0]
+        index = bisect_left(bounds, value)
+        if index < len(bounds):
+            histogram[0][index] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+def register_collector(collector):
+    """
+    Register a callable run at scrape time
+    It returns an iterable of (name, type, help, value, labels) samples
+    """
+    _collectors.append(collector)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = ','.join(f'{key}="{str(value)}"' for key, value in labels)
+    return '{' + parts + '}'
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def render_prometheus():
+    """Render every metric in the Prometheus text exposition format"""
+    lines = []
+
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, (list(buckets), total, count)) for key, (buckets, total, count) in _histograms.items())
+
+    by_name = defaultdict(list)
+    for (name, labels), value in counters:
+        by_name[name].append((labels, value))
+    for name, samples in by_name.items():
+        lines.append(f'# HELP {name} {_help.get(name, name)}')
+        lines.append(f'# TYPE {name} counter')
+        for labels, value in samples:
+            lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    by_name = defaultdict(list)
+    for (name, labels), histogram in histograms:
+        by_name[name].append((labels, histogram))
+    for name, samples in by_name.items():
+        bounds = _buckets.get(name, DEFAULT_BUCKETS)
+        lines.append(f'# HELP {name} {_help.get(name, name)}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, (buckets, total, count) in samples:
+            cumulative = 0
+            for bound, bucket in zip(bounds, buckets):
+                cumulative += bucket
+                le = labels + (('le', _format_value(bound)),)
+                lines.append(f'{name}_bucket{_format_labels(le)} {cumulative}')
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+    for collector in _collectors:
+        try:
+            samples = list(collector())
+        except Exception as e:
+            print(f"Warning: metrics collector failed: {e}")
+            continue
+        seen = set()
+        for name, metric_type, help_text, value, labels in samples:
+            if name not in seen:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                seen.add(name)
+            lines.append(f'{name}{_format_labels(_label_key(labels))} {_format_value(value)}')
+
+    return '\n'.join(lines) + '\n'
@@ -1,33 +1,137 @@
 import fitz  # PyMuPDF
 from docx import Document
+from io import BytesIO
+import multiprocessing
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import config
+from core.timing import timed
 
-def parse_pdf(file_path):
+# Process pool for page-parallel extraction of large PDFs (created on first use)
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+def _get_pdf_pool():
+    """Lazily start the extraction pool; spawn keeps model threads out of the children"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=config.PDF_PARALLEL_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _pdf_pool
+
+def _reset_pdf_pool():
+    """Drop a broken pool so the next large document starts a fresh one"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+def _extract_pages(doc, start, stop, max_chars=None):
+    """
+    Extract text for pages [start, stop) of an open document
+    Stops early once max_chars characters have been collected
+    Returns list of page texts
+    """
+    parts = []
+    total = 0
+    for page_number in range(start, stop):
+        text = doc[page_number].get_text()
+        parts.append(text)
+        total += len(text)
+        if max_chars and total >= max_chars:
+            break
+    return parts
+
+def _read_source(source):
+    """Turn a binary stream into bytes; paths and bytes pass through unchanged"""
+    if hasattr(source, 'read'):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return source.read()
+    return source
+
+def _open_pdf(source):
+    """Open a PDF from a file path or from in-memory bytes"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype='pdf')
+    return fitz.open(source)
+
+def _extract_page_range(source, start, stop, max_chars=None):
+    """Pool task: open a private fitz handle and extract one page range"""
+    doc = _open_pdf(source)
+    try:
+        return _extract_pages(doc, start, stop, max_chars)
+    finally:
+        doc.close()
+
+def _extract_pages_parallel(source, page_total, max_chars=None):
+    """
+    Extract page ranges concurrently across the process pool
+    Ranges are consumed in order so the character budget stops the work early
+    Returns list of page texts
+    """
+    pool = _get_pdf_pool()
+    step = config.PDF_PAGES_PER_TASK
+    futures = [
+        pool.submit(_extract_page_range, source, start, min(start + step, page_total), max_chars)
+        for start in range(0, page_total, step)
+    ]
+    
+    parts = []
+    total = 0
+    try:
+        for future in futures:
+            for text in future.result():
+                parts.append(text)
+                total += len(text)
+            if max_chars and total >= max_chars:
+                break
+    finally:
+        for future in futures:
+            future.cancel()  # no-op for ranges already running or done
+    return parts
+
+@timed('parse_pdf')
+def parse_pdf(source):
     """
     Parse PDF resume and extract structured information
+    source is a file path, the file's bytes, or a binary stream
+    Text extraction is capped at PDF_MAX_PAGES pages / PARSE_MAX_CHARS characters,
+    and large documents are extracted page-range-parallel
     Returns dict with sections, contact info, and links
     """
     try:
-        doc = fitz.open(file_path)
-        full_text = ""
+        source = _read_source(source)
+        doc = _open_pdf(source)
+        try:
+            page_count = len(doc)
+            page_total = min(page_count, config.PDF_MAX_PAGES) if config.PDF_MAX_PAGES else page_count
+            max_chars = config.PARSE_MAX_CHARS
+            
+            # Extract text page by page and join once (no repeated string copies)
+            parts = None
+            if config.PDF_PARALLEL_WORKERS > 1 and page_total >= config.PDF_PARALLEL_MIN_PAGES:
+                try:
+                    parts = _extract_pages_parallel(source, page_total, max_chars)
+                except BrokenProcessPool:
+                    _reset_pdf_pool()  # fall back to inline extraction below
+            if parts is None:
+                parts = _extract_pages(doc, 0, page_total, max_chars)
+        finally:
+            # Close even when extraction fails: the traceback would otherwise
+            # keep the document (and MuPDF's native buffers) alive
+            doc.close()
         
-        # Extract text from all pages
-        for page in doc:
-            full_text += page.get_text()
+        full_text = ''.join(parts)
+        if max_chars:
+            full_text = full_text[:max_chars]
         
-        # Get page count BEFORE closing
-        page_count = len(doc)
-        
-        doc.close()
-        
-        # Extract contact information
-        contact = extract_contact_info(full_text)
-        
-        # Extract links
-        links = extract_links(full_text)
-        
-        # Parse into sections
-        sections = parse_sections(full_text)
+        # Contact information, links and sections in one pass
+        contact, links, sections = scan_text(full_text)
         
         return {
             'full_text': full_text,
@@ -39,27 +143,37 @@ def parse_pdf(file_path):
     except Exception as e:
         raise Exception(f"Error parsing PDF: {str(e)}")
 
-def parse_docx(file_path):
+@timed('parse_docx')
+def parse_docx(source):
     """
     Parse DOCX resume and extract structured information
+    source is a file path, the file's bytes, or a seekable binary stream
+    Text extraction is capped at PARSE_MAX_CHARS characters
     Returns dict with sections, contact info, and links
     """
     try:
-        doc = Document(file_path)
-        full_text = ""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = BytesIO(source)
+        elif hasattr(source, 'seek'):
+            source.seek(0)
+        doc = Document(source)
+        max_chars = config.PARSE_MAX_CHARS
+        parts = []
+        total = 0
         
         # Extract text from paragraphs
         for para in doc.paragraphs:
-            full_text += para.text + "\n"
-        
-        # Extract contact information
-        contact = extract_contact_info(full_text)
+            parts.append(para.text + "\n")
+            total += len(parts[-1])
+            if max_chars and total >= max_chars:
+                break
         
-        # Extract links
-        links = extract_links(full_text)
+        full_text = ''.join(parts)
+        if max_chars:
+            full_text = full_text[:max_chars]
         
-        # Parse into sections
-        sections = parse_sections(full_text)
+        # Contact information, links and sections in one pass
+        contact, links, sections = scan_text(full_text)
         
         # Estimate page count (rough approximation)
         page_count = max(1, len(full_text) // 3000)
@@ -74,88 +188,174 @@ def parse_docx(file_path):
     except Exception as e:
         raise Exception(f"Error parsing DOCX: {str(e)}")
 
-def extract_contact_info(text):
-    """Extract email, phone, and other contact information"""
+def parse_resume(source, file_ext=None):
+    """
+    Parse a PDF or DOCX resume, dispatching on the file extension
+    source is a file path, bytes or a binary stream; file_ext is required
+    unless source is a path
+    Returns the same dict as parse_pdf / parse_docx
+    """
+    if file_ext is None:
+        file_ext = source.rsplit('.', 1)[-1]
+    if file_ext.lower() == 'pdf':
+        return parse_pdf(source)
+    return parse_docx(source)
+
+# Section headers, tried in this order; a line is a header if one of them
+# matches at its start. Folded into one alternation so each line is matched
+# once and the winning section is the named group that matched.
+SECTION_PATTERNS = {
+    'education': r'education|academic|qualification',
+    'experience': r'experience|employment|work history',
+    'projects': r'projects?|portfolio',
+    'skills': r'skills?|technical skills?|competencies',
+    'achievements': r'achievements?|accomplishments?|awards?',
+    'certifications': r'certifications?|certificates?',
+    'summary': r'summary|profile|objective|about'
+}
+_SECTION_HEADER_RE = re.compile(
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SECTION_PATTERNS.items()),
+    re.IGNORECASE
+)
+
+# Email: the leading word boundary is checked by hand (see _find_email)
+_EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_EMAIL_LOCAL_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-')
+
+# Phone (Indian and international): first run of 10+ digits, spaces, dashes
+# or brackets, with an optional leading '+'. Runs may span lines.
+_PHONE_RUN_RE = re.compile(r'[\d\s\-\(\)]+')
+PHONE_MIN_LENGTH = 10
+
+_LINKEDIN_RE = re.compile(r'linkedin\.com/in/[\w\-]+', re.IGNORECASE)
+_GITHUB_RE = re.compile(r'github\.com/[\w\-]+', re.IGNORECASE)
+_URL_RE = re.compile(r'https?://[^\s]+')
+
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+def _find_email(line):
+    """
+    First email address in a line, or None
+    Anchored on '@' rather than searched from every offset, so a long run of
+    address-like characters is scanned a constant number of times
+    """
+    at = line.find('@')
+    while at != -1:
+        # The local part is the run of allowed characters just before '@';
+        # a regex search would start at the first word boundary inside it
+        start = at
+        while start > 0 and line[start - 1] in _EMAIL_LOCAL_CHARS:
+            start -= 1
+        for pos in range(start, at):
+            if (pos > 0 and _is_word(line[pos - 1])) != _is_word(line[pos]):
+                match = _EMAIL_RE.match(line, pos)
+                if match:
+                    return match.group()
+                break
+        at = line.find('@', at + 1)
+    return None
+
+def _phone_between(text, start, end):
+    """Stripped text[start:end] if it is long enough to be a phone number"""
+    if end - start - (text[start] == '+') < PHONE_MIN_LENGTH:
+        return None
+    return text[start:end].strip()
+
+@timed('sections')
+def scan_text(text):
+    """
+    Single pass over the resume text: classify each line once, collecting
+    section content, contact details and links as it goes
+    Returns (contact, links, sections) as extract_contact_info, extract_links
+    and parse_sections would
+    """
     contact = {
         'email': None,
         'phone': None,
         'linkedin': None,
         'github': None
     }
+    links = []
+    sections = {'other': []}
+    current = sections['other']
     
-    # Email pattern
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    email_match = re.search(email_pattern, text)
-    if email_match:
-        contact['email'] = email_match.group()
-    
-    # Phone pattern (Indian and international)
-    phone_pattern = r'\+?[\d\s\-\(\)]{10,}'
-    phone_match = re.search(phone_pattern, text)
-    if phone_match:
-        contact['phone'] = phone_match.group().strip()
+    lines = text.split('\n')
+    last = len(lines) - 1
+    offset = 0
+    phone_start = None  # start of a phone run still open at the previous line break
     
-    # LinkedIn
-    linkedin_pattern = r'linkedin\.com/in/[\w\-]+'
-    linkedin_match = re.search(linkedin_pattern, text, re.IGNORECASE)
-    if linkedin_match:
-        contact['linkedin'] = linkedin_match.group()
+    for index, line in enumerate(lines):
+        # Section header or content
+        stripped = line.strip()
+        if stripped:
+            header = _SECTION_HEADER_RE.match(stripped)
+            if header:
+                current = sections[header.lastgroup] = []
+            else:
+                current.append(stripped)
+        
+        if contact['email'] is None and '@' in line:
+            contact['email'] = _find_email(line)
+        
+        if contact['phone'] is None:
+            # The newline belongs to the run class too, so runs are matched
+            # over line + newline and can carry into the next line
+            chunk = line + '\n' if index < last else line
+            for run in _PHONE_RUN_RE.finditer(chunk):
+                if phone_start is not None and run.start() == 0:
+                    start = phone_start
+                else:
+                    if phone_start is not None:
+                        # The run carried over from earlier lines ended before this line
+                        contact['phone'] = _phone_between(text, phone_start, offset)
+                        if contact['phone'] is not None:
+                            break
+                    start = offset + run.start()
+                    if run.start() > 0 and chunk[run.start() - 1] == '+':
+                        start -= 1
+                phone_start = None
+                if run.end() == len(chunk) and index < last:
+                    phone_start = start
+                    break
+                contact['phone'] = _phone_between(text, start, offset + run.end())
+                if contact['phone'] is not None:
+                    break
+            else:
+                if phone_start is not None and index == last:
+                    contact['phone'] = _phone_between(text, phone_start, offset)
+        
+        if '/' in line:
+            if contact['linkedin'] is None:
+                match = _LINKEDIN_RE.search(line)
+                if match:
+                    contact['linkedin'] = match.group()
+            if contact['github'] is None:
+                match = _GITHUB_RE.search(line)
+                if match:
+                    contact['github'] = match.group()
+            if '://' in line:
+                links.extend(_URL_RE.findall(line))
+        
+        offset += len(line) + 1
     
-    # GitHub
-    github_pattern = r'github\.com/[\w\-]+'
-    github_match = re.search(github_pattern, text, re.IGNORECASE)
-    if github_match:
-        contact['github'] = github_match.group()
+    # Join lines within each section
+    for section in sections:
+        sections[section] = '\n'.join(sections[section])
     
-    return contact
+    return contact, links, sections
+
+def extract_contact_info(text):
+    """Extract email, phone, and other contact information"""
+    return scan_text(text)[0]
 
 def extract_links(text):
     """Extract all URLs from text"""
-    url_pattern = r'https?://[^\s]+'
-    links = re.findall(url_pattern, text)
-    return links
+    return scan_text(text)[1]
 
 def parse_sections(text):
     """
     Parse text into resume sections based on common headers
     Returns dict of section_name: content
     """
-    sections = {}
-    
-    # Common section headers (case insensitive)
-    section_patterns = {
-        'education': r'(?i)(education|academic|qualification)',
-        'experience': r'(?i)(experience|employment|work history)',
-        'projects': r'(?i)(projects?|portfolio)',
-        'skills': r'(?i)(skills?|technical skills?|competencies)',
-        'achievements': r'(?i)(achievements?|accomplishments?|awards?)',
-        'certifications': r'(?i)(certifications?|certificates?)',
-        'summary': r'(?i)(summary|profile|objective|about)'
-    }
-    
-    lines = text.split('\n')
-    current_section = 'other'
-    sections[current_section] = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # Check if line is a section header
-        matched = False
-        for section_name, pattern in section_patterns.items():
-            if re.match(pattern, line):
-                current_section = section_name
-                sections[current_section] = []
-                matched = True
-                break
-        
-        if not matched:
-            sections[current_section].append(line)
-    
-    # Join lines within each section
-    for section in sections:
-        sections[section] = '\n'.join(sections[section])
-    
-    return sections
+    return scan_text(text)[2]
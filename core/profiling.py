@@ -0,0 +1,150 @@
+import cProfile
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+import config
+from core import metrics
+
+# On-demand cProfile of single requests. A request is profiled when an admin
+# sends X-Profile: 1 (any endpoint), or at random with PROFILE_SAMPLE_RATE
+# on the PROFILE_ENDPOINTS upload routes. The profile covers the request
+# thread from before_request until the response has been sent (so streamed
+# bodies such as /api/score-batch are included); work on other threads or
+# processes (micro-batcher, page-parallel PDF pool) only shows up as waits.
+# Each profile is stored as a pstats file (<id>.prof, readable by pstats or
+# snakeviz) plus <id>.json metadata in PROFILE_DIR, keeping the newest
+# PROFILE_MAX_FILES. Only one request per process is profiled at a time.
+
+SORT_KEYS = {'cumulative': 3, 'tottime': 2, 'calls': 1}  # index into a pstats entry (cc, nc, tt, ct, callers)
+
+metrics.describe('autocv_profiles_total', 'Requests profiled, by reason (requested, sampled) and outcome')
+
+_active = threading.Lock()
+_rotate_lock = threading.Lock()
+_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+class RequestProfile:
+    """cProfile of one request, started on the request thread"""
+
+    def __init__(self, reason):
+        self.id = uuid.uuid4().hex
+        self.reason = reason
+        self.profiler = cProfile.Profile()
+        self.created = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.profiler.enable()
+
+    def finish(self, endpoint, path, status):
+        """Stop profiling and store the profile; returns its id, or None if it was dropped"""
+        self.profiler.disable()
+        seconds = time.perf_counter() - self.started
+        _active.release()
+        if self.reason == 'sampled' and seconds * 1000 < config.PROFILE_MIN_MS:
+            metrics.inc('autocv_profiles_total', reason=self.reason, result='dropped')
+            return None
+        try:
+            os.makedirs(config.PROFILE_DIR, exist_ok=True)
+            self.profiler.dump_stats(os.path.join(config.PROFILE_DIR, f'{self.id}.prof'))
+            meta = {'id': self.id, 'created': self.created.isoformat(), 'reason': self.reason,
+                    'endpoint': endpoint, 'path': path, 'status': status, 'seconds': round(seconds, 4)}
+            with open(os.path.join(config.PROFILE_DIR, f'{self.id}.json'), 'w') as f:
+                json.dump(meta, f)
+            rotate_profiles()
+        except OSError as e:
+            print(f"Warning: could not save profile {self.id}: {e}")
+            metrics.inc('autocv_profiles_total', reason=self.reason, result='failed')
+            return None
+        metrics.inc('autocv_profiles_total', reason=self.reason, result='saved')
+        return self.id
+
+def start_profile(endpoint, requested=False):
+    """
+    RequestProfile for this request if it should be profiled, else None
+    requested marks an authorized X-Profile header; otherwise the request is
+    sampled at PROFILE_SAMPLE_RATE if its endpoint is in PROFILE_ENDPOINTS
+    """
+    if requested:
+        reason = 'requested'
+    elif config.PROFILE_SAMPLE_RATE > 0 and endpoint in config.PROFILE_ENDPOINTS \
+            and random.random() < config.PROFILE_SAMPLE_RATE:
+        reason = 'sampled'
+    else:
+        return None
+    if not _active.acquire(blocking=False):
+        metrics.inc('autocv_profiles_total', reason=reason, result='busy')
+        return None
+    try:
+        return RequestProfile(reason)
+    except Exception as e:
+        _active.release()
+        print(f"Warning: could not start profiler: {e}")
+        return None
+
+def rotate_profiles(max_files=None):
+    """Delete the oldest profiles beyond max_files (PROFILE_MAX_FILES)"""
+    max_files = config.PROFILE_MAX_FILES if max_files is None else max_files
+    with _rotate_lock:
+        profiles = sorted((entry for entry in os.scandir(config.PROFILE_DIR) if entry.name.endswith('.prof')),
+                          key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in profiles[max_files:]:
+            for suffix in ('.prof', '.json'):
+                try:
+                    os.remove(entry.path[:-len('.prof')] + suffix)
+                except FileNotFoundError:
+                    pass
+
+def profile_path(profile_id):
+    """Path of a stored profile, or None if the id is malformed or unknown"""
+    if not _ID_RE.match(profile_id or ''):
+        return None
+    path = os.path.join(config.PROFILE_DIR, f'{profile_id}.prof')
+    return path if os.path.exists(path) else None
+
+def list_profiles():
+    """Metadata of the stored profiles, newest first"""
+    if not os.path.isdir(config.PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(config.PROFILE_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(config.PROFILE_DIR, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda meta: meta['created'], reverse=True)
+    return profiles
+
+def _function_name(key):
+    filename, line, name = key
+    if filename == '~':
+        return name  # built-in, e.g. <built-in method time.sleep>
+    if filename.startswith(config.BASE_DIR + os.sep):
+        filename = os.path.relpath(filename, config.BASE_DIR)
+    elif 'site-packages' + os.sep in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    return f'{filename}:{line}({name})'
+
+def top_functions(profile_id, n=20, sort='cumulative'):
+    """
+    The n hottest functions of a stored profile, by cumulative time, own time
+    (tottime) or call count; None if there is no such profile
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+    path = profile_path(profile_id)
+    if path is None:
+        return None
+    stats = pstats.Stats(path).stats
+    index = SORT_KEYS[sort]
+    hottest = sorted(stats.items(), key=lambda item: item[1][index], reverse=True)[:n]
+    return [{'function': _function_name(key), 'calls': nc, 'primitive_calls': cc,
+             'tottime': round(tt, 6), 'cumtime': round(ct, 6)}
+            for key, (cc, nc, tt, ct, _) in hottest]
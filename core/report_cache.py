@@ -0,0 +1,80 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+import config
+
+# Serialized report representations (API JSON, rendered report page), plain
+# or gzipped, kept per process and bounded by total size. Entries are keyed
+# by their ETag, which covers everything a representation depends on: the
+# report id, its overall_score (the one value a re-score changes), the
+# scoring version, the kind / field selection / encoding and
+# REPORT_RENDER_VERSION. A re-scored report therefore simply gets new keys;
+# stale entries age out of the LRU.
+
+class ReportCache:
+    """Byte-bounded LRU of ETag -> (response body, whether it is gzipped)"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes if max_bytes is not None else config.REPORT_CACHE_MAX_BYTES
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry
+
+    def put(self, key, body, gzipped=False):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[key] = (body, gzipped)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_report_cache():
+    """Process-wide report representation cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReportCache()
+        return _cache
+
+def report_etag(report_id, overall_score, scoring_version, kind, fields=None, gzipped=False):
+    """
+    Strong ETag (unquoted) for one representation of a report
+    fields is the sorted tuple of selected API fields, or None for all of them;
+    gzipped marks the variant served to clients accepting gzip (bodies under
+    REPORT_GZIP_MIN_BYTES are sent uncompressed under that ETag too)
+    """
+    parts = [report_id, repr(overall_score), scoring_version or '', kind, ','.join(fields or ()),
+             config.REPORT_RENDER_VERSION]
+    digest = hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()[:32]
+    return f'{digest}-gz' if gzipped else digest
+
+def compress(body):
+    """gzip body; mtime=0 keeps the bytes (and so the ETag) stable"""
+    return gzip.compress(body, compresslevel=config.REPORT_GZIP_LEVEL, mtime=0)
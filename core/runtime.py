@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+import config
+
+# Process start-up and model readiness, reported by /readyz and /metrics.
+# Heavy models load lazily on first use; prewarm() loads them up front, either
+# in a background thread or in the gunicorn master before fork (see
+# gunicorn.conf.py) so workers share the weights copy-on-write.
+
+_started_at = time.time()
+_lock = threading.Lock()
+_models = {}  # name -> {'load_seconds': float, 'pid': int}
+_state = {'warming': False, 'prewarm_error': None, 'first_response_seconds': None, 'preloaded_by': None}
+
+def record_model_load(name, seconds):
+    """Called by the lazy loaders once a model is in memory"""
+    with _lock:
+        _models[name] = {'load_seconds': round(seconds, 3), 'pid': os.getpid()}
+    if config.STAGE_TIMING:
+        from core import timing
+        timing.record(f'load_{name}', seconds)
+
+def required_models():
+    """Models that must be loaded before the process reports ready"""
+    from core.embedding_backends import get_backend
+    # With a shared inference server the embedding model lives over there
+    models = ['embedding'] if get_backend().requires_model and not config.EMBEDDING_SERVER_SOCKET else []
+    if config.SPACY_ENABLED:
+        models.append('spacy')
+    return models
+
+def prewarm():
+    """
+    Load every model this process will need, without running inference
+    (running torch before fork leaves thread pools the children cannot use)
+    """
+    from core.matcher import get_model
+    from core.skills import get_nlp, get_skill_matcher
+
+    with _lock:
+        _state['warming'] = True
+    try:
+        get_skill_matcher()
+        if not config.EMBEDDING_SERVER_SOCKET:
+            get_model()
+        if config.SPACY_ENABLED:
+            get_nlp()
+    except Exception as e:
+        print(f"Warning: model prewarm failed: {e}")
+        with _lock:
+            _state['prewarm_error'] = str(e)
+    finally:
+        with _lock:
+            _state['warming'] = False
+
+def start_prewarm_thread():
+    """Prewarm in the background so the server accepts connections immediately"""
+    thread = threading.Thread(target=prewarm, name='autocv-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+def mark_preloaded():
+    """Remember the master pid so workers can tell they inherited the models"""
+    _state['preloaded_by'] = os.getpid()
+
+def note_response():
+    """Record time from process start to the first response served"""
+    if _state['first_response_seconds'] is None:
+        _state['first_response_seconds'] = round(time.time() - _started_at, 3)
+
+def memory_usage():
+    """
+    Resident memory of this process in bytes
+    pss / private are only available on Linux; pss splits pages shared with
+    the gunicorn master (and sibling workers) between the processes using them
+    """
+    usage = {'rss': None, 'pss': None, 'private': None}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[-1] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+        usage['rss'] = fields.get('Rss')
+        usage['pss'] = fields.get('Pss')
+        usage['private'] = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    except OSError:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage['rss'] = peak if os.uname().sysname == 'Darwin' else peak * 1024
+    return usage
+
+def embedding_server_status():
+    """Reachability of the shared inference server, or None when not in use"""
+    if not config.EMBEDDING_SERVER_SOCKET:
+        return None
+    from core.inference_server import get_client
+    try:
+        reply = get_client().ping()
+    except Exception as e:
+        return {'socket': config.EMBEDDING_SERVER_SOCKET, 'reachable': False, 'error': str(e)}
+    return {'socket': config.EMBEDDING_SERVER_SOCKET, 'reachable': True,
+            'pid': reply.get('pid'), 'stats': reply.get('stats')}
+
+def status():
+    """Readiness report for /readyz"""
+    with _lock:
+        models = {name: dict(info) for name, info in _models.items()}
+        state = dict(_state)
+    warm = all(name in models for name in required_models())
+    pid = os.getpid()
+    for info in models.values():
+        info['inherited'] = info.pop('pid') != pid
+    server = embedding_server_status()
+    # A failed prewarm is not retried, so waiting would keep the process
+    # unready forever: report ready but degraded and let the lazy loaders retry
+    degraded = not warm and state['prewarm_error'] is not None
+    return {
+        # Lazy mode has nothing to wait for; prewarm modes wait for the models
+        'ready': (warm or degraded or config.PREWARM == 'off') and (server is None or server['reachable']),
+        'degraded': degraded,
+        'warm': warm,
+        'warming': state['warming'],
+        'prewarm': config.PREWARM,
+        'prewarm_error': state['prewarm_error'],
+        'preloaded_by': state['preloaded_by'],
+        'models': models,
+        'embedding_server': server,
+        'pid': pid,
+        'uptime_seconds': round(time.time() - _started_at, 3),
+        'first_response_seconds': state['first_response_seconds'],
+        'memory': memory_usage()
+    }
+
+def metric_samples():
+    """Samples for the /metrics collector"""
+    report = status()
+    yield ('autocv_models_warm', 'gauge', 'Whether every required model is loaded', int(report['warm']), {})
+    for name, info in report['models'].items():
+        yield ('autocv_model_load_seconds', 'gauge', 'Time taken to load each model',
+               info['load_seconds'], {'model': name})
+    for kind, value in report['memory'].items():
+        if value is not None:
+            yield ('autocv_process_memory_bytes', 'gauge', 'Process memory by kind (rss, pss, private)',
+                   value, {'kind': kind})
+    if report['embedding_server'] is not None:
+        yield ('autocv_embedding_server_up', 'gauge', 'Whether the shared inference server answered a ping',
+               int(report['embedding_server']['reachable']), {})
+    if report['first_response_seconds'] is not None:
+        yield ('autocv_first_response_seconds', 'gauge', 'Seconds from process start to the first response',
+               report['first_response_seconds'], {})
@@ -1,27 +1,128 @@
 import re
 import config
 from core.ats import check_ats_compliance
-from core.matcher import match_role_to_resume
+from core.matcher import (match_role_to_resume, build_match_context, has_match_target, submit_resume_embedding,
+                          resume_embedding_result)
 from core.sections import detect_missing_sections
+from core.timing import timed
 
-def score_structure(resume_data):
+REQUIRED_SECTIONS = ['education', 'experience', 'projects', 'skills']
+OPTIONAL_SECTIONS = ['achievements', 'certifications', 'summary']
+DEGREE_KEYWORDS = ['b.tech', 'btech', 'bachelor', 'b.e', 'b.sc', 'master', 'm.tech', 'mtech']
+_NUMBER_RE = re.compile(r'\d+[%+]?')
+_BULLET_RE = re.compile(r'(?:^|\n)[\-\•\*]')
+_PROJECT_WORD_RE = re.compile(r'\bproject\b')
+_TECH_RE = re.compile(r'\b(?:Python|Java|React|Flask|Django|ML|AI|database|API)\b', re.IGNORECASE)
+_GPA_RE = re.compile(r'(?:\d\.\d+|\d{2,3}(?:\.\d+)?%)')
+
+# Feature extraction is kept apart from the scoring rules so core.bulk can
+# score many resumes from the same features with array operations
+
+_stripped_patterns = {}  # PASSIVE_PATTERNS entry -> compiled pattern without its leading \b
+
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+def _count_matches(pattern, text):
+    """
+    len(re.findall(pattern, text))
+    A leading \b keeps the regex engine from skipping ahead to the literal
+    word after it, so it tries every position; instead the rest of the
+    pattern is searched for and the boundary is checked at each hit
+    """
+    if not pattern.startswith(r'\b'):
+        return len(re.findall(pattern, text))
+    compiled = _stripped_patterns.get(pattern)
+    if compiled is None:
+        compiled = _stripped_patterns[pattern] = re.compile(pattern[2:])
+    count = 0
+    pos = 0
+    while True:
+        match = compiled.search(text, pos)
+        if match is None:
+            return count
+        start = match.start()
+        before = start > 0 and _is_word(text[start - 1])
+        after = start < len(text) and _is_word(text[start])
+        if before != after:
+            count += 1
+            pos = match.end() if match.end() > start else start + 1
+        else:
+            pos = start + 1
+
+def _has_section(sections, name):
+    return name in sections and sections[name].strip() != ''
+
+def structure_features(resume_data):
+    """Section counts and page count read by score_structure"""
+    sections = resume_data.get('sections', {})
+    return {
+        'required_sections': sum(1 for sec in REQUIRED_SECTIONS if _has_section(sections, sec)),
+        'optional_sections': sum(1 for sec in OPTIONAL_SECTIONS if _has_section(sections, sec)),
+        'page_count': resume_data.get('page_count', 1)
+    }
+
+def grammar_features(resume_data):
+    """Action verb, passive phrase and number counts read by score_grammar"""
+    full_text = resume_data.get('full_text', '').lower()
+    return {
+        'action_verbs': sum(1 for verb in config.ACTION_VERBS if verb in full_text),
+        'passive_phrases': sum(_count_matches(pattern, full_text) for pattern in config.PASSIVE_PATTERNS),
+        'numbers': len(_NUMBER_RE.findall(full_text))
+    }
+
+def projects_features(resume_data):
+    """Project count, tech mentions and metrics read by score_projects"""
+    projects_text = resume_data.get('sections', {}).get('projects', '')
+    if not projects_text:
+        return {'has_projects': 0, 'project_count': 0, 'tech_mentions': 0, 'project_metrics': 0}
+    # Count project indicators (bullet points, project names)
+    project_count = max(len(_BULLET_RE.findall(projects_text)),
+                        len(_PROJECT_WORD_RE.findall(projects_text.lower())))
+    return {
+        'has_projects': 1,
+        'project_count': project_count,
+        'tech_mentions': len(_TECH_RE.findall(projects_text)),
+        'project_metrics': len(_NUMBER_RE.findall(projects_text))
+    }
+
+def education_features(resume_data):
+    """Degree / GPA / certification / award flags read by score_education"""
+    sections = resume_data.get('sections', {})
+    education_text = sections.get('education', '')
+    certifications_text = sections.get('certifications', '')
+    achievements_text = sections.get('achievements', '')
+    if not education_text:
+        return {'has_education': 0, 'has_degree': 0, 'has_gpa': 0, 'has_certifications': 0, 'has_achievements': 0}
+    return {
+        'has_education': 1,
+        'has_degree': int(any(kw in education_text.lower() for kw in DEGREE_KEYWORDS)),
+        'has_gpa': int(_GPA_RE.search(education_text) is not None),
+        'has_certifications': int(bool(certifications_text) and len(certifications_text) > 20),
+        'has_achievements': int(bool(achievements_text) and len(achievements_text) > 20)
+    }
+
+@timed('score_structure')
+def score_structure(resume_data, features=None):
     """
     Score resume structure and formatting (0-100)
     Checks: section completeness, page count, organization
+    features, if given, receives the counts the score is based on
     """
     score = 0
     evidence = []
     
-    sections = resume_data.get('sections', {})
-    page_count = resume_data.get('page_count', 1)
+    f = structure_features(resume_data)
+    if features is not None:
+        features.update(f)
+    page_count = f['page_count']
     
     # Section completeness (60 points)
-    required_sections = ['education', 'experience', 'projects', 'skills']
-    present_count = sum(1 for sec in required_sections if sec in sections and sections[sec].strip())
-    score += (present_count / len(required_sections)) * 60
+    score += (f['required_sections'] / len(REQUIRED_SECTIONS)) * 60
     
-    if present_count < len(required_sections):
-        missing = [s for s in required_sections if s not in sections or not sections[s].strip()]
+    if f['required_sections'] < len(REQUIRED_SECTIONS):
+        sections = resume_data.get('sections', {})
+        missing = [s for s in REQUIRED_SECTIONS if not _has_section(sections, s)]
         evidence.append(f"Missing sections: {', '.join(missing)}")
     
     # Page count (20 points) - ideal is 1-2 pages
@@ -35,13 +136,12 @@ def score_structure(resume_data):
         evidence.append(f"Resume length issue: {page_count} pages")
     
     # Optional sections bonus (20 points)
-    optional_sections = ['achievements', 'certifications', 'summary']
-    optional_count = sum(1 for sec in optional_sections if sec in sections and sections[sec].strip())
-    score += (optional_count / len(optional_sections)) * 20
+    score += (f['optional_sections'] / len(OPTIONAL_SECTIONS)) * 20
     
     return min(100, score), evidence
 
-def score_grammar(resume_data):
+@timed('score_grammar')
+def score_grammar(resume_data, features=None):
     """
     Score grammar and clarity (0-100)
     Checks: action verbs, passive voice, bullet structure
@@ -49,11 +149,12 @@ def score_grammar(resume_data):
     score = 100
     evidence = []
     
-    full_text = resume_data.get('full_text', '').lower()
-    sections = resume_data.get('sections', {})
+    f = grammar_features(resume_data)
+    if features is not None:
+        features.update(f)
     
     # Check for action verbs (40 points)
-    action_verb_count = sum(1 for verb in config.ACTION_VERBS if verb in full_text)
+    action_verb_count = f['action_verbs']
     if action_verb_count >= 10:
         evidence.append(f"Good use of action verbs ({action_verb_count} found)")
     elif action_verb_count >= 5:
@@ -64,10 +165,7 @@ def score_grammar(resume_data):
         evidence.append(f"Very few action verbs ({action_verb_count} found)")
     
     # Check for passive voice (30 points penalty)
-    passive_count = 0
-    for pattern in config.PASSIVE_PATTERNS:
-        passive_count += len(re.findall(pattern, full_text))
-    
+    passive_count = f['passive_phrases']
     if passive_count > 5:
         score -= 30
         evidence.append(f"Excessive passive voice detected ({passive_count} instances)")
@@ -76,29 +174,36 @@ def score_grammar(resume_data):
         evidence.append(f"Some passive voice detected ({passive_count} instances)")
     
     # Check for quantifiable achievements (30 points)
-    numbers = re.findall(r'\d+[%+]?', full_text)
-    if len(numbers) >= 5:
-        evidence.append(f"Good use of metrics ({len(numbers)} numbers found)")
-    elif len(numbers) >= 2:
+    number_count = f['numbers']
+    if number_count >= 5:
+        evidence.append(f"Good use of metrics ({number_count} numbers found)")
+    elif number_count >= 2:
         score -= 15
-        evidence.append(f"Limited metrics ({len(numbers)} numbers found)")
+        evidence.append(f"Limited metrics ({number_count} numbers found)")
     else:
         score -= 30
         evidence.append("Very few quantifiable achievements")
     
     return max(0, score), evidence
 
-def score_ats_compliance(resume_data):
+@timed('score_ats')
+def score_ats_compliance(resume_data, features=None):
     """Score ATS compliance (0-100)"""
     ats_result = check_ats_compliance(resume_data)
+    if features is not None:
+        features.update(ats_result['features'], ats_score=ats_result['score'])
     return ats_result['score'], ats_result['checks']['issues']
 
-def score_skill_match(resume_data, target_role=None, jd_text=None):
+@timed('score_skill_match')
+def score_skill_match(resume_data, target_role=None, jd_text=None, match_context=None, resume_embedding=None,
+                      resume_skills=None, features=None):
     """
     Score skill match to target role or JD (0-100)
     Uses semantic similarity and keyword coverage
     """
-    match_result = match_role_to_resume(resume_data, target_role, jd_text)
+    match_result = match_role_to_resume(resume_data, target_role, jd_text,
+                                        match_context=match_context, resume_embedding=resume_embedding,
+                                        resume_skills=resume_skills)
     
     # Combine semantic similarity (60%) and keyword coverage (40%)
     similarity = match_result['semantic_similarity']
@@ -106,6 +211,10 @@ def score_skill_match(resume_data, target_role=None, jd_text=None):
     
     score = (similarity * 0.6 + coverage * 0.4) * 100
     
+    if features is not None:
+        features.update(has_target=bool(match_context or target_role or jd_text), semantic_similarity=similarity,
+                        keyword_coverage=coverage, matched_skills=len(match_result['matched_skills']))
+    
     evidence = [
         f"Semantic similarity: {similarity:.2f}",
         f"Keyword coverage: {coverage:.2%}",
@@ -117,7 +226,8 @@ def score_skill_match(resume_data, target_role=None, jd_text=None):
     
     return score, evidence, match_result['skill_gaps']
 
-def score_projects(resume_data):
+@timed('score_projects')
+def score_projects(resume_data, features=None):
     """
     Score projects and impact (0-100)
     Checks: number of projects, technical depth, measurable outcomes
@@ -125,17 +235,15 @@ def score_projects(resume_data):
     score = 0
     evidence = []
     
-    sections = resume_data.get('sections', {})
-    projects_text = sections.get('projects', '')
+    f = projects_features(resume_data)
+    if features is not None:
+        features.update(f)
     
-    if not projects_text:
+    if not f['has_projects']:
         return 0, ["No projects section found"]
     
-    # Count project indicators (bullet points, project names)
-    project_count = len(re.findall(r'(?:^|\n)[\-\•\*]', projects_text))
-    project_count = max(project_count, len(re.findall(r'\bproject\b', projects_text.lower())))
-    
     # Number of projects (40 points)
+    project_count = f['project_count']
     if project_count >= 3:
         score += 40
         evidence.append(f"Good number of projects: {project_count}")
@@ -147,8 +255,7 @@ def score_projects(resume_data):
         evidence.append(f"Limited projects: {project_count}")
     
     # Technical depth - check for technology mentions (30 points)
-    tech_mentions = len(re.findall(r'\b(?:Python|Java|React|Flask|Django|ML|AI|database|API)\b', 
-                                   projects_text, re.IGNORECASE))
+    tech_mentions = f['tech_mentions']
     if tech_mentions >= 5:
         score += 30
         evidence.append(f"Strong technical depth ({tech_mentions} tech mentions)")
@@ -159,11 +266,11 @@ def score_projects(resume_data):
         evidence.append("Limited technical details")
     
     # Measurable outcomes (30 points)
-    metrics = re.findall(r'\d+[%+]?', projects_text)
-    if len(metrics) >= 3:
+    metrics = f['project_metrics']
+    if metrics >= 3:
         score += 30
-        evidence.append(f"Projects show measurable impact ({len(metrics)} metrics)")
-    elif len(metrics) >= 1:
+        evidence.append(f"Projects show measurable impact ({metrics} metrics)")
+    elif metrics >= 1:
         score += 15
     else:
         score += 5
@@ -171,7 +278,8 @@ def score_projects(resume_data):
     
     return min(100, score), evidence
 
-def score_education(resume_data):
+@timed('score_education')
+def score_education(resume_data, features=None):
     """
     Score education and achievements (0-100)
     Checks: degree completion, GPA, certifications, awards
@@ -179,17 +287,15 @@ def score_education(resume_data):
     score = 0
     evidence = []
     
-    sections = resume_data.get('sections', {})
-    education_text = sections.get('education', '')
-    achievements_text = sections.get('achievements', '')
-    certifications_text = sections.get('certifications', '')
+    f = education_features(resume_data)
+    if features is not None:
+        features.update(f)
     
-    if not education_text:
+    if not f['has_education']:
         return 0, ["No education section found"]
     
     # Check for degree (50 points)
-    degree_keywords = ['b.tech', 'btech', 'bachelor', 'b.e', 'b.sc', 'master', 'm.tech', 'mtech']
-    if any(kw in education_text.lower() for kw in degree_keywords):
+    if f['has_degree']:
         score += 50
         evidence.append("Degree information present")
     else:
@@ -197,23 +303,34 @@ def score_education(resume_data):
         evidence.append("Degree information unclear")
     
     # Check for GPA/percentage (20 points)
-    gpa_pattern = r'(?:\d\.\d+|\d{2,3}(?:\.\d+)?%)'
-    if re.search(gpa_pattern, education_text):
+    if f['has_gpa']:
         score += 20
         evidence.append("Academic performance mentioned")
     
     # Certifications (15 points)
-    if certifications_text and len(certifications_text) > 20:
+    if f['has_certifications']:
         score += 15
         evidence.append("Certifications listed")
     
     # Achievements/Awards (15 points)
-    if achievements_text and len(achievements_text) > 20:
+    if f['has_achievements']:
         score += 15
         evidence.append("Achievements/awards mentioned")
     
     return min(100, score), evidence
 
+def weights_for_role(target_role=None):
+    """
+    Scoring weights for a target role: config.WEIGHTS with the first matching
+    ROLE_WEIGHT_PROFILES entry (by substring, as with role keywords) applied
+    """
+    if target_role:
+        role_lower = target_role.lower()
+        for key, overrides in config.ROLE_WEIGHT_PROFILES.items():
+            if key in role_lower:
+                return {**config.WEIGHTS, **overrides}
+    return config.WEIGHTS
+
 def compute_overall_score(sub_scores, weights=None):
     """
     Compute weighted overall score from sub-scores
@@ -232,18 +349,38 @@ def compute_overall_score(sub_scores, weights=None):
     
     return round(overall, 1)
 
-def score_resume(resume_data, target_role=None, jd_text=None):
+@timed('score')
+def score_resume(resume_data, target_role=None, jd_text=None, match_context=None, resume_embedding=None,
+                 resume_skills=None):
     """
     Main function to score resume across all dimensions
+    Batch callers can pass a shared match_context, a precomputed resume_embedding
+    and resume_skills from extract_skills_batch
     Returns complete scoring report
     """
-    # Compute all sub-scores
-    structure_score, structure_evidence = score_structure(resume_data)
-    grammar_score, grammar_evidence = score_grammar(resume_data)
-    ats_score, ats_evidence = score_ats_compliance(resume_data)
-    skill_score, skill_evidence, skill_gaps = score_skill_match(resume_data, target_role, jd_text)
-    projects_score, projects_evidence = score_projects(resume_data)
-    education_score, education_evidence = score_education(resume_data)
+    # Embed the resume up front so it can be stored in the resume vector index.
+    # Build the JD / role side while it is queued, so an uncached JD shares
+    # the resume's forward pass in the micro-batcher. Without a JD or a known
+    # role nothing is compared, so the resume is neither embedded nor indexed
+    pending_embedding = None
+    if resume_embedding is None and config.RESUME_INDEX_ENABLED \
+            and has_match_target(target_role, jd_text, match_context):
+        pending_embedding = submit_resume_embedding(resume_data)
+    if match_context is None and (target_role or jd_text):
+        match_context = build_match_context(target_role, jd_text)
+    if pending_embedding is not None:
+        resume_embedding = resume_embedding_result(pending_embedding)
+    
+    # Compute all sub-scores, collecting the features they are based on
+    features = {}
+    structure_score, structure_evidence = score_structure(resume_data, features)
+    grammar_score, grammar_evidence = score_grammar(resume_data, features)
+    ats_score, ats_evidence = score_ats_compliance(resume_data, features)
+    skill_score, skill_evidence, skill_gaps = score_skill_match(resume_data, target_role, jd_text,
+                                                                match_context, resume_embedding, resume_skills,
+                                                                features)
+    projects_score, projects_evidence = score_projects(resume_data, features)
+    education_score, education_evidence = score_education(resume_data, features)
     
     sub_scores = {
         'structure_formatting': round(structure_score, 1),
@@ -254,7 +391,7 @@ def score_resume(resume_data, target_role=None, jd_text=None):
         'education_achievements': round(education_score, 1)
     }
     
-    overall_score = compute_overall_score(sub_scores)
+    overall_score = compute_overall_score(sub_scores, weights_for_role(target_role))
     
     # Compile evidence
     evidence = {
@@ -271,5 +408,7 @@ def score_resume(resume_data, target_role=None, jd_text=None):
     return {
         'overall_score': overall_score,
         'sub_scores': sub_scores,
-        'evidence': evidence
+        'evidence': evidence,
+        'features': features,
+        'resume_embedding': resume_embedding
     }
@@ -1,23 +1,50 @@
 import json
-import re
-import spacy
+import os
+import threading
+import time
+from collections import deque
 import config
+from core import runtime
+from core.timing import timed
 
-# Load spaCy model
-try:
-    nlp = spacy.load(config.SPACY_MODEL)
-except:
-    print(f"Warning: spaCy model {config.SPACY_MODEL} not found. Run: python -m spacy download {config.SPACY_MODEL}")
-    nlp = None
+# spaCy pipeline, loaded on first use and only when SPACY_ENABLED is set
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
 
-def load_taxonomy():
-    """Load skills taxonomy from JSON file"""
+# Per-process taxonomy cache; rebuilt only when the taxonomy file changes
+_taxonomy_lock = threading.Lock()
+_taxonomy_cache = {'signature': None, 'taxonomy': None, 'matcher': None}
+_adhoc_matcher = {'taxonomy': None, 'matcher': None}
+
+def _taxonomy_signature():
+    """Return (mtime, size) of the taxonomy file, or None if it is missing"""
     try:
-        with open(config.SKILLS_TAXONOMY_PATH, 'r') as f:
-            return json.load(f)
+        stat = os.stat(config.SKILLS_TAXONOMY_PATH)
     except FileNotFoundError:
-        print("Warning: skills_taxonomy.json not found, using default taxonomy")
-        return get_default_taxonomy()
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def load_taxonomy():
+    """
+    Load skills taxonomy from JSON file
+    The parsed taxonomy is cached per process and reloaded only when the file
+    changes, so callers must treat the returned dict as read-only
+    """
+    signature = _taxonomy_signature()
+    with _taxonomy_lock:
+        if _taxonomy_cache['taxonomy'] is not None and _taxonomy_cache['signature'] == signature:
+            return _taxonomy_cache['taxonomy']
+        
+        if signature is None:
+            print("Warning: skills_taxonomy.json not found, using default taxonomy")
+            taxonomy = get_default_taxonomy()
+        else:
+            with open(config.SKILLS_TAXONOMY_PATH, 'r') as f:
+                taxonomy = json.load(f)
+        
+        _taxonomy_cache.update(signature=signature, taxonomy=taxonomy, matcher=None)
+        return taxonomy
 
 def get_default_taxonomy():
     """Return default skills taxonomy if file not found"""
@@ -31,40 +58,180 @@ def get_default_taxonomy():
         "security": ["Kali Linux", "penetration testing", "OWASP", "cybersecurity"]
     }
 
-def extract_skills(text, taxonomy=None):
+def _is_word_char(ch):
+    """Mirror the regex word-character class used by str patterns"""
+    return ch.isalnum() or ch == '_'
+
+def _is_boundary(text, pos):
+    """True when a regex word boundary would match at position pos of text"""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+def _normalize_alias(term):
+    """Collapse case, spacing and punctuation so 'NodeJS' and 'node js' both find 'Node.js'"""
+    return ''.join(ch for ch in term.lower() if ch.isalnum() or ch in '+#')
+
+class SkillMatcher:
     """
-    Extract technical skills from text using taxonomy and NLP
-    Returns list of matched skills with categories
+    Aho-Corasick automaton over every skill in a taxonomy
+    Finds all taxonomy hits in a single pass over the text with the same
+    case-insensitive word-boundary semantics as the old per-skill regex search
     """
-    if taxonomy is None:
-        taxonomy = load_taxonomy()
-    
-    found_skills = {}
-    text_lower = text.lower()
     
-    # Search for each skill in taxonomy
-    for category, skills in taxonomy.items():
-        found_skills[category] = []
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        self.entries = []  # (category, skill) in taxonomy order
+        self._aliases = {}  # normalized skill name -> entry id, for NER spans
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
         
-        for skill in skills:
-            # Case-insensitive search with word boundaries
-            pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills[category].append(skill)
+        for category, skills in taxonomy.items():
+            for skill in skills:
+                term = skill.lower()
+                entry_id = len(self.entries)
+                self.entries.append((category, skill))
+                if term:  # blank entries can never be matched meaningfully
+                    self._add_term(term, entry_id)
+                alias = _normalize_alias(skill)
+                if alias:
+                    self._aliases.setdefault(alias, entry_id)
+        
+        self._build_fail_links()
     
-    # Use spaCy for additional entity extraction if available
-    if nlp:
-        doc = nlp(text)
-        for ent in doc.ents:
-            if ent.label_ in ['PRODUCT', 'ORG']:
-                # Check if it's a tech term
-                if any(ent.text.lower() in skill.lower() for category in taxonomy.values() for skill in category):
-                    continue  # Already captured
+    def _add_term(self, term, entry_id):
+        node = 0
+        for ch in term:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._out[node].append((entry_id, len(term)))
+    
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # Inherit matches that end here via the suffix link
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+    
+    def lookup(self, name):
+        """Entry id of the skill a free-form name (e.g. an NER span) refers to, or None"""
+        return self._aliases.get(_normalize_alias(name))
+    
+    def match(self, text):
+        """
+        Scan text once and return matched (category, skill) pairs
+        Results follow taxonomy order, like the per-skill regex loop did
+        """
+        return [self.entries[entry_id] for entry_id in sorted(self.match_ids(text))]
     
-    # Flatten and return unique skills
-    all_skills = []
-    for category, skills in found_skills.items():
-        for skill in skills:
-            all_skills.append({'skill': skill, 'category': category})
+    def match_ids(self, text):
+        """Scan text once and return the set of matched entry ids"""
+        text_lower = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        
+        for i, ch in enumerate(text_lower):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            
+            for entry_id, length in out[node]:
+                if entry_id in found:
+                    continue
+                if _is_boundary(text_lower, i - length + 1) and _is_boundary(text_lower, i + 1):
+                    found.add(entry_id)
+        
+        return found
+
+def get_skill_matcher(taxonomy=None):
+    """
+    Return a compiled SkillMatcher for the taxonomy
+    The file taxonomy's matcher is built once per process (and again only when
+    the file changes); the most recent ad-hoc taxonomy is also kept compiled
+    """
+    if taxonomy is None:
+        taxonomy = load_taxonomy()
     
-    return all_skills
+    with _taxonomy_lock:
+        if taxonomy is _taxonomy_cache['taxonomy']:
+            if _taxonomy_cache['matcher'] is None:
+                _taxonomy_cache['matcher'] = SkillMatcher(taxonomy)
+            return _taxonomy_cache['matcher']
+        
+        if taxonomy is not _adhoc_matcher['taxonomy']:
+            _adhoc_matcher.update(taxonomy=taxonomy, matcher=SkillMatcher(taxonomy))
+        return _adhoc_matcher['matcher']
+
+def get_nlp():
+    """
+    Load the spaCy pipeline on first use, without the components listed in
+    SPACY_EXCLUDE (by default everything but NER)
+    Returns None when spaCy is disabled or the model is not installed
+    """
+    global _nlp, _nlp_loaded
+    if not config.SPACY_ENABLED:
+        return None
+    with _nlp_lock:
+        if not _nlp_loaded:
+            _nlp_loaded = True
+            try:
+                started = time.perf_counter()
+                import spacy
+                _nlp = spacy.load(config.SPACY_MODEL, exclude=config.SPACY_EXCLUDE)
+                runtime.record_model_load('spacy', time.perf_counter() - started)
+            except Exception:
+                print(f"Warning: spaCy model {config.SPACY_MODEL} not found. Run: python -m spacy download {config.SPACY_MODEL}")
+                _nlp = None
+        return _nlp
+
+def _collect_skills(matcher, text, doc=None):
+    """Taxonomy hits in text plus any NER entities in doc that name a taxonomy skill"""
+    found = matcher.match_ids(text)
+    if doc is not None:
+        for ent in doc.ents:
+            if ent.label_ in config.SPACY_ENTITY_LABELS:
+                entry_id = matcher.lookup(ent.text)
+                if entry_id is not None:
+                    found.add(entry_id)
+    return [
+        {'skill': matcher.entries[entry_id][1], 'category': matcher.entries[entry_id][0]}
+        for entry_id in sorted(found)
+    ]
+
+@timed('skills')
+def extract_skills(text, taxonomy=None):
+    """
+    Extract technical skills from text using taxonomy and NLP
+    Returns list of matched skills with categories
+    """
+    matcher = get_skill_matcher(taxonomy)
+    nlp = get_nlp()
+    return _collect_skills(matcher, text, nlp(text) if nlp else None)
+
+@timed('skills')
+def extract_skills_batch(texts, taxonomy=None):
+    """
+    extract_skills for many texts; with spaCy enabled the texts go through
+    nlp.pipe (SPACY_BATCH_SIZE / SPACY_N_PROCESS) instead of one call each
+    Returns one skill list per text
+    """
+    matcher = get_skill_matcher(taxonomy)
+    nlp = get_nlp()
+    if nlp is None:
+        return [_collect_skills(matcher, text) for text in texts]
+    docs = nlp.pipe(texts, batch_size=config.SPACY_BATCH_SIZE, n_process=config.SPACY_N_PROCESS)
+    return [_collect_skills(matcher, text, doc) for text, doc in zip(texts, docs)]
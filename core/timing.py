@@ -0,0 +1,96 @@
+import functools
+import threading
+import time
+import config
+from core import memory, metrics
+
+# Per-stage timing of the upload pipeline. Every stage('name') block (or
+# @timed('name') function) records into
+#   - the autocv_stage_seconds{stage} histogram, and autocv_stage_errors_total
+#     when the stage raised
+#   - the current request's timings, which app.py sends back in a
+#     Server-Timing header (stages are summed per name and may nest: 'score'
+#     includes the 'score_*' sub-scorers)
+# Work done on other threads (the embedding micro-batcher) only reaches the
+# histograms. With STAGE_TIMING off, stage() hands out one shared no-op
+# context manager and @timed functions call straight through. Stages also
+# carry the optional memory accounting of core/memory.py.
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+metrics.describe_histogram('autocv_stage_seconds', 'Time spent per pipeline stage', STAGE_BUCKETS)
+metrics.describe('autocv_stage_errors_total', 'Pipeline stages that raised, by stage')
+
+_local = threading.local()
+
+def record(name, seconds, error=False):
+    """Record one run of a stage"""
+    metrics.observe('autocv_stage_seconds', seconds, stage=name)
+    if error:
+        metrics.inc('autocv_stage_errors_total', stage=name)
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+class _Stage:
+    __slots__ = ('name', 'started', 'memory')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.memory = memory.begin_stage(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self.started, error=exc_type is not None)
+        if self.memory is not None:
+            memory.end_stage(self.name, self.memory)
+        return False
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopStage()
+
+def stage(name):
+    """Context manager timing the enclosed block as stage name"""
+    if not config.STAGE_TIMING:
+        return _NOOP
+    return _Stage(name)
+
+def timed(name):
+    """Decorator timing every call of a function as stage name"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not config.STAGE_TIMING:
+                return fn(*args, **kwargs)
+            with _Stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def start_request():
+    """Begin collecting stage timings for the request on this thread"""
+    _local.timings = {} if config.STAGE_TIMING else None
+
+def finish_request():
+    """Stage name -> seconds for the request on this thread (and stop collecting)"""
+    timings = getattr(_local, 'timings', None)
+    _local.timings = None
+    return timings or {}
+
+def server_timing(timings, total=None):
+    """Server-Timing header value for stage timings (seconds), in milliseconds"""
+    entries = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines run a single process
+    fcntl = None
+
+ID_BYTES = 36  # report ids are uuid4 strings
+
+class ResumeIndex:
+    """
+    Append-only index of resume embeddings keyed by report id
+    Vectors are L2-normalized and stored as a raw float16/float32 matrix that
+    is memory-mapped for search, so cosine similarity is one matmul. Report ids
+    live in a parallel fixed-width file; rows are appended under an flock so
+    several worker processes can write safely. Removed reports are tombstoned
+    in deleted.bin (same fixed-width format) and skipped by search.
+    """
+
+    def __init__(self, namespace, directory=None, dtype=None):
+        self.namespace = namespace
+        root = directory or config.RESUME_INDEX_DIR
+        slug = hashlib.sha256(namespace.encode('utf-8')).hexdigest()[:16]
+        self.directory = os.path.join(root, slug)
+        self.dtype = np.dtype(dtype or config.RESUME_INDEX_DTYPE)
+        self._dim = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self):
+        try:
+            with open(self._path('meta.json')) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        self._dim = meta['dim']
+        self.dtype = np.dtype(meta['dtype'])
+        return meta
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self._path('ids.bin')) // ID_BYTES
+        except FileNotFoundError:
+            return 0
+
+    def add(self, report_ids, vectors):
+        """Append one row per report id"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(report_ids), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path('lock'), 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            meta = self._read_meta()
+            if meta is None:
+                meta = {'namespace': self.namespace, 'dim': int(vectors.shape[1]), 'dtype': self.dtype.name}
+                with open(self._path('meta.json'), 'w') as f:
+                    json.dump(meta, f)
+                self._dim = meta['dim']
+            if vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dim}")
+
+            # ids.bin is written last, so its length is the committed row count;
+            # anything past it in vectors.bin is a torn write and gets overwritten
+            rows = len(self)
+            row_bytes = self._dim * self.dtype.itemsize
+            with open(self._path('vectors.bin'), 'ab') as f:
+                f.truncate(rows * row_bytes)
+                f.write(vectors.astype(self.dtype).tobytes())
+            with open(self._path('ids.bin'), 'ab') as f:
+                f.truncate(rows * ID_BYTES)
+                f.write(b''.join(report_id.encode('ascii').ljust(ID_BYTES) for report_id in report_ids))
+
+    def remove(self, report_ids):
+        """Tombstone report ids so search no longer returns them"""
+        if not report_ids or not os.path.isdir(self.directory):
+            return
+        with open(self._path('lock'), 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(self._path('deleted.bin'), 'ab') as f:
+                f.truncate(f.tell() // ID_BYTES * ID_BYTES)  # drop a torn write
+                f.write(b''.join(report_id.encode('ascii').ljust(ID_BYTES) for report_id in report_ids))
+
+    def _deleted(self):
+        """Tombstoned ids as an S36 array (None if there are none)"""
+        try:
+            with open(self._path('deleted.bin'), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        count = len(data) // ID_BYTES
+        if count == 0:
+            return None
+        return np.frombuffer(data, dtype=f'S{ID_BYTES}', count=count)
+
+    def live_count(self):
+        """Number of indexed rows that have not been removed"""
+        ids, _ = self._open()
+        if ids is None:
+            return 0
+        deleted = self._deleted()
+        if deleted is None:
+            return len(ids)
+        return int(len(ids) - np.isin(ids, deleted).sum())
+
+    def _open(self):
+        """Memory-map the committed rows; returns (ids, vectors) or (None, None)"""
+        if self._read_meta() is None:
+            return None, None
+        rows = len(self)
+        if rows == 0:
+            return None, None
+        ids = np.memmap(self._path('ids.bin'), dtype=f'S{ID_BYTES}', mode='r', shape=(rows,))
+        vectors = np.memmap(self._path('vectors.bin'), dtype=self.dtype, mode='r', shape=(rows, self._dim))
+        return ids, vectors
+
+    def search(self, query_vector, top_k=10, allowed_ids=None):
+        """
+        Rank stored resumes by cosine similarity to query_vector
+        allowed_ids optionally restricts the candidates (e.g. DB-side filters)
+        Returns list of (report_id, similarity), best first
+        """
+        ids, vectors = self._open()
+        if ids is None:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self._dim:
+            raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self._dim}")
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        # Blocked matmul keeps the float32 working copy small for float16 storage
+        scores = np.empty(len(ids), dtype=np.float32)
+        block = config.RESUME_INDEX_BLOCK_ROWS
+        for start in range(0, len(ids), block):
+            scores[start:start + block] = np.asarray(vectors[start:start + block], dtype=np.float32) @ query
+
+        if allowed_ids is not None:
+            allowed = np.array([report_id.encode('ascii').ljust(ID_BYTES) for report_id in allowed_ids], dtype=f'S{ID_BYTES}')
+            scores[~np.isin(ids, allowed)] = -np.inf
+        deleted = self._deleted()
+        if deleted is not None:
+            scores[np.isin(ids, deleted)] = -np.inf
+
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        return [
+            (ids[i].decode('ascii').strip(), float(scores[i]))
+            for i in candidates if np.isfinite(scores[i])
+        ]
+
+def remove_from_indexes(report_ids, directory=None):
+    """Tombstone report ids in every namespace under directory (RESUME_INDEX_DIR)"""
+    root = directory or config.RESUME_INDEX_DIR
+    if not report_ids or not os.path.isdir(root):
+        return
+    for entry in os.scandir(root):
+        try:
+            with open(os.path.join(entry.path, 'meta.json')) as f:
+                namespace = json.load(f)['namespace']
+        except (OSError, ValueError, KeyError):
+            continue
+        ResumeIndex(namespace, directory=root).remove(report_ids)
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_resume_index(namespace=None):
+    """Return the process-wide index for the current embedding backend"""
+    global _index
+    if namespace is None:
+        from core.embedding_backends import get_backend
+        namespace = get_backend().name
+        if config.EMBEDDING_INPUT_MODE != 'full':
+            # Section-budgeted vectors are not comparable with whole-text ones
+            namespace += f'/{config.EMBEDDING_INPUT_MODE}-{config.EMBEDDING_INPUT_TOKENS}'
+
+    with _index_lock:
+        if _index is None or _index.namespace != namespace:
+            _index = ResumeIndex(namespace)
+        return _index
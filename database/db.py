@@ -1,10 +1,86 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+import config
 
 db = SQLAlchemy()
 
+def engine_options(database_url):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database"""
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}  # in-memory databases live in a single connection
+    options = {
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_timeout': config.DB_POOL_TIMEOUT,
+        'pool_recycle': config.DB_POOL_RECYCLE,
+        'pool_pre_ping': url.get_backend_name() != 'sqlite',
+    }
+    if url.get_backend_name() == 'sqlite':
+        # Pooled connections move between Flask's request threads
+        options['connect_args'] = {'check_same_thread': False, 'timeout': config.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    return options
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """Per-connection SQLite settings (see the SQLITE_* settings in config.py)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        # auto_vacuum first: it only applies while the database is still empty
+        cursor.execute(f'PRAGMA auto_vacuum={config.SQLITE_AUTO_VACUUM}')
+        cursor.execute(f'PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}')
+        cursor.execute(f'PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}')
+        cursor.execute(f'PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}')
+        cursor.execute(f'PRAGMA cache_size=-{int(config.SQLITE_CACHE_SIZE_KB)}')
+    finally:
+        cursor.close()
+
 def init_db(app):
     """Initialize database with Flask app"""
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
     db.init_app(app)
     with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', _configure_sqlite)
         db.create_all()
+        upgrade_schema()
         print("Database initialized successfully!")
+
+def _widen_column(table_name, column, current_type):
+    """Grow a VARCHAR column to the model's length (SQLite does not enforce lengths)"""
+    length = getattr(column.type, 'length', None)
+    current = getattr(current_type, 'length', None)
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite' or not length or not current or current >= length:
+        return
+    column_type = column.type.compile(dialect=db.engine.dialect)
+    if dialect == 'mysql':
+        statement = f"ALTER TABLE {table_name} MODIFY {column.name} {column_type} {'NULL' if column.nullable else 'NOT NULL'}"
+    else:
+        statement = f'ALTER TABLE {table_name} ALTER COLUMN {column.name} TYPE {column_type}'
+    with db.engine.begin() as conn:
+        conn.execute(text(statement))
+
+def upgrade_schema():
+    """
+    Add columns and indexes introduced after a database was first created,
+    and widen VARCHAR columns whose length was raised
+    db.create_all() only creates missing tables; it never alters existing ones.
+    New columns must therefore be nullable (or carry a server default).
+    """
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing = {column['name']: column for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                _widen_column(table.name, column, existing[column.name]['type'])
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from database.db import db
+from database.models import Job
+import config
+
+LANES = ('interactive', 'bulk')
+
+def enqueue_job(filename, file_data, target_role=None, jd_text=None, lane='interactive', file_hash=None):
+    """Persist a scoring job and return it (status 'queued')"""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane: {lane}")
+    job = Job(lane=lane, filename=filename, file_data=file_data, file_hash=file_hash,
+              target_role=target_role, jd_text=jd_text)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def claim_job(lanes, worker_id):
+    """
+    Atomically claim the oldest queued job, trying lanes in priority order
+    The conditional UPDATE makes concurrent workers race safely on SQLite
+    Returns the claimed Job or None
+    """
+    for lane in lanes:
+        while True:
+            candidate = (Job.query.with_entities(Job.id)
+                         .filter(Job.status == 'queued', Job.lane == lane)
+                         .order_by(Job.created_at)
+                         .first())
+            if candidate is None:
+                break
+            
+            claimed = (Job.query
+                       .filter(Job.id == candidate.id, Job.status == 'queued')
+                       .update({'status': 'running', 'worker': worker_id,
+                                'started_at': datetime.utcnow(), 'attempts': Job.attempts + 1},
+                               synchronize_session=False))
+            db.session.commit()
+            if claimed:
+                return db.session.get(Job, candidate.id)
+            # Another worker won the race; look again
+    return None
+
+def complete_job(job, report_id):
+    """Mark a job done and drop its upload payload"""
+    job.status = 'done'
+    job.report_id = report_id
+    job.file_data = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+def fail_job(job, error):
+    """Mark a job failed and drop its upload payload"""
+    job.status = 'failed'
+    job.error = error
+    job.file_data = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+def requeue_stale_jobs(stale_after=None):
+    """
+    Return jobs stuck in 'running' (their worker died) to the queue,
+    failing them once they have used up JOB_MAX_ATTEMPTS
+    Returns number of jobs touched
+    """
+    stale_after = stale_after if stale_after is not None else config.JOB_STALE_AFTER
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    stale = Job.query.filter(Job.status == 'running', Job.started_at < cutoff).all()
+    for job in stale:
+        if job.attempts >= config.JOB_MAX_ATTEMPTS:
+            job.status = 'failed'
+            job.error = 'Job timed out'
+            job.file_data = None
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = 'queued'
+            job.worker = None
+    db.session.commit()
+    return len(stale)
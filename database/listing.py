@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+from database.models import Report
+import config
+
+SORT_COLUMNS = {'timestamp': Report.timestamp, 'overall_score': Report.overall_score}
+
+def encode_cursor(sort, row):
+    """Opaque cursor pointing just past row in the given sort order"""
+    value = row.timestamp.isoformat() if sort == 'timestamp' else row.overall_score
+    return base64.urlsafe_b64encode(json.dumps([value, row.id]).encode('utf-8')).decode('ascii')
+
+def decode_cursor(sort, cursor):
+    """(sort value, report id) from encode_cursor; ValueError when malformed"""
+    try:
+        value, report_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if sort == 'timestamp':
+            value = datetime.fromisoformat(value)
+        else:
+            value = float(value)
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(report_id, str):
+        raise ValueError('Invalid cursor')
+    return value, report_id
+
+def list_reports(sort='timestamp', order='desc', target_role=None, min_score=None, max_score=None,
+                 limit=None, cursor=None):
+    """
+    One page of report summaries, newest (or best) first by default
+    Keyset pagination: the page after a cursor starts strictly after the
+    (sort value, id) it encodes, so every page is an index range scan on
+    ix_reports_timestamp / ix_reports_score (or their target_role variants)
+    however deep the listing goes, and concurrent inserts never shift pages.
+    Returns (summaries, next_cursor); next_cursor is None on the last page
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_COLUMNS)}")
+    if order not in ('asc', 'desc'):
+        raise ValueError('order must be asc or desc')
+    limit = max(1, min(int(limit or config.REPORTS_PAGE_SIZE), config.REPORTS_MAX_PAGE_SIZE))
+    column = SORT_COLUMNS[sort]
+
+    query = Report.query.with_entities(*(getattr(Report, name) for name in Report.SUMMARY_COLUMNS))
+    if target_role:
+        query = query.filter(Report.target_role == target_role)
+    # When sorting by time, '+ 0' keeps SQLite from answering a score range
+    # with the score index and then sorting every match: walking the time
+    # index and skipping out-of-range rows stops after one page
+    score = Report.overall_score + 0 if sort == 'timestamp' else Report.overall_score
+    if min_score is not None:
+        query = query.filter(score >= min_score)
+    if max_score is not None:
+        query = query.filter(score <= max_score)
+    if cursor:
+        position = tuple_(column, Report.id)
+        after = tuple_(*decode_cursor(sort, cursor))
+        query = query.filter(position < after if order == 'desc' else position > after)
+    if order == 'desc':
+        query = query.order_by(column.desc(), Report.id.desc())
+    else:
+        query = query.order_by(column.asc(), Report.id.asc())
+
+    # One extra row tells whether another page follows
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+    return [Report.summary_dict(row) for row in rows[:limit]], next_cursor
@@ -1,10 +1,47 @@
 from database.db import db
 from datetime import datetime
+import hashlib
+import json
 import uuid
+import zlib
+import config
+from core.features import pack_features, pack_scores
+
+def hash_text(value):
+    """SHA-256 hex digest of a text field, or None when it is empty"""
+    if not value:
+        return None
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+# Report fields that make up most of a row; with REPORT_COMPRESSION they are
+# stored together as one zlib-compressed JSON document in reports.payload
+PAYLOAD_FIELDS = ('feedback', 'evidence', 'bullet_rewrites')
+
+def pack_payload(fields):
+    """Compressed payload blob for a dict of PAYLOAD_FIELDS"""
+    data = json.dumps(fields, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(data, config.REPORT_COMPRESSION_LEVEL)
+
+def unpack_payload(blob):
+    """Dict of PAYLOAD_FIELDS from pack_payload"""
+    return json.loads(zlib.decompress(blob))
 
 class Report(db.Model):
     """Model for storing resume analysis reports"""
     __tablename__ = 'reports'
+    __table_args__ = (
+        # Dedupe lookup: same file, same role / JD, same scoring rules
+        db.Index('ix_reports_dedupe', 'file_hash', 'target_role', 'jd_hash', 'scoring_version'),
+        # Keyset pagination in /api/reports: sort column then id, optionally
+        # within one target role
+        db.Index('ix_reports_timestamp', 'timestamp', 'id'),
+        db.Index('ix_reports_score', 'overall_score', 'id'),
+        db.Index('ix_reports_role_timestamp', 'target_role', 'timestamp', 'id'),
+        db.Index('ix_reports_role_score', 'target_role', 'overall_score', 'id'),
+        # Rows still waiting for compaction (partial: empty once all are compressed)
+        db.Index('ix_reports_uncompressed', 'id', sqlite_where=db.text('payload IS NULL'),
+                 postgresql_where=db.text('payload IS NULL')),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -14,16 +51,147 @@ class Report(db.Model):
     feedback = db.Column(db.JSON, nullable=False)
     evidence = db.Column(db.JSON, nullable=False)
     target_role = db.Column(db.String(100), nullable=True)
+    file_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the uploaded bytes
+    jd_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the JD text, if any
+    scoring_version = db.Column(db.String(64), nullable=True)  # '2+int8+seq128+chunked+ner' and the like
+    bullet_rewrites = db.Column(db.JSON, nullable=True)
+    # Packed sub-scores and scoring features (core.features) for re-scoring
+    score_vector = db.Column(db.LargeBinary, nullable=True)
+    features = db.Column(db.LargeBinary, nullable=True)
+    # Compressed PAYLOAD_FIELDS; when set, the JSON columns above are left empty
+    payload = db.Column(db.LargeBinary, nullable=True)
     
-    def to_dict(self):
-        """Convert report to dictionary"""
+    @classmethod
+    def from_results(cls, report_id, filename, scoring_result, feedback_result, target_role=None,
+                     file_hash=None, jd_text=None):
+        """Build a report from score_resume / compile_full_feedback output"""
+        fields = {
+            'feedback': feedback_result['feedback'],
+            # weak_bullets is not stored: it is the 'original' of each bullet rewrite
+            'evidence': {
+                'missing_sections': scoring_result['evidence'].get('missing_sections', {}),
+                'skill_gaps': scoring_result['evidence'].get('skill_gaps', []),
+                'ats_issues': scoring_result['evidence'].get('ats', [])
+            },
+            'bullet_rewrites': feedback_result['bullet_rewrites']
+        }
+        if config.REPORT_COMPRESSION:
+            stored = {'feedback': {}, 'evidence': {}, 'bullet_rewrites': None, 'payload': pack_payload(fields)}
+        else:
+            stored = fields
+        return cls(
+            id=report_id,
+            filename=filename,
+            overall_score=scoring_result['overall_score'],
+            sub_scores=scoring_result['sub_scores'],
+            target_role=target_role,
+            file_hash=file_hash,
+            jd_hash=hash_text(jd_text),
+            scoring_version=config.SCORING_VERSION,
+            score_vector=pack_scores(scoring_result['sub_scores']),
+            features=pack_features(scoring_result['features']) if 'features' in scoring_result else None,
+            **stored
+        )
+    
+    @classmethod
+    def find_duplicate(cls, file_hash, target_role=None, jd_text=None):
+        """Return the newest report already computed for this file / role / JD, if any"""
+        if not file_hash:
+            return None
+        return (cls.query
+                .filter(cls.file_hash == file_hash,
+                        cls.target_role == target_role,
+                        cls.jd_hash == hash_text(jd_text),
+                        cls.scoring_version == config.SCORING_VERSION)
+                .order_by(cls.timestamp.desc())
+                .first())
+    
+    # Columns returned by listings (the large JSON columns are left out)
+    SUMMARY_COLUMNS = ('id', 'timestamp', 'filename', 'overall_score', 'target_role')
+    
+    @staticmethod
+    def summary_dict(row):
+        """Listing entry for a row holding SUMMARY_COLUMNS"""
         return {
+            'report_id': row.id,
+            'timestamp': row.timestamp.isoformat() + 'Z',
+            'filename': row.filename,
+            'overall_score': round(row.overall_score, 1),
+            'target_role': row.target_role
+        }
+    
+    def details(self):
+        """
+        feedback, evidence and bullet_rewrites, from the compressed payload or
+        the JSON columns, with evidence['weak_bullets'] filled back in
+        """
+        details = self.__dict__.get('_details')
+        if details is None:
+            if self.payload is not None:
+                details = unpack_payload(self.payload)
+            else:
+                details = {'feedback': self.feedback, 'evidence': dict(self.evidence),
+                           'bullet_rewrites': self.bullet_rewrites}
+            if 'weak_bullets' not in details['evidence']:
+                details['evidence']['weak_bullets'] = [r['original'] for r in details['bullet_rewrites'] or []]
+            self._details = details
+        return details
+    
+    # Keys of to_dict(), selectable with ?fields= on /api/report/<id>
+    API_FIELDS = ('report_id', 'timestamp', 'filename', 'overall_score', 'sub_scores', 'feedback', 'evidence',
+                  'target_role')
+    
+    def to_dict(self, fields=None):
+        """Convert report to dictionary, optionally only the given API_FIELDS"""
+        if fields is None:
+            fields = self.API_FIELDS
+        # The payload is only decompressed when feedback or evidence is wanted
+        details = self.details() if 'feedback' in fields or 'evidence' in fields else {}
+        data = {
             'report_id': self.id,
             'timestamp': self.timestamp.isoformat() + 'Z',
             'filename': self.filename,
             'overall_score': round(self.overall_score, 1),
             'sub_scores': self.sub_scores,
-            'feedback': self.feedback,
-            'evidence': self.evidence,
+            'feedback': details.get('feedback'),
+            'evidence': details.get('evidence'),
             'target_role': self.target_role
         }
+        return {key: data[key] for key in fields}
+
+class Job(db.Model):
+    """Queued resume scoring job, processed by worker.py"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_claim', 'status', 'lane', 'created_at'),
+    )
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    lane = db.Column(db.String(16), nullable=False, default='interactive')
+    status = db.Column(db.String(16), nullable=False, default='queued')
+    filename = db.Column(db.String(255), nullable=False)
+    file_data = db.Column(db.LargeBinary, nullable=True)  # cleared once the job finishes
+    file_hash = db.Column(db.String(64), nullable=True)
+    target_role = db.Column(db.String(100), nullable=True)
+    jd_text = db.Column(db.Text, nullable=True)
+    report_id = db.Column(db.String(36), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(64), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        """Convert job status to dictionary"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'lane': self.lane,
+            'filename': self.filename,
+            'report_id': self.report_id,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() + 'Z',
+            'started_at': self.started_at.isoformat() + 'Z' if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() + 'Z' if self.finished_at else None
+        }
@@ -0,0 +1,81 @@
+import time
+import numpy as np
+from sqlalchemy import bindparam, case, select
+from database.db import db
+from database.models import Report
+from core.features import overall_scores, pack_scores, score_matrix, weight_row
+from core.scorer import weights_for_role
+import config
+
+def rescore_reports(chunk_size=None, dry_run=False):
+    """
+    Recompute overall_score for every stored report from its stored sub-scores
+    and the current WEIGHTS / ROLE_WEIGHT_PROFILES, without re-parsing anything
+    Reports are read in id order, chunk_size at a time; each chunk is scored
+    in one NumPy pass and written back with one executemany UPDATE (changed
+    rows only). Reports saved before score vectors existed are read from the
+    sub_scores JSON once and get their score vector backfilled.
+    Returns counts and elapsed seconds
+    """
+    started = time.perf_counter()
+    chunk_size = chunk_size or config.RESCORE_CHUNK_SIZE
+    table = Report.__table__
+    stats = {'reports': 0, 'updated': 0, 'backfilled': 0, 'skipped': 0}
+    roles = {}  # target_role -> weight row, resolved once per distinct role
+
+    # The JSON column is only fetched (and decoded) for rows lacking a vector
+    legacy_scores = case((table.c.score_vector.is_(None), table.c.sub_scores), else_=None).label('legacy_scores')
+    query = (select(table.c.id, table.c.target_role, table.c.overall_score, table.c.score_vector, legacy_scores)
+             .where(table.c.id > bindparam('after'))
+             .order_by(table.c.id)
+             .limit(chunk_size))
+    update_scores = (table.update().where(table.c.id == bindparam('report_id'))
+                     .values(overall_score=bindparam('new_score')))
+    update_vectors = (table.update().where(table.c.id == bindparam('report_id'))
+                      .values(score_vector=bindparam('new_vector')))
+
+    after = ''
+    while True:
+        rows = db.session.execute(query, {'after': after}).all()
+        if not rows:
+            break
+        after = rows[-1].id
+
+        kept, blobs, backfill = [], [], []
+        for row in rows:
+            blob = row.score_vector
+            if blob is None:
+                try:
+                    blob = pack_scores(row.legacy_scores)
+                except (KeyError, TypeError, ValueError):
+                    stats['skipped'] += 1
+                    continue
+                backfill.append({'report_id': row.id, 'new_vector': blob})
+            kept.append(row)
+            blobs.append(blob)
+
+        if kept:
+            for row in kept:
+                if row.target_role not in roles:
+                    roles[row.target_role] = weight_row(weights_for_role(row.target_role))
+            weights = np.vstack([roles[row.target_role] for row in kept])
+            scores = overall_scores(score_matrix(blobs), weights)
+            changed = [{'report_id': row.id, 'new_score': score}
+                       for row, score in zip(kept, scores) if score != row.overall_score]
+
+            stats['reports'] += len(kept)
+            stats['updated'] += len(changed)
+            stats['backfilled'] += len(backfill)
+            if not dry_run:
+                if changed:
+                    db.session.execute(update_scores, changed)
+                if backfill:
+                    db.session.execute(update_vectors, backfill)
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,146 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, select
+from database.db import db
+from database.models import Report, pack_payload
+from core.vector_index import remove_from_indexes
+import config
+
+# Compaction keeps autocv.db bounded. Every step works in short transactions of
+# COMPACTION_BATCH_SIZE rows with a pause in between, so the web workers and
+# worker.py never wait on the write lock for more than one batch:
+#   1. compress: move the JSON columns of older rows into the payload blob
+#   2. expire:   archive (gzipped JSON lines) or purge reports older than
+#                REPORT_RETENTION_DAYS, tombstoning them in the resume index
+#   3. reclaim:  hand free pages back to the OS with incremental vacuum and
+#                truncate the WAL
+
+def _pause():
+    time.sleep(config.COMPACTION_PAUSE_MS / 1000)
+
+def compress_reports(batch_size):
+    """Move feedback / evidence / bullet_rewrites of uncompressed rows into payload"""
+    table = Report.__table__
+    query = (select(table.c.id, table.c.feedback, table.c.evidence, table.c.bullet_rewrites)
+             .where(table.c.payload.is_(None), table.c.id > bindparam('after'))
+             .order_by(table.c.id)
+             .limit(batch_size))
+    update = (table.update().where(table.c.id == bindparam('report_id'))
+              .values(payload=bindparam('new_payload'), feedback={}, evidence={}, bullet_rewrites=None))
+
+    compressed, after = 0, ''
+    while True:
+        rows = db.session.execute(query, {'after': after}).all()
+        if not rows:
+            break
+        after = rows[-1].id
+        changes = []
+        for row in rows:
+            evidence = dict(row.evidence or {})
+            # Rebuilt from bullet_rewrites on read, so only dropped when it matches
+            if evidence.get('weak_bullets') == [r['original'] for r in row.bullet_rewrites or []]:
+                evidence.pop('weak_bullets')
+            fields = {'feedback': row.feedback, 'evidence': evidence, 'bullet_rewrites': row.bullet_rewrites}
+            changes.append({'report_id': row.id, 'new_payload': pack_payload(fields)})
+        db.session.execute(update, changes)
+        db.session.commit()
+        compressed += len(changes)
+        _pause()
+    return compressed
+
+def _archive_path(now):
+    return os.path.join(config.REPORT_ARCHIVE_DIR, f"reports-{now:%Y%m%d}.jsonl.gz")
+
+def expire_reports(cutoff, action, batch_size):
+    """Archive or purge reports saved before cutoff, oldest first; returns the count"""
+    if action not in ('archive', 'purge'):
+        raise ValueError(f"Unknown retention action: {action}")
+    table = Report.__table__
+    expired = 0
+    while True:
+        if action == 'archive':
+            reports = (Report.query.filter(Report.timestamp < cutoff)
+                       .order_by(Report.timestamp, Report.id).limit(batch_size).all())
+            ids = [report.id for report in reports]
+            if reports:
+                os.makedirs(config.REPORT_ARCHIVE_DIR, exist_ok=True)
+                # Appending a gzip member per batch keeps the file one valid stream;
+                # written before the delete commits, so a crash can only duplicate
+                with gzip.open(_archive_path(datetime.utcnow()), 'at', encoding='utf-8') as f:
+                    for report in reports:
+                        entry = report.to_dict()
+                        entry['bullet_rewrites'] = report.details()['bullet_rewrites']
+                        f.write(json.dumps(entry) + '\n')
+        else:
+            ids = [row.id for row in (Report.query.with_entities(Report.id).filter(Report.timestamp < cutoff)
+                                      .order_by(Report.timestamp, Report.id).limit(batch_size))]
+        if not ids:
+            break
+        db.session.execute(table.delete().where(table.c.id.in_(ids)))
+        db.session.commit()
+        try:
+            remove_from_indexes(ids)
+        except OSError as e:
+            print(f"Warning: could not remove expired reports from the resume index: {e}")
+        expired += len(ids)
+        _pause()
+    return expired
+
+def reclaim_space(full_vacuum=False):
+    """
+    Return free pages to the OS, a few at a time; returns the pages freed
+    A full VACUUM rewrites the whole file and blocks writers while it runs; it is
+    only needed once, to switch a database created without auto_vacuum
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return 0
+    free_before = db.session.execute(db.text('PRAGMA freelist_count')).scalar()
+    db.session.commit()
+    if full_vacuum:
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql(f'PRAGMA auto_vacuum={config.SQLITE_AUTO_VACUUM}')
+            conn.exec_driver_sql('VACUUM')
+    elif db.session.execute(db.text('PRAGMA auto_vacuum')).scalar() == 2:  # incremental
+        free = free_before
+        while free:
+            with db.engine.connect() as conn:
+                # sqlite3's execute() steps this pragma once, i.e. frees one
+                # page; executescript() runs it to the end
+                conn.connection.driver_connection.executescript(
+                    f'PRAGMA incremental_vacuum({int(config.COMPACTION_VACUUM_PAGES)})')
+            remaining = db.session.execute(db.text('PRAGMA freelist_count')).scalar()
+            if remaining >= free:
+                break
+            free = remaining
+            _pause()
+    elif free_before:
+        print(f"Warning: {free_before} free pages kept: the database was created without auto_vacuum "
+              "(run `flask compact --vacuum` once)")
+    free_after = db.session.execute(db.text('PRAGMA freelist_count')).scalar()
+    db.session.execute(db.text('PRAGMA wal_checkpoint(TRUNCATE)')).all()
+    db.session.commit()
+    return free_before - free_after
+
+def compact_reports(retention_days=None, action=None, batch_size=None, full_vacuum=False):
+    """
+    Run one compaction pass: compress, expire, reclaim
+    retention_days / action default to REPORT_RETENTION_DAYS / REPORT_RETENTION_ACTION
+    Returns counts and elapsed seconds
+    """
+    started = time.perf_counter()
+    retention_days = config.REPORT_RETENTION_DAYS if retention_days is None else retention_days
+    action = action or config.REPORT_RETENTION_ACTION
+    batch_size = batch_size or config.COMPACTION_BATCH_SIZE
+
+    stats = {'compressed': 0, 'expired': 0, 'action': action, 'freed_pages': 0}
+    if config.REPORT_COMPRESSION:
+        stats['compressed'] = compress_reports(batch_size)
+    if retention_days:
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        stats['expired'] = expire_reports(cutoff, action, batch_size)
+    stats['freed_pages'] = reclaim_space(full_vacuum)
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,38 @@
+# gunicorn settings: gunicorn app:app -c gunicorn.conf.py
+#
+# The app and its models are loaded once in the master and inherited by the
+# workers through fork, so the model weights are shared copy-on-write instead
+# of being loaded once per worker.
+import gc
+import os
+
+# Read by config.py when the app is imported (below, in the master)
+os.environ.setdefault('AUTOCV_PREWARM', 'preload')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+preload_app = os.environ['AUTOCV_PREWARM'] == 'preload'
+timeout = 120
+
+def when_ready(server):
+    """Runs in the master before the first workers are forked"""
+    if not preload_app:
+        return
+    from core import runtime
+    server.log.info("Preloading models in the master (pid %s)", os.getpid())
+    runtime.prewarm()
+    runtime.mark_preloaded()
+    # Keep the garbage collector from touching (and so copying) every
+    # inherited object page in each worker
+    gc.freeze()
+
+def post_fork(server, worker):
+    """Runs in each worker right after fork"""
+    if not preload_app:
+        return
+    # Pooled database connections opened in the master (create_all, prewarm)
+    # must not be shared: drop them without closing the master's sockets
+    from database.db import db
+    from app import app
+    with app.app_context():
+        db.engine.dispose(close=False)
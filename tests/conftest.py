@@ -0,0 +1,18 @@
+import pytest
+
+import config
+
+
+@pytest.fixture(scope='session')
+def client(tmp_path_factory):
+    """Flask test client for app.py on a throwaway database and directories (hashing backend)"""
+    root = tmp_path_factory.mktemp('app')
+    patch = pytest.MonkeyPatch()
+    patch.setattr(config, 'DB_PATH', f"sqlite:///{root / 'autocv.db'}")
+    patch.setattr(config, 'EMBEDDING_BACKEND', 'hashing')
+    for name in ('UPLOAD_FOLDER', 'EMBEDDING_CACHE_DIR', 'RESUME_INDEX_DIR', 'REPORT_ARCHIVE_DIR', 'PROFILE_DIR'):
+        patch.setattr(config, name, str(root / name.lower()))
+    from app import app  # reads config.DB_PATH on import
+    with app.test_client() as client:
+        yield client
+    patch.undo()
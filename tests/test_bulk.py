@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+import config
+from core.ats import check_ats_compliance
+from core.bulk import bulk_score, feature_matrix, score_feature_matrix
+from core.features import SUB_SCORE_KEYS
+from core.scorer import score_resume
+
+WORDS = ['developed', 'built', 'led', 'optimized', 'was tested', 'worked on', 'helped with', 'python',
+         'react', 'flask', 'api', 'database', 'project', 'team', 'users', 'sql', 'docker', 'b.tech', 'gpa']
+
+
+def _text(rng, words):
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(WORDS))
+        if rng.random() < 0.15:
+            parts.append(f'{rng.randint(1, 999)}{rng.choice(["", "%", "+"])}')
+        if rng.random() < 0.1:
+            parts.append(rng.choice(['\n- ', '\n* ', '\n', '. ']))
+    return ' '.join(parts)
+
+
+def synthetic_resumes(n, seed=0):
+    rng = random.Random(seed)
+    resumes = []
+    for _ in range(n):
+        sections = {name: _text(rng, rng.randint(0, 40)) if rng.random() < 0.75 else ''
+                    for name in ('education', 'experience', 'projects', 'skills', 'achievements',
+                                 'certifications', 'summary')}
+        if rng.random() < 0.2:
+            sections['education'] += ' CGPA 8.7 / 92.5%'
+        resumes.append({
+            'full_text': '\n'.join(sections.values()),
+            'sections': {name: text for name, text in sections.items() if text or rng.random() < 0.5},
+            'contact': {field: 'x' if rng.random() < 0.6 else None for field in ('email', 'phone', 'linkedin', 'github')},
+            'page_count': rng.choice([1, 1, 2, 3, 4]),
+        })
+    return resumes
+
+
+@pytest.mark.parametrize('target_role, jd_text', [
+    (None, None),
+    ('Data Analyst', None),
+    (None, 'Python developer with Flask, SQL and Docker experience'),
+])
+def test_bulk_score_matches_score_resume(monkeypatch, target_role, jd_text):
+    monkeypatch.setattr(config, 'EMBEDDING_BACKEND', 'hashing')  # deterministic, no model download
+    monkeypatch.setattr(config, 'ROLE_WEIGHT_PROFILES', {'analyst': {'skill_match': 0.3, 'projects': 0.15}})
+    resumes = synthetic_resumes(300)
+    bulk = bulk_score(resumes, target_role, jd_text)
+    for row, resume_data in enumerate(resumes):
+        expected = score_resume(resume_data, target_role, jd_text)
+        assert dict(zip(SUB_SCORE_KEYS, bulk['sub_scores'][row].tolist())) == expected['sub_scores']
+        assert bulk['overall_scores'][row] == expected['overall_score']
+
+
+def test_ats_checker_and_feature_matrix_agree(monkeypatch):
+    monkeypatch.setattr(config, 'EMBEDDING_BACKEND', 'hashing')
+    resumes = synthetic_resumes(200, seed=1)
+    sub_scores, _ = score_feature_matrix(feature_matrix(resumes))
+    ats_column = SUB_SCORE_KEYS.index('ats_compliance')
+    for row, resume_data in enumerate(resumes):
+        assert sub_scores[row, ats_column] == check_ats_compliance(resume_data)['score']
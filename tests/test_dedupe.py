@@ -0,0 +1,32 @@
+import os
+
+import config
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), 'sample_resume.pdf')
+
+
+def score(client, **form):
+    with open(SAMPLE_PDF, 'rb') as f:
+        response = client.post('/api/score-resume', data={'file': (f, 'dedupe.pdf'), **form},
+                               content_type='multipart/form-data')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_same_file_role_and_jd_return_the_stored_report(client, monkeypatch):
+    monkeypatch.setattr(config, 'EMBEDDING_BACKEND', 'hashing')
+    form = {'target_role': 'Data Analyst', 'jd_text': 'SQL and Tableau dashboards'}
+    first = score(client, **form)
+    again = score(client, **form)
+    assert again['cached'] and again['report_id'] == first['report_id']
+    assert again['overall_score'] == first['overall_score']
+
+    for changed in ({'target_role': 'Backend', 'jd_text': form['jd_text']},
+                    {'target_role': form['target_role'], 'jd_text': 'Python and Flask APIs'}):
+        rescored = score(client, **changed)
+        assert not rescored.get('cached') and rescored['report_id'] != first['report_id']
+
+    monkeypatch.setattr(config, 'SCORING_VERSION', config.SCORING_VERSION + '+test')
+    rescored = score(client, **form)
+    assert not rescored.get('cached') and rescored['report_id'] != first['report_id']
+    assert score(client, **form)['report_id'] == rescored['report_id']
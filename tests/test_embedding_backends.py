@@ -0,0 +1,23 @@
+import numpy as np
+
+from core.embedding_backends import HashingBackend
+
+
+def test_hashing_backend_is_deterministic_and_normalized():
+    backend = HashingBackend(dim=1024)
+    texts = ['Built Python APIs with Flask and PostgreSQL', 'the and of', '']
+    vectors = backend.encode(texts)
+    assert vectors.shape == (3, 1024) and vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[1].any() and not vectors[2].any()  # stopwords only / empty
+    assert np.array_equal(vectors, HashingBackend(dim=1024).encode(texts))
+
+
+def test_hashing_backend_ranks_overlapping_text_higher():
+    backend = HashingBackend()
+    jd, close, far = backend.encode([
+        'Backend engineer: Python, Flask, SQL, Docker',
+        'Python developer, built Flask services backed by SQL, shipped with Docker',
+        'Graphic designer skilled in Illustrator and typography',
+    ])
+    assert float(jd @ close) > float(jd @ far)
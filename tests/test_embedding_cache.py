@@ -0,0 +1,46 @@
+import numpy as np
+
+from core.embedding_cache import EmbeddingCache
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts += texts
+        return np.array([[len(text), text.count('a'), 1.0] for text in texts])
+
+
+def test_memory_hit_and_duplicates_encode_once(tmp_path):
+    cache, encode = EmbeddingCache('model-a', directory=str(tmp_path)), CountingEncoder()
+    first = cache.encode(['python', 'java', 'python'], encode)
+    assert encode.texts == ['python', 'java'] and first.dtype == np.float32
+    again = cache.encode(['java', 'python'], encode)
+    assert encode.texts == ['python', 'java']
+    np.testing.assert_array_equal(again, first[[1, 0]])
+    assert cache.stats == {'memory_hits': 2, 'disk_hits': 0, 'misses': 3}
+
+
+def test_disk_round_trip_and_namespace_isolation(tmp_path):
+    encode = CountingEncoder()
+    stored = EmbeddingCache('model-a', directory=str(tmp_path)).encode(['pandas', 'sql'], encode)
+
+    fresh = EmbeddingCache('model-a', directory=str(tmp_path))  # e.g. another worker, or after a restart
+    np.testing.assert_array_equal(fresh.encode(['sql', 'pandas'], encode), stored[[1, 0]])
+    assert len(encode.texts) == 2 and fresh.stats['disk_hits'] == 2
+
+    other = EmbeddingCache('model-b', directory=str(tmp_path))
+    other.encode(['sql'], encode)
+    assert encode.texts[-1] == 'sql' and other.stats['misses'] == 1
+
+
+def test_lru_evicts_the_least_recently_used(tmp_path):
+    cache, encode = EmbeddingCache('model-a', directory=str(tmp_path), memory_size=2), CountingEncoder()
+    cache.encode(['a'], encode)
+    cache.encode(['b'], encode)
+    cache.encode(['a'], encode)  # 'a' is now the most recent
+    cache.encode(['c'], encode)  # evicts 'b'
+    assert list(cache._memory) == [cache.key('a'), cache.key('c')]
+    cache.encode(['b'], encode)
+    assert cache.stats == {'memory_hits': 1, 'disk_hits': 1, 'misses': 3} and encode.texts == ['a', 'b', 'c']
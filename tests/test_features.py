@@ -0,0 +1,22 @@
+import random
+
+from core.features import SUB_SCORE_KEYS, overall_scores, pack_features, pack_scores, score_matrix, unpack_features
+from core.features import weight_row
+from core.scorer import compute_overall_score
+
+WEIGHTS = {'structure': 0.2, 'grammar': 0.1, 'ats': 0.15, 'skill_match': 0.35, 'projects': 0.15, 'education': 0.05}
+
+
+def test_vectorized_overall_score_matches_compute_overall_score():
+    rng = random.Random(0)
+    rows = [{key: round(rng.uniform(0, 100), 1) for key in SUB_SCORE_KEYS} for _ in range(5000)]
+    rows.append({key: 0.0 for key in SUB_SCORE_KEYS})
+    matrix = score_matrix([pack_scores(row) for row in rows])
+    assert overall_scores(matrix, weight_row(WEIGHTS)) == [compute_overall_score(row, WEIGHTS) for row in rows]
+
+
+def test_features_round_trip():
+    blob = pack_features({'action_verbs': 12, 'has_degree': True, 'semantic_similarity': 0.5})
+    features = unpack_features(blob)
+    assert features['action_verbs'] == 12 and features['has_degree'] == 1 and features['semantic_similarity'] == 0.5
+    assert features['numbers'] == 0
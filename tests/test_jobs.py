@@ -0,0 +1,86 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+import config
+from database.db import db, init_db
+from database.jobs import claim_job, enqueue_job, requeue_stale_jobs
+from database.models import Job, Report
+from worker import worker_lanes
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), 'sample_resume.pdf')
+
+
+@pytest.fixture
+def queue(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'jobs.db'}"
+    init_db(app)
+    with app.app_context():
+        yield
+        db.session.remove()
+        db.engine.dispose()
+
+
+def enqueue(lane, minutes_ago):
+    job = enqueue_job(f'{lane}-{minutes_ago}.pdf', b'%PDF', lane=lane)
+    job.created_at = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    db.session.commit()
+    return job.id
+
+
+def test_claims_follow_lane_priority_then_age(queue):
+    old_bulk, interactive, older_interactive = enqueue('bulk', 30), enqueue('interactive', 5), enqueue('interactive', 10)
+
+    claimed = claim_job(('interactive', 'bulk'), 'w1')
+    assert claimed.id == older_interactive
+    assert (claimed.status, claimed.worker, claimed.attempts) == ('running', 'w1', 1) and claimed.started_at
+    assert claim_job(('interactive',), 'w2').id == interactive
+    assert claim_job(('interactive',), 'w2') is None  # reserved workers never take bulk jobs
+    assert claim_job(('interactive', 'bulk'), 'w3').id == old_bulk
+    assert claim_job(('interactive', 'bulk'), 'w3') is None
+
+
+def test_stale_jobs_are_retried_until_max_attempts(queue, monkeypatch):
+    monkeypatch.setattr(config, 'JOB_MAX_ATTEMPTS', 2)
+    job_id = enqueue('interactive', 0)
+    for attempt in (1, 2):
+        job = claim_job(('interactive',), f'w{attempt}')
+        assert job.id == job_id and job.attempts == attempt
+        assert requeue_stale_jobs(stale_after=60) == 0  # still within its time
+        job.started_at = datetime.utcnow() - timedelta(minutes=5)  # its worker died
+        db.session.commit()
+        assert requeue_stale_jobs(stale_after=60) == 1
+        job = db.session.get(Job, job_id)
+        expected = ('queued', None) if attempt == 1 else ('failed', 'Job timed out')
+        assert (job.status, job.error) == expected
+
+    assert job.file_data is None and job.finished_at is not None
+    assert claim_job(('interactive', 'bulk'), 'w3') is None
+
+
+def test_at_least_one_worker_serves_bulk(monkeypatch):
+    monkeypatch.setattr(config, 'JOB_INTERACTIVE_WORKERS', 2)
+    assert [worker_lanes(i, 4) for i in range(4)] == [('interactive',)] * 2 + [('interactive', 'bulk')] * 2
+    assert [worker_lanes(i, 2) for i in range(2)] == [('interactive',), ('interactive', 'bulk')]
+    assert worker_lanes(0, 1) == ('interactive', 'bulk')
+
+
+def test_requeued_job_with_a_committed_report_just_finishes(client):
+    from worker import process_job
+    with open(SAMPLE_PDF, 'rb') as f:
+        data = f.read()
+    with client.application.app_context():
+        job = enqueue_job('cv.pdf', data)
+        process_job(job)
+        assert job.status == 'done' and job.report_id == str(job.id)
+
+        # The worker died after the report was committed: the job is requeued and runs again
+        job.status, job.file_data, job.report_id = 'running', data, None
+        db.session.commit()
+        process_job(job)
+        job = db.session.get(Job, job.id)
+        assert job.status == 'done' and job.report_id == str(job.id) and job.error is None
+        assert Report.query.filter(Report.id == str(job.id)).count() == 1
@@ -0,0 +1,53 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from database.db import db, init_db
+from database.listing import list_reports
+from database.models import Report
+
+
+@pytest.fixture
+def reports(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'reports.db'}"
+    init_db(app)
+    rng = random.Random(0)
+    with app.app_context():
+        # Few distinct timestamps and scores, so pages split inside ties
+        start = datetime(2026, 1, 1)
+        db.session.execute(Report.__table__.insert(), [
+            {'id': str(uuid.uuid4()), 'timestamp': start + timedelta(seconds=rng.randrange(5)),
+             'filename': 'resume.pdf', 'overall_score': rng.choice([40.0, 55.5, 70.0, 85.0]),
+             'sub_scores': {}, 'feedback': {}, 'evidence': {}, 'target_role': rng.choice([None, 'SDE Intern'])}
+            for _ in range(120)])
+        db.session.commit()
+        yield Report.query.all()
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.mark.parametrize('sort', ['timestamp', 'overall_score'])
+@pytest.mark.parametrize('order', ['desc', 'asc'])
+def test_cursor_pages_cover_filtered_listing_in_order(reports, sort, order):
+    seen, cursor = [], None
+    while True:
+        page, cursor = list_reports(sort=sort, order=order, target_role='SDE Intern', min_score=50,
+                                    limit=7, cursor=cursor)
+        seen += [entry['report_id'] for entry in page]
+        if cursor is None:
+            break
+
+    expected = [r for r in reports if r.target_role == 'SDE Intern' and r.overall_score >= 50]
+    expected.sort(key=lambda r: (getattr(r, sort), r.id), reverse=order == 'desc')
+    assert seen == [r.id for r in expected]
+
+
+def test_rejects_bad_cursor_and_sort(reports):
+    with pytest.raises(ValueError):
+        list_reports(cursor='not-a-cursor')
+    with pytest.raises(ValueError):
+        list_reports(sort='filename')
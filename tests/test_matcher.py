@@ -0,0 +1,40 @@
+import config
+from core.matcher import build_resume_inputs, compute_similarity, match_role_to_resume, pool_resume_vectors
+from core.scorer import score_resume
+
+
+def _resume(**sections):
+    return {'full_text': '\n'.join(sections.values()), 'sections': sections}
+
+
+def test_budget_input_puts_priority_sections_first_and_stays_bounded():
+    resume = _resume(education='B.Tech Computer Science', experience='Built Flask APIs. ' * 2000,
+                     skills='Python, SQL, Docker')
+    texts, weights = build_resume_inputs(resume, mode='budget')
+    assert len(texts) == 1 and weights == [1.0]
+    assert texts[0].startswith('Python, SQL, Docker\nBuilt Flask APIs.')
+    assert 'B.Tech' not in texts[0]  # experience used up the budget
+    assert len(texts[0]) < 2000
+
+
+def test_chunked_input_has_one_text_per_section_and_pools_to_one_vector():
+    resume = _resume(projects='Chat app in React', skills='Python', other='Jane Doe')
+    texts, weights = build_resume_inputs(resume, mode='chunked')
+    assert texts == ['Python', 'Chat app in React', 'Jane Doe']
+    assert len(pool_resume_vectors([[1, 0], [0, 1], [0, 2]], weights)) == 2
+
+
+def test_full_mode_and_empty_resumes():
+    assert build_resume_inputs({'full_text': 'abc', 'sections': {}}, mode='full') == (['abc'], [1.0])
+    assert build_resume_inputs({'full_text': '  ', 'sections': {}}) == ([], [])
+    assert build_resume_inputs({'full_text': 'no sections here'})[0] == ['no sections here']
+
+
+def test_whitespace_only_resume_scores_zero_similarity(monkeypatch):
+    monkeypatch.setattr(config, 'EMBEDDING_BACKEND', 'hashing')
+    assert compute_similarity('   \n ', 'python developer') == 0.0
+    resume = {'full_text': '\n\n', 'sections': {}, 'contact': {}, 'links': {}, 'page_count': 1}  # tables-only DOCX
+    match = match_role_to_resume(resume, 'backend')
+    assert match['semantic_similarity'] == 0.0 and match['matched_skills'] == []
+    result = score_resume(resume, 'backend', jd_text='Python developer with Flask')
+    assert result['sub_scores']['skill_match'] == 0.0 and result['resume_embedding'] is None
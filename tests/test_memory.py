@@ -0,0 +1,47 @@
+import tracemalloc
+
+import pytest
+
+import config
+from core import memory, metrics, timing
+
+
+@pytest.fixture
+def accounting(monkeypatch):
+    monkeypatch.setattr(config, 'STAGE_TIMING', True)
+    monkeypatch.setattr(config, 'MEMORY_ACCOUNTING', True)
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def test_nested_frames_keep_their_own_peaks(accounting):
+    outer = memory.begin()
+    buffer = bytearray(4 * 1024 * 1024)
+    del buffer
+    inner = memory.begin()
+    small = bytearray(64 * 1024)
+    inner_peak, _ = memory.end(inner)
+    outer_peak, rss_delta = memory.end(outer)
+    del small
+
+    assert 64 * 1024 <= inner_peak < 4 * 1024 * 1024
+    assert outer_peak >= 4 * 1024 * 1024
+    assert rss_delta is None or isinstance(rss_delta, int)
+
+
+def test_memory_stages_and_requests_are_exported(accounting):
+    memory.start_request()
+    with timing.stage('parse_pdf'):
+        data = bytearray(1024 * 1024)
+    with timing.stage('score_grammar'):  # not in MEMORY_STAGES
+        pass
+    peak, _ = memory.finish_request('score_resume_api')
+    del data
+
+    assert peak >= 1024 * 1024
+    text = metrics.render_prometheus()
+    assert 'autocv_stage_memory_peak_bytes_count{stage="parse_pdf"}' in text
+    assert 'autocv_stage_memory_peak_bytes_count{stage="score_grammar"}' not in text
+    assert 'autocv_request_memory_peak_bytes_count{endpoint="score_resume_api"}' in text
@@ -0,0 +1,55 @@
+import threading
+
+import numpy as np
+import pytest
+
+from core.matcher import MicroBatcher
+
+
+class RecordingEncoder:
+    def __init__(self, fail_first=False):
+        self.calls = []
+        self.fail_first = fail_first
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.fail_first and len(self.calls) == 1:
+            raise RuntimeError('CUDA out of memory')
+        return np.array([[float(text)] for text in texts])
+
+
+def test_concurrent_submits_share_a_forward_pass_up_to_max_batch():
+    encode = RecordingEncoder()
+    batcher = MicroBatcher(encode, max_batch=4, max_wait_ms=300)
+    futures = [batcher.submit([str(i), str(i + 100)]) for i in range(5)]  # queued before the thread runs
+    batcher.start()
+    results = [future.result(timeout=5) for future in futures]
+    assert [len(call) for call in encode.calls] == [4, 4, 2]
+    assert [result[:, 0].tolist() for result in results] == [[i, i + 100] for i in range(5)]
+
+    # Requests arriving within the wait window join the batch opened by the first one
+    encode.calls.clear()
+    batcher.max_batch, barrier = 64, threading.Barrier(4)
+    results = {}
+    def submit(i):
+        barrier.wait()
+        results[i] = batcher.submit([str(i)]).result(timeout=5)
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(encode.calls) == 1 and sorted(encode.calls[0]) == ['0', '1', '2', '3']
+    assert all(results[i][0, 0] == i for i in range(4))
+
+
+def test_encode_errors_reach_every_waiting_caller():
+    encode = RecordingEncoder(fail_first=True)
+    batcher = MicroBatcher(encode, max_batch=64, max_wait_ms=100)
+    futures = [batcher.submit([str(i)]) for i in range(3)]
+    batcher.start()
+    for future in futures:
+        with pytest.raises(RuntimeError, match='out of memory'):
+            future.result(timeout=5)
+    assert len(encode.calls) == 1
+    assert batcher.submit(['7']).result(timeout=5)[0, 0] == 7  # the thread keeps serving
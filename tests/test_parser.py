@@ -1,6 +1,69 @@
-from core.parser import parse_resume
+import os
+import random
+import re
+
+from core.parser import parse_resume, scan_text
+
+# Generated by benchmarks/corpus.py: resume_pdf(seed=0, size=2500)
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), 'sample_resume.pdf')
 
 def test_parse_resume_returns_dict():
-    res = parse_resume('tests/sample_resume.pdf')
-    assert 'text' in res
-    assert 'sections' in res
+    res = parse_resume(SAMPLE_PDF)
+    assert res['full_text'] and res['page_count'] == 2
+    assert {'summary', 'skills', 'experience', 'projects', 'education'} <= set(res['sections'])
+    assert res['contact']['email'] == 'samuel.khan@example.com'
+
+
+def _regex_scan(text):
+    """Reference implementation: the original per-field regex scans"""
+    contact = {'email': None, 'phone': None, 'linkedin': None, 'github': None}
+    for field, pattern, flags in [
+        ('email', r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 0),
+        ('phone', r'\+?[\d\s\-\(\)]{10,}', 0),
+        ('linkedin', r'linkedin\.com/in/[\w\-]+', re.IGNORECASE),
+        ('github', r'github\.com/[\w\-]+', re.IGNORECASE),
+    ]:
+        match = re.search(pattern, text, flags)
+        if match:
+            contact[field] = match.group().strip() if field == 'phone' else match.group()
+    links = re.findall(r'https?://[^\s]+', text)
+
+    headers = {
+        'education': r'(?i)(education|academic|qualification)',
+        'experience': r'(?i)(experience|employment|work history)',
+        'projects': r'(?i)(projects?|portfolio)',
+        'skills': r'(?i)(skills?|technical skills?|competencies)',
+        'achievements': r'(?i)(achievements?|accomplishments?|awards?)',
+        'certifications': r'(?i)(certifications?|certificates?)',
+        'summary': r'(?i)(summary|profile|objective|about)',
+    }
+    sections = {'other': []}
+    current = 'other'
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        name = next((name for name, pattern in headers.items() if re.match(pattern, line)), None)
+        if name:
+            current = name
+            sections[current] = []
+        else:
+            sections[current].append(line)
+    return contact, links, {name: '\n'.join(lines) for name, lines in sections.items()}
+
+
+def test_scan_text_agrees_with_regex_scans():
+    texts = [
+        'Jane Doe\njane.doe@mail.example.com | +91 98765 43210\nlinkedin.com/in/jane-doe',
+        'EDUCATION\nB.Tech\nSkills\nPython\nprojects\nhttps://github.com/jane/app, http://x.io',
+        '.a@b.co .x@@y.io a.@b.c|d',
+        '+\n123 456\n\n7890',
+        '12345\n\n\n  ',
+        '',
+    ]
+    pieces = ['a', 'Z', '1', ' ', '\n', '-', '(', '+', '@', '.', '|', '/', 'com', 'http://',
+              'linkedin.com/in/', 'GitHub.com/', 'Education', 'about', '98765 43210']
+    rnd = random.Random(7)
+    texts += [''.join(rnd.choice(pieces) for _ in range(rnd.randint(1, 30))) for _ in range(2000)]
+    for text in texts:
+        assert scan_text(text) == _regex_scan(text), text
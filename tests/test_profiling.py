@@ -0,0 +1,35 @@
+import config
+from core import profiling
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+def test_requested_profile_is_stored_listed_and_rotated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(config, 'PROFILE_MAX_FILES', 2)
+    ids = []
+    for _ in range(3):
+        profile = profiling.start_profile('score_resume_api', requested=True)
+        busy_work()
+        ids.append(profile.finish('score_resume_api', '/api/score-resume', 200))
+
+    listed = profiling.list_profiles()
+    assert len(listed) == 2 and ids[0] not in {meta['id'] for meta in listed}
+    assert listed[0]['reason'] == 'requested' and listed[0]['status'] == 200
+    functions = profiling.top_functions(ids[-1], n=5, sort='cumulative')
+    assert len(functions) <= 5 and any('busy_work' in f['function'] for f in functions)
+    assert profiling.top_functions('../../etc/passwd') is None
+
+
+def test_sampling_respects_rate_and_endpoints(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(config, 'PROFILE_SAMPLE_RATE', 1.0)
+    assert profiling.start_profile('get_report_api') is None
+    profile = profiling.start_profile('upload')
+    assert profile.reason == 'sampled'
+    assert profiling.start_profile('upload') is None  # one profiled request at a time
+    monkeypatch.setattr(config, 'PROFILE_MIN_MS', 60000)
+    assert profile.finish('upload', '/upload', 200) is None  # fast sampled requests are dropped
+    assert profiling.list_profiles() == []
@@ -0,0 +1,22 @@
+from core.report_cache import ReportCache, report_etag
+
+
+def test_cache_is_bounded_by_bytes_and_evicts_least_recently_used():
+    cache = ReportCache(max_bytes=10)
+    cache.put('a', b'xxxx')
+    cache.put('b', b'yyyy', gzipped=True)
+    assert cache.get('a') == (b'xxxx', False)
+    cache.put('c', b'zzzz')  # 12 bytes: 'b' is the least recently used
+    assert cache.get('b') is None and cache.get('a') is not None and cache.get('c') is not None
+    assert cache.size_bytes == 8
+    cache.put('huge', b'x' * 11)
+    assert cache.get('huge') is None and len(cache) == 2
+
+
+def test_etag_changes_with_score_fields_and_encoding():
+    base = report_etag('r1', 61.5, '2', 'json')
+    assert base == report_etag('r1', 61.5, '2', 'json')
+    others = [report_etag('r1', 70.0, '2', 'json'), report_etag('r1', 61.5, '3', 'json'),
+              report_etag('r1', 61.5, '2', 'html'), report_etag('r1', 61.5, '2', 'json', ('overall_score',)),
+              report_etag('r1', 61.5, '2', 'json', gzipped=True), report_etag('r2', 61.5, '2', 'json')]
+    assert len({base, *others}) == 7
@@ -0,0 +1,96 @@
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from flask import Flask
+
+import config
+from core.features import SUB_SCORE_KEYS
+from database.db import db, init_db
+from database.models import Report
+from database.retention import compact_reports
+from core.vector_index import ResumeIndex
+
+SCORING = {'overall_score': 61.5, 'sub_scores': dict.fromkeys(SUB_SCORE_KEYS, 61.5),
+           'evidence': {'missing_sections': {}, 'skill_gaps': ['docker'], 'ats': ['No phone number found']}}
+FEEDBACK = {'feedback': {'high_priority': ['Add metrics']},
+            'bullet_rewrites': [{'original': 'Worked on APIs', 'improved': 'Built 12 REST APIs'}]}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'REPORT_ARCHIVE_DIR', str(tmp_path / 'archive'))
+    monkeypatch.setattr(config, 'COMPACTION_PAUSE_MS', 0)
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'reports.db'}"
+    init_db(app)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_compressed_report_reads_like_plain_one(app, monkeypatch):
+    reports = {}
+    for compress in (False, True):
+        monkeypatch.setattr(config, 'REPORT_COMPRESSION', compress)
+        reports[compress] = Report.from_results(str(uuid.uuid4()), 'cv.pdf', SCORING, FEEDBACK)
+    db.session.add_all(reports.values())
+    db.session.commit()
+    db.session.expire_all()
+
+    plain, compressed = (db.session.get(Report, reports[compress].id) for compress in (False, True))
+    assert compressed.payload is not None and compressed.evidence == {}
+    assert plain.details() == compressed.details()
+    assert compressed.to_dict()['evidence']['weak_bullets'] == ['Worked on APIs']
+    assert compressed.details()['bullet_rewrites'] == FEEDBACK['bullet_rewrites']
+
+
+def test_compaction_compresses_and_archives_old_reports(app, monkeypatch):
+    monkeypatch.setattr(config, 'REPORT_COMPRESSION', False)
+    now = datetime.utcnow()
+    for days in (1, 40, 50):
+        report = Report.from_results(str(uuid.uuid4()), f'{days}.pdf', SCORING, FEEDBACK)
+        report.timestamp = now - timedelta(days=days)
+        db.session.add(report)
+    db.session.commit()
+    expected = {r.filename: r.to_dict() for r in Report.query}
+
+    monkeypatch.setattr(config, 'REPORT_COMPRESSION', True)
+    stats = compact_reports(retention_days=30, action='archive', batch_size=1)
+    assert (stats['compressed'], stats['expired']) == (3, 2)
+
+    kept = Report.query.one()
+    assert kept.payload is not None and kept.to_dict() == expected['1.pdf']
+    [archive] = os.listdir(config.REPORT_ARCHIVE_DIR)
+    with gzip.open(os.path.join(config.REPORT_ARCHIVE_DIR, archive), 'rt') as f:
+        archived = [json.loads(line) for line in f]
+    assert sorted(entry['filename'] for entry in archived) == ['40.pdf', '50.pdf']
+    assert archived[0]['evidence'] == expected[archived[0]['filename']]['evidence']
+
+
+
+def test_rank_after_purge_still_fills_top_k(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'RESUME_INDEX_DIR', str(tmp_path / 'index'))
+    now = datetime.utcnow()
+    reports = []
+    for i in range(8):
+        report = Report.from_results(str(uuid.uuid4()), f'{i}.pdf', SCORING, FEEDBACK)
+        report.timestamp = now - timedelta(days=40 if i < 6 else 1)  # the 6 closest matches expire
+        reports.append(report)
+    db.session.add_all(reports)
+    db.session.commit()
+    query = np.ones(4, dtype=np.float32)
+    vectors = [query + np.eye(4, dtype=np.float32)[i % 4] * (i + 1) / 4 for i in range(8)]
+    index = ResumeIndex('test', dtype='float32')
+    index.add([report.id for report in reports], vectors)
+
+    stats = compact_reports(retention_days=30, action='purge')
+    assert stats['expired'] == 6
+    hits = index.search(query, top_k=2)
+    assert sorted(report_id for report_id, _ in hits) == sorted(report.id for report in reports[6:])
+    assert len(index) == 8 and index.live_count() == 2
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import zipfile
+
+import pytest
+from docx import Document
+
+import config
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), 'sample_resume.pdf')
+JD = 'Batch test: Python developer with Flask and SQL'
+
+
+@pytest.fixture
+def pdf_bytes():
+    with open(SAMPLE_PDF, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def docx_bytes():
+    document = Document()
+    for line in ('Jane Doe', 'jane@example.com', 'Experience', 'Built Python APIs with Flask, cutting latency by 30%'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def score_batch(client, data):
+    response = client.post('/api/score-batch', data={'jd_text': JD, **data}, content_type='multipart/form-data')
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return lines[:-1], lines[-1]
+
+
+def test_files_stream_one_line_per_resume_then_a_summary(client, monkeypatch, pdf_bytes, docx_bytes):
+    monkeypatch.setattr(config, 'BATCH_CHUNK_SIZE', 2)  # results span chunks
+    results, summary = score_batch(client, {'files': [(io.BytesIO(pdf_bytes), 'a.pdf'),
+                                                      (io.BytesIO(b'hello'), 'notes.txt'),
+                                                      (io.BytesIO(docx_bytes), 'b.docx')]})
+    assert [result['filename'] for result in results] == ['a.pdf', 'notes.txt', 'b.docx']
+    assert 'Invalid file type' in results[1]['error']
+    for result in (results[0], results[2]):
+        assert 0 <= result['overall_score'] <= 100 and result['report_id']
+    assert summary == {'done': True, 'scored': 2, 'failed': 1}
+
+
+def test_zip_archive_skips_folders_and_reports_bad_entries(client, pdf_bytes, docx_bytes):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('batch/', '')
+        zf.writestr('batch/one.pdf', pdf_bytes)
+        zf.writestr('__MACOSX/batch/._one.pdf', b'resource fork')
+        zf.writestr('batch/run.exe', b'MZ')
+        zf.writestr('batch/broken.pdf', b'not really a pdf')
+        zf.writestr('batch/two.docx', docx_bytes)
+    archive.seek(0)
+    results, summary = score_batch(client, {'archive': (archive, 'resumes.zip')})
+
+    assert [os.path.basename(result['filename']) for result in results] == ['one.pdf', 'run.exe', 'broken.pdf',
+                                                                           'two.docx']
+    assert 'error' not in results[0] and 'error' not in results[3]
+    assert 'Invalid file type' in results[1]['error'] and results[2]['error']
+    assert summary == {'done': True, 'scored': 2, 'failed': 2}
+
+
+def test_batch_without_usable_input_is_rejected(client):
+    assert client.post('/api/score-batch', data={}, content_type='multipart/form-data').status_code == 400
+    response = client.post('/api/score-batch', data={'archive': (io.BytesIO(b'not a zip'), 'resumes.zip')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400 and 'zip' in response.get_json()['error']
@@ -1,6 +1,57 @@
-from core.scorer import score_candidate
+import config
+from core.features import SUB_SCORE_KEYS
+from core.parser import scan_text
+from core.scorer import score_resume, score_structure
 
-def test_score_candidate():
-    score = score_candidate(['Python','SQL'], 5)
-    assert isinstance(score, int)
-    assert 0 <= score <= 100
+RESUME = """Jane Doe
+jane.doe@example.com | +91 98765 43210
+linkedin.com/in/jane-doe | github.com/jane-doe
+
+Summary
+Backend developer with 3 years of experience in Python and SQL.
+
+Technical Skills
+Python, Flask, SQL, Docker, AWS, Git
+
+Experience
+Backend Engineer | Acme | 2021
+- Built REST APIs in Flask serving 50k daily users
+- Reduced query latency by 40% with PostgreSQL indexes
+
+Projects
+Resume Scorer | Python, scikit-learn
+- Developed a scoring service handling 2M events per day
+
+Education
+B.Tech in Computer Science, NIT Trichy, 2020 - CGPA 8.7
+"""
+
+
+def resume_data(text):
+    contact, links, sections = scan_text(text)
+    return {'full_text': text, 'sections': sections, 'contact': contact, 'links': links, 'page_count': 1}
+
+
+def test_score_resume_returns_bounded_sub_scores(monkeypatch):
+    monkeypatch.setattr(config, 'EMBEDDING_BACKEND', 'hashing')  # deterministic, no model download
+    result = score_resume(resume_data(RESUME), 'Backend Developer')
+    assert set(result['sub_scores']) == set(SUB_SCORE_KEYS)
+    assert all(0 <= score <= 100 for score in result['sub_scores'].values())
+    assert 0 <= result['overall_score'] <= 100
+    assert score_resume(resume_data(RESUME), 'Backend Developer')['overall_score'] == result['overall_score']
+
+
+def test_missing_sections_lower_structure_score():
+    full, _ = score_structure(resume_data(RESUME))
+    partial, evidence = score_structure(resume_data(RESUME.split('Projects')[0]))
+    assert partial < full
+    assert any('projects' in line.lower() for line in evidence)
+
+
+def test_resume_is_only_embedded_when_there_is_something_to_match(monkeypatch):
+    monkeypatch.setattr(config, 'EMBEDDING_BACKEND', 'hashing')
+    monkeypatch.setattr(config, 'RESUME_INDEX_ENABLED', True)
+    assert score_resume(resume_data(RESUME))['resume_embedding'] is None
+    assert score_resume(resume_data(RESUME), 'Astronaut')['resume_embedding'] is None  # no role keywords
+    assert score_resume(resume_data(RESUME), 'Backend Developer')['resume_embedding'] is not None
+    assert score_resume(resume_data(RESUME), jd_text='Python developer, Flask')['resume_embedding'] is not None
@@ -0,0 +1,44 @@
+import re
+
+from core.skills import extract_skills, get_skill_matcher, load_taxonomy
+
+
+def _regex_extract(text, taxonomy):
+    """Reference implementation: one word-boundary regex per skill"""
+    found = []
+    for category, skills in taxonomy.items():
+        for skill in skills:
+            if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text.lower()):
+                found.append({'skill': skill, 'category': category})
+    return found
+
+
+def test_matcher_agrees_with_regex_search():
+    taxonomy = {
+        'languages': ['C', 'C++', 'C#', 'Java', 'JavaScript', 'Go'],
+        'frameworks': ['Node.js', '.NET', 'Spring Boot'],
+        'tools': ['CI/CD', 'Git', 'GitHub'],
+    }
+    texts = [
+        'Built services in Java and C++ with CI/CD on GitHub',
+        'javascript, node.js and .NET; Spring  Boot',
+        'C++11 and C#; golang is not Go',
+        'c',
+        '',
+    ]
+    for text in texts:
+        assert extract_skills(text, taxonomy) == _regex_extract(text, taxonomy)
+
+
+def test_taxonomy_and_matcher_are_cached():
+    taxonomy = load_taxonomy()
+    assert load_taxonomy() is taxonomy
+    assert get_skill_matcher() is get_skill_matcher(taxonomy)
+
+
+def test_lookup_maps_entity_spellings_to_taxonomy_skills():
+    matcher = get_skill_matcher({'frameworks': ['Node.js', 'Spring Boot'], 'languages': ['C++', 'C']})
+    assert matcher.entries[matcher.lookup('NodeJS')] == ('frameworks', 'Node.js')
+    assert matcher.entries[matcher.lookup('spring-boot')] == ('frameworks', 'Spring Boot')
+    assert matcher.entries[matcher.lookup('c++')] == ('languages', 'C++')
+    assert matcher.lookup('Acme Corp') is None
@@ -0,0 +1,42 @@
+import pytest
+
+import config
+from core import metrics, timing
+
+
+def sample(line_prefix):
+    for line in metrics.render_prometheus().splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0
+
+
+def stage_count(name):
+    return sample(f'autocv_stage_seconds_count{{stage="{name}"}}')
+
+
+def test_stages_feed_request_timings_and_histograms(monkeypatch):
+    monkeypatch.setattr(config, 'STAGE_TIMING', True)
+    before = stage_count('test_parse')
+    timing.start_request()
+    with timing.stage('test_parse'):
+        pass
+    with pytest.raises(ValueError):
+        with timing.stage('test_parse'):
+            raise ValueError('bad pdf')
+    timings = timing.finish_request()
+
+    assert list(timings) == ['test_parse'] and stage_count('test_parse') == before + 2
+    assert sample('autocv_stage_errors_total{stage="test_parse"}') >= 1
+    header = timing.server_timing(timings, total=0.25)
+    assert header.startswith('test_parse;dur=') and header.endswith('total;dur=250.0')
+
+
+def test_disabled_timing_records_nothing(monkeypatch):
+    monkeypatch.setattr(config, 'STAGE_TIMING', False)
+    before = stage_count('test_off')
+    timing.start_request()
+    with timing.stage('test_off'):
+        pass
+    assert timing.timed('test_off')(lambda x: x * 2)(21) == 42
+    assert timing.finish_request() == {} and stage_count('test_off') == before
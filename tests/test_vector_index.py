@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+from core.vector_index import ResumeIndex
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), 'sample_resume.pdf')
+
+
+def test_add_search_and_remove(tmp_path):
+    index = ResumeIndex('test', directory=str(tmp_path))
+    assert index.search(np.ones(3), top_k=5) == [] and index.live_count() == 0
+    index.add(['a', 'b', 'c'], [[1, 0, 0], [0.8, 0.6, 0], [0, 0, 2]])
+    index.add(['d'], [[0.1, 1, 0]])
+
+    hits = index.search([1, 0, 0], top_k=3)
+    assert [report_id for report_id, _ in hits] == ['a', 'b', 'd']
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-3) and hits[1][1] == pytest.approx(0.8, abs=1e-3)
+    assert [report_id for report_id, _ in index.search([1, 0, 0], top_k=5, allowed_ids=['c', 'd'])] == ['d', 'c']
+
+    index.remove(['a', 'missing'])
+    assert [report_id for report_id, _ in index.search([1, 0, 0], top_k=2)] == ['b', 'd']
+    assert len(index) == 4 and index.live_count() == 3
+    with pytest.raises(ValueError):
+        index.add(['e'], [[1, 0]])  # dimension is fixed by the first add
+    with pytest.raises(ValueError):
+        index.search([1, 0], top_k=1)
+
+
+def test_rank_candidates_endpoint(client):
+    with open(SAMPLE_PDF, 'rb') as f:
+        scored = client.post('/api/score-resume', data={'file': (f, 'ranked.pdf'), 'jd_text': 'Rank me: Python, SQL'},
+                             content_type='multipart/form-data')
+    assert scored.status_code == 200
+
+    response = client.post('/api/rank-candidates', json={'jd_text': 'Python developer', 'top_k': 1})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['results']) == 1 and body['indexed'] >= 1
+    assert {'report_id', 'similarity', 'overall_score'} <= set(body['results'][0])
+
+    for top_k in (0, -3, 'many'):
+        assert client.post('/api/rank-candidates', json={'jd_text': 'Python', 'top_k': top_k}).status_code == 400
+    assert client.post('/api/rank-candidates', json={'top_k': 5}).status_code == 400
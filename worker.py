@@ -0,0 +1,124 @@
+"""
+Background worker pool for queued resume scoring jobs
+
+Usage: python worker.py [--workers N]
+
+The first JOB_INTERACTIVE_WORKERS workers only serve the interactive lane, so a
+backlog of bulk jobs can never starve web uploads; the remaining workers take
+interactive jobs first and fall back to bulk ones. At least one worker always
+serves the bulk lane, however small --workers is. One more process runs report
+compaction (database/retention.py) every REPORT_COMPACTION_INTERVAL seconds.
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+
+import config
+
+def process_job(job):
+    """Parse, score and store one claimed job"""
+    from app import parse_upload_bytes, score_and_store
+    from database.db import db
+    from database.jobs import complete_job, fail_job
+    from database.models import Report
+    
+    # The report id is the job id: a job requeued after its report was
+    # committed (worker died before complete_job) only needs finishing
+    if db.session.get(Report, str(job.id)) is not None:
+        complete_job(job, str(job.id))
+        return
+    
+    try:
+        resume_data = parse_upload_bytes(job.filename, job.file_data)
+        report, _ = score_and_store(str(job.id), job.filename, resume_data, job.target_role, job.jd_text,
+                                    job.file_hash)
+        complete_job(job, report.id)
+    except Exception as e:
+        traceback.print_exc()
+        db.session.rollback()
+        fail_job(job, str(e))
+
+def run_worker(worker_id, lanes):
+    """Worker process loop: claim a job in lane priority order, run it, repeat"""
+    from app import app
+    from database.jobs import claim_job
+    
+    with app.app_context():
+        print(f"Worker {worker_id} serving lanes: {', '.join(lanes)}")
+        try:
+            while True:
+                job = claim_job(lanes, worker_id)
+                if job is None:
+                    time.sleep(config.JOB_POLL_INTERVAL)
+                    continue
+                process_job(job)
+        except KeyboardInterrupt:
+            pass  # Ctrl-C reaches the whole process group; the parent cleans up
+
+def run_compactor():
+    """Compaction process loop: one pass, then wait for the next interval"""
+    from app import app
+    from database.db import db
+    from database.retention import compact_reports
+    
+    with app.app_context():
+        try:
+            while True:
+                try:
+                    stats = compact_reports()
+                    print(f"Compaction: {stats}")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Warning: report compaction failed: {e}")
+                time.sleep(config.REPORT_COMPACTION_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+
+def worker_lanes(index, workers):
+    """Lanes served by the index-th of workers workers (the last one always takes bulk jobs)"""
+    if index < min(config.JOB_INTERACTIVE_WORKERS, workers - 1):
+        return ('interactive',)
+    return ('interactive', 'bulk')
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the AutoCV job worker pool')
+    parser.add_argument('--workers', type=int, default=config.JOB_WORKERS)
+    args = parser.parse_args()
+    
+    from app import app
+    from database.jobs import requeue_stale_jobs
+    
+    # Spawn (not fork) so no worker inherits the parent's database connections
+    context = multiprocessing.get_context('spawn')
+    processes = {}
+    try:
+        while True:
+            # (Re)start any worker that is not running
+            for index in range(args.workers):
+                proc = processes.get(index)
+                if proc is None or not proc.is_alive():
+                    worker_id = f"{socket.gethostname()}-{os.getpid()}-{index}"
+                    proc = context.Process(target=run_worker, args=(worker_id, worker_lanes(index, args.workers)), daemon=True)
+                    proc.start()
+                    processes[index] = proc
+            if config.REPORT_COMPACTION_INTERVAL:
+                proc = processes.get('compactor')
+                if proc is None or not proc.is_alive():
+                    proc = context.Process(target=run_compactor, daemon=True)
+                    proc.start()
+                    processes['compactor'] = proc
+            
+            with app.app_context():
+                requeue_stale_jobs()
+            time.sleep(config.JOB_STALE_AFTER / 10)
+    except KeyboardInterrupt:
+        for proc in processes.values():
+            proc.terminate()
+        for proc in processes.values():
+            proc.join()
+
+if __name__ == '__main__':
+    main()